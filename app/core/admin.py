@@ -0,0 +1,23 @@
+# app/core/admin.py
+"""Служебные эндпоинты для администраторов: диагностика кэша."""
+
+from fastapi import APIRouter, Depends
+
+from app.core.cache_metrics import hot_keys, key_namespace
+from app.core.schemas import HotKeyResponse
+from app.modules.auth.dependencies import get_current_admin_id
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(get_current_admin_id)],
+)
+
+
+@router.get("/cache/hot-keys", response_model=list[HotKeyResponse])
+async def get_cache_hot_keys():
+    """Самые читаемые ключи Redis по выборке этого процесса (hot_keys)."""
+    return [
+        HotKeyResponse(key=key, namespace=key_namespace(key), reads_estimated=reads)
+        for key, reads in hot_keys.top()
+    ]
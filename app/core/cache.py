@@ -0,0 +1,788 @@
+# app/core/cache.py
+"""Двухуровневый кэш: локальный LRU в процессе перед ключами Redis."""
+
+import asyncio
+import math
+import random
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple
+
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.cache_metrics import CACHE_REDIS_PAYLOAD
+from app.core.codecs import (
+    ALL_KEY_PREFIXES,
+    DECODE_ERRORS,
+    NEGATIVE,
+    EntryCodec,
+    entry_codec,
+)
+from app.core.config import settings
+
+# ═══════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by namespace, tier and result",
+    ["cache", "tier", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Entries evicted from the in-process cache",
+    ["cache", "tier", "reason"],
+)
+CACHE_LOADS = Counter(
+    "cache_loads_total",
+    "Cache miss resolution: loaded, coalesced (same process), "
+    "waited (another process), fallback (lock wait timed out) "
+    "or refreshed (stale entry updated in background)",
+    ["cache", "outcome"],
+)
+CACHE_NEGATIVE_HITS = Counter(
+    "cache_negative_hits_total",
+    "Lookups answered by a cached 'not found' sentinel",
+    ["cache"],
+)
+CACHE_LOCAL_BYTES = Gauge(
+    "cache_local_bytes",
+    "Estimated size of the in-process cache (serialized bytes)",
+    ["cache"],
+)
+CACHE_WARM_KEYS = Counter(
+    "cache_warm_keys_total",
+    "Keys processed by cache warming: loaded from the DB or already cached",
+    ["cache", "result"],
+)
+CACHE_WARM_PROGRESS = Gauge(
+    "cache_warm_progress_ratio",
+    "Progress of the current (or last) cache warming run, 0..1",
+    ["cache"],
+)
+CACHE_WARM_DURATION = Histogram(
+    "cache_warm_duration_seconds",
+    "Duration of a cache warming run",
+    ["cache"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+
+# Канал Redis pub/sub, в который публикуются инвалидированные ключи
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Блокировка загрузчика ключа между процессами
+LOCK_KEY = "lock:{}"
+LOCK_POLL_INTERVAL = 0.05
+
+# Снимает блокировку, только если она все еще наша
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Версия последней записи write-through для ключа
+VERSION_KEY = "ver:{}"
+
+# Записывает значение, только если его версия новее уже записанной.
+# KEYS: ключ значения, ключ версии, ключи других форматов (удаляются).
+# ARGV: значение, версия, TTL в секундах.
+WRITE_THROUGH_SCRIPT = """
+local current = tonumber(redis.call("GET", KEYS[2]) or "0")
+local version = tonumber(ARGV[2])
+if current >= version then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[3])
+redis.call("SET", KEYS[2], version, "EX", ARGV[3])
+for i = 3, #KEYS do
+    redis.call("DEL", KEYS[i])
+end
+return 1
+"""
+
+# Заполняет ключ после загрузки из БД, если запись не старее записанной
+# write-through: та же проверка, что в WRITE_THROUGH_SCRIPT, но значение той
+# же версии можно записать, когда самого ключа уже нет (истек или вытеснен).
+# Значения без версии (0) записываются, пока версия ключа не задана.
+# KEYS: ключ значения, ключ версии.
+# ARGV: значение, версия, TTL в секундах.
+FILL_SCRIPT = """
+local current = tonumber(redis.call("GET", KEYS[2]) or "0")
+local version = tonumber(ARGV[2])
+if current > version then
+    return 0
+end
+if current > 0 and current == version and redis.call("EXISTS", KEYS[1]) == 1 then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[3])
+if version > 0 then
+    redis.call("SET", KEYS[2], version, "EX", ARGV[3])
+end
+return 1
+"""
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOCAL TIER
+# ═══════════════════════════════════════════════════════════════
+
+
+class LocalCache:
+    """
+    Ограниченный по памяти LRU-кэш с TTL внутри одного процесса.
+
+    Хранит уже провалидированные pydantic-объекты, поэтому попадание не
+    требует ни обращения к Redis, ни model_validate_json. Рядом с объектом
+    запоминаются его готовые JSON-представления (см. render). Размер записи
+    оценивается по длине JSON.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, ttl: float) -> None:
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # ключ -> [expires_at, value, size, {schema: json}]
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        self._size = 0
+        # Растет при каждой инвалидации; см. TwoTierCache.get/set
+        self._generation = 0
+        _local_caches[namespace] = self
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Any | None:
+        """Возвращает значение из кэша или None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_REQUESTS.labels(self.namespace, "local", "miss").inc()
+            return None
+
+        expires_at, value = entry[0], entry[1]
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            CACHE_EVICTIONS.labels(self.namespace, "local", "expired").inc()
+            CACHE_REQUESTS.labels(self.namespace, "local", "miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.labels(self.namespace, "local", "hit").inc()
+        return value
+
+    def set(self, key: str, value: Any, size: int, generation: int) -> None:
+        """
+        Сохраняет значение, если с момента чтения не было инвалидаций.
+
+        Args:
+            key: Ключ (совпадает с ключом Redis).
+            value: Объект для хранения.
+            size: Оценка размера в байтах.
+            generation: Значение generation до чтения из Redis/БД.
+        """
+        if generation != self._generation or size > self.max_bytes:
+            return
+
+        self._pop(key)
+        self._entries[key] = [time.monotonic() + self.ttl, value, size, {}]
+        self._size += size
+        self._evict()
+
+    def render(self, key: str, value: BaseModel, schema: type[BaseModel]) -> bytes:
+        """
+        Возвращает JSON значения по схеме ответа schema.
+
+        Для значения, лежащего в кэше, JSON строится один раз и хранится
+        рядом с ним; schema может быть родительской моделью (проекция
+        публичных полей).
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not value:
+            return schema.__pydantic_serializer__.to_json(value)
+
+        views = entry[3]
+        if schema not in views:
+            views[schema] = schema.__pydantic_serializer__.to_json(value)
+            entry[2] += len(views[schema])
+            self._size += len(views[schema])
+            self._evict()
+        return views[schema]
+
+    def invalidate(self, key: str) -> None:
+        """Удаляет ключ из кэша."""
+        self._generation += 1
+        self._pop(key)
+        CACHE_LOCAL_BYTES.labels(self.namespace).set(self._size)
+
+    def clear(self) -> None:
+        """Очищает кэш целиком."""
+        self._generation += 1
+        self._entries.clear()
+        self._size = 0
+        CACHE_LOCAL_BYTES.labels(self.namespace).set(0)
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._pop(oldest)
+            CACHE_EVICTIONS.labels(self.namespace, "local", "size").inc()
+
+        CACHE_LOCAL_BYTES.labels(self.namespace).set(self._size)
+
+
+_local_caches: dict[str, LocalCache] = {}
+
+# Загрузки, выполняемые в этом процессе прямо сейчас: ключ -> future
+_inflight: dict[str, asyncio.Future] = {}
+# Фоновые обновления устаревших записей: ключ -> task
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+class Versioned(NamedTuple):
+    """Загруженный объект с версией сущности из БД (см. set_many)."""
+
+    value: BaseModel
+    version: int
+
+
+# Загрузчик возвращает None, если сущности нет
+Loader = Callable[[], Awaitable[BaseModel | Versioned | None]]
+
+
+def invalidate_local(key: str) -> None:
+    """Удаляет ключ вида "<namespace>:<id>" из локального кэша процесса."""
+    local = _local_caches.get(key.split(":", 1)[0])
+    if local is not None:
+        local.invalidate(key)
+
+
+def clear_local_caches() -> None:
+    """Очищает все локальные кэши процесса."""
+    for local in _local_caches.values():
+        local.clear()
+
+
+async def listen_invalidations(redis: Redis) -> None:
+    """
+    Слушает канал инвалидации и удаляет ключи из локальных кэшей.
+
+    Запускается фоновой задачей в lifespan каждого процесса. После
+    (пере)подписки локальные кэши очищаются: сообщения, отправленные
+    во время разрыва соединения, потеряны.
+    """
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                clear_local_caches()
+                async for message in pubsub.listen():
+                    invalidate_local(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except RedisError as e:
+            logger.warning(f"Подписка на инвалидацию кэша прервана: {e}")
+            await asyncio.sleep(1)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TWO-TIER CACHE
+# ═══════════════════════════════════════════════════════════════
+
+
+class TwoTierCache:
+    """
+    Локальный LRU процесса перед ключами Redis.
+
+    Значение в Redis хранится в бинарном конверте (см. app.core.codecs)
+    под ключом с префиксом кодека, например "j1:product:42". Логические
+    ключи ("product:42") используются локальным кэшем, блокировками
+    и каналом инвалидации.
+
+    После soft_expiry запись считается устаревшей, но еще отдается, пока
+    одна фоновая задача ее обновляет; hard TTL (EX ключа) ограничивает
+    возраст данных сверху. delta - длительность последней загрузки, нужна
+    для вероятностного раннего обновления (XFetch).
+
+    Отсутствие сущности кэшируется только в Redis значением NEGATIVE на
+    CACHE_NEGATIVE_TTL_SECONDS.
+
+    redis должен быть клиентом без decode_responses (get_redis_binary_client).
+
+    Экземпляр создается на запрос (вместе с сервисом), локальный уровень
+    общий для процесса.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        local: LocalCache,
+        model: type[BaseModel],
+        soft_ttl: int,
+        hard_ttl: int,
+        codec: EntryCodec = entry_codec,
+    ) -> None:
+        self.redis = redis
+        self.local = local
+        self.model = model
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.codec = codec
+        # generation локального кэша на момент промаха по ключу
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> Any | None:
+        """
+        Возвращает объект из локального кэша или Redis (даже устаревший).
+
+        None означает промах или закэшированное отсутствие.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        entry = await self._fetch(key)
+        return entry[0] if entry else None
+
+    async def get_or_load(self, key: str, loader: Loader) -> Any | None:
+        """
+        Возвращает объект из кэша, а при промахе загружает его один раз.
+
+        None означает, что сущности нет (результат тоже кэшируется).
+
+        Конкурентные промахи по одному ключу объединяются: внутри процесса
+        через общий future, между процессами через короткую блокировку
+        в Redis. Остальные ждут результата не дольше
+        CACHE_LOCK_TIMEOUT_SECONDS, после чего загружают сами.
+
+        Устаревшая (или выбранная XFetch) запись отдается сразу, а loader
+        запускается в фоне. Loader не должен использовать сессию БД запроса.
+
+        Исключения загрузчика (например, 404) получают все ожидающие
+        в этом процессе.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        entry = await self._fetch(key)
+        if entry is not None:
+            value, soft_expiry, delta = entry
+            if value is None:
+                CACHE_NEGATIVE_HITS.labels(self.local.namespace).inc()
+            elif self._should_refresh(soft_expiry, delta):
+                self._refresh_in_background(key, loader)
+            return value
+
+        timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            try:
+                value = await asyncio.wait_for(asyncio.shield(inflight), timeout)
+            except TimeoutError:
+                CACHE_LOADS.labels(self.local.namespace, "fallback").inc()
+                return await self._load(key, loader)
+            except asyncio.CancelledError:
+                # Отменен сам загрузчик (клиент отключился), а не мы
+                if not inflight.cancelled():
+                    raise
+                return await self._load(key, loader)
+            CACHE_LOADS.labels(self.local.namespace, "coalesced").inc()
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        # Исключение без ожидающих не должно попадать в лог asyncio
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        _inflight[key] = future
+        try:
+            value = await self._load_once(key, loader, timeout)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    async def get_or_load_json(
+        self, key: str, loader: Loader, schema: type[BaseModel] | None = None
+    ) -> bytes | None:
+        """
+        То же, что get_or_load, но возвращает готовый JSON ответа.
+
+        Позволяет отдавать закэшированные данные без повторной валидации
+        по response_model и сериализации в FastAPI.
+
+        Args:
+            key: Ключ.
+            loader: Загрузчик при промахе.
+            schema: Схема ответа (по умолчанию модель кэша).
+        """
+        value = await self.get_or_load(key, loader)
+        if value is None:
+            return None
+        return self.local.render(key, value, schema or self.model)
+
+    async def get_many(
+        self, keys: list[str], loaders: Callable[[str], Loader] | None = None
+    ) -> dict[str, Any]:
+        """
+        Возвращает найденные объекты: локальные попадания и один MGET.
+
+        Ключи с закэшированным отсутствием входят в результат со значением
+        None, ключей-промахов в результате нет.
+
+        Args:
+            keys: Ключи Redis.
+            loaders: Фабрика загрузчиков по ключу для фонового обновления
+                устаревших записей (без нее устаревшие записи просто
+                отдаются до hard TTL).
+        """
+        found = {}
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = value
+
+        missing = [key for key in keys if key not in found]
+        if not missing:
+            return found
+
+        generation = self.local.generation
+        raws = await self.redis.mget([self._redis_key(key) for key in missing])
+        for key, raw in zip(missing, raws):
+            entry = self._decode(key, raw)
+            if entry is None:
+                CACHE_REQUESTS.labels(self.local.namespace, "redis", "miss").inc()
+                self._generations[key] = generation
+                continue
+
+            CACHE_REQUESTS.labels(self.local.namespace, "redis", "hit").inc()
+            value, soft_expiry, delta, size, _ = entry
+            found[key] = value
+            if value is None:
+                CACHE_NEGATIVE_HITS.labels(self.local.namespace).inc()
+                continue
+
+            self.local.set(key, value, size, generation)
+            if loaders is not None and self._should_refresh(soft_expiry, delta):
+                self._refresh_in_background(key, loaders(key))
+
+        return found
+
+    async def missing(self, keys: list[str]) -> list[str]:
+        """Возвращает ключи, которых нет в Redis (без чтения значений)."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(self._redis_key(key))
+            exists = await pipe.execute()
+        return [key for key, found in zip(keys, exists) if not found]
+
+    async def set_missing(self, keys: list[str]) -> None:
+        """Кэширует отсутствие сущностей (только в Redis)."""
+        if not keys:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(
+                    self._redis_key(key),
+                    NEGATIVE,
+                    ex=settings.CACHE_NEGATIVE_TTL_SECONDS,
+                )
+            await pipe.execute()
+
+    async def set(
+        self, key: str, value: BaseModel | Versioned, delta: float = 0.0
+    ) -> None:
+        """Записывает объект в Redis и в локальный кэш (см. set_many)."""
+        await self.set_many({key: value}, delta)
+
+    async def set_many(
+        self, items: dict[str, BaseModel | Versioned], delta: float = 0.0
+    ) -> int:
+        """
+        Записывает загруженные объекты одним конвейером FILL_SCRIPT.
+
+        Объект, переданный как Versioned, не заменяет запись той же или
+        более новой версии от write_through: загрузка могла прочитать БД до
+        изменения, а завершиться после него. Пропущенные объекты не
+        попадают и в локальный кэш.
+
+        Args:
+            items: Объекты (или Versioned) по ключам.
+            delta: Длительность загрузки объектов в секундах (для XFetch).
+
+        Returns:
+            Число записанных объектов.
+        """
+        if not items:
+            return 0
+
+        versioned = {
+            key: item if isinstance(item, Versioned) else Versioned(item, 0)
+            for key, item in items.items()
+        }
+        soft_expiry = time.time() + self.soft_ttl
+        script = self.redis.register_script(FILL_SCRIPT)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            sizes = {}
+            for key, (value, version) in versioned.items():
+                raw, sizes[key] = self.codec.encode(value, soft_expiry, delta, version)
+                CACHE_REDIS_PAYLOAD.labels(self.local.namespace, "write").observe(
+                    len(raw)
+                )
+                await script(
+                    keys=[self._redis_key(key), VERSION_KEY.format(key)],
+                    args=[raw, version, self.hard_ttl],
+                    client=pipe,
+                )
+            written = await pipe.execute()
+
+        for (key, (value, _)), filled in zip(versioned.items(), written):
+            generation = self._generations.pop(key, self.local.generation)
+            if filled:
+                self.local.set(key, value, sizes[key], generation)
+        return sum(written)
+
+    async def write_through(self, key: str, value: BaseModel, version: int) -> bool:
+        """
+        Записывает свежее значение после изменения сущности вместо удаления.
+
+        Запись атомарна и условна (WRITE_THROUGH_SCRIPT): если в Redis уже
+        лежит значение с той же или более новой версией, например от
+        конкурентного writer-а, зафиксировавшего транзакцию позже, оно не
+        перезаписывается. Остальные процессы получают сообщение
+        инвалидации и перечитывают ключ из Redis, а не из БД.
+
+        Returns:
+            True, если значение записано.
+        """
+        raw, size = self.codec.encode(value, time.time() + self.soft_ttl, 0.0, version)
+        CACHE_REDIS_PAYLOAD.labels(self.local.namespace, "write").observe(len(raw))
+        redis_key = self._redis_key(key)
+        stale_keys = [
+            prefix + key for prefix in ALL_KEY_PREFIXES if prefix + key != redis_key
+        ]
+
+        script = self.redis.register_script(WRITE_THROUGH_SCRIPT)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            await script(
+                keys=[redis_key, VERSION_KEY.format(key), *stale_keys],
+                args=[raw, version, self.hard_ttl],
+                client=pipe,
+            )
+            pipe.publish(INVALIDATION_CHANNEL, key)
+            written, _ = await pipe.execute()
+
+        self.local.invalidate(key)
+        if written:
+            self.local.set(key, value, size, self.local.generation)
+        return bool(written)
+
+    async def invalidate(self, key: str) -> None:
+        """
+        Удаляет ключ из Redis и из локальных кэшей всех процессов.
+
+        Вызывается и при создании сущности: снимает закэшированное
+        отсутствие для ее ID. Удаляются ключи всех кодеков, чтобы процессы
+        со старым кодеком во время выкатки тоже не отдавали старые данные.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*(prefix + key for prefix in ALL_KEY_PREFIXES))
+            pipe.publish(INVALIDATION_CHANNEL, key)
+            await pipe.execute()
+        self.local.invalidate(key)
+
+    # ═══════════════════════════════════════════════════════════════
+    # LOADING
+    # ═══════════════════════════════════════════════════════════════
+
+    async def _load_once(
+        self, key: str, loader: Loader, timeout: float
+    ) -> BaseModel | None:
+        """Загружает объект под блокировкой Redis или ждет чужой загрузки."""
+        lock_key = LOCK_KEY.format(key)
+        token = secrets.token_hex(8)
+        deadline = time.monotonic() + timeout
+
+        while not await self.redis.set(
+            lock_key, token, nx=True, px=int(timeout * 1000)
+        ):
+            # Загружает другой процесс: ждем значения в Redis
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = self._decode(key, await self.redis.get(self._redis_key(key)))
+            if entry is not None:
+                CACHE_LOADS.labels(self.local.namespace, "waited").inc()
+                return entry[0]
+            if time.monotonic() >= deadline:
+                CACHE_LOADS.labels(self.local.namespace, "fallback").inc()
+                return await self._load(key, loader)
+
+        try:
+            return await self._load(key, loader)
+        finally:
+            await self._release_lock(lock_key, token)
+
+    async def _load(self, key: str, loader: Loader) -> BaseModel | None:
+        """Вызывает загрузчик и сохраняет результат в кэш."""
+        started = time.monotonic()
+        value = await loader()
+        if value is None:
+            await self.set_missing([key])
+        else:
+            await self.set(key, value, delta=time.monotonic() - started)
+        CACHE_LOADS.labels(self.local.namespace, "loaded").inc()
+        return value.value if isinstance(value, Versioned) else value
+
+    async def _refresh(self, key: str, loader: Loader) -> None:
+        """Обновляет устаревшую запись, если ее не обновляет другой процесс."""
+        lock_key = LOCK_KEY.format(key)
+        token = secrets.token_hex(8)
+        timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
+        if not await self.redis.set(lock_key, token, nx=True, px=int(timeout * 1000)):
+            return
+
+        try:
+            await self._load(key, loader)
+            CACHE_LOADS.labels(self.local.namespace, "refreshed").inc()
+        except Exception:  # noqa: BLE001
+            # Задача фоновая: ошибку загрузчика некому передать
+            logger.exception(f"Фоновое обновление {key} не удалось")
+        finally:
+            await self._release_lock(lock_key, token)
+
+    def _refresh_in_background(self, key: str, loader: Loader) -> None:
+        """Запускает не более одного фонового обновления ключа на процесс."""
+        if key in _refreshing:
+            return
+
+        task = asyncio.create_task(self._refresh(key, loader))
+        _refreshing[key] = task
+        task.add_done_callback(lambda _: _refreshing.pop(key, None))
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        release = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        await release(keys=[lock_key], args=[token])
+
+    # ═══════════════════════════════════════════════════════════════
+    # ENVELOPE
+    # ═══════════════════════════════════════════════════════════════
+
+    def _redis_key(self, key: str) -> str:
+        return self.codec.key_prefix + key
+
+    async def _fetch(self, key: str) -> tuple[Any, float, float] | None:
+        """Читает конверт из Redis и кладет значение в локальный кэш."""
+        generation = self.local.generation
+        entry = self._decode(key, await self.redis.get(self._redis_key(key)))
+        if entry is None:
+            CACHE_REQUESTS.labels(self.local.namespace, "redis", "miss").inc()
+            self._generations[key] = generation
+            return None
+
+        CACHE_REQUESTS.labels(self.local.namespace, "redis", "hit").inc()
+        value, soft_expiry, delta, size, _ = entry
+        if value is not None:
+            self.local.set(key, value, size, generation)
+        return value, soft_expiry, delta
+
+    def _decode(
+        self, key: str, raw: bytes | None
+    ) -> tuple[Any, float, float, int, int] | None:
+        """
+        Разбирает конверт: (значение или None для NEGATIVE, soft_expiry,
+        delta, размер, версия). Нечитаемая запись (например, после изменения схемы
+        модели) считается промахом.
+        """
+        if raw is None:
+            return None
+        try:
+            return self.codec.decode(self.model, raw)
+        except DECODE_ERRORS as e:
+            logger.warning(f"Не удалось прочитать запись кэша {key}: {e}")
+            return None
+
+    @staticmethod
+    def _should_refresh(soft_expiry: float, delta: float) -> bool:
+        """
+        XFetch: запись обновляется заранее с вероятностью, растущей
+        по мере приближения к soft_expiry и с длительностью загрузки.
+        """
+        beta = settings.CACHE_XFETCH_BETA
+        gap = -delta * beta * math.log(1.0 - random.random())
+        return time.time() + gap >= soft_expiry
+
+
+# ═══════════════════════════════════════════════════════════════
+# TAGS
+# ═══════════════════════════════════════════════════════════════
+
+GENERATION_KEY = "gen:{}"
+
+
+class CacheTags:
+    """
+    Инвалидация производных представлений по тегам (поколениям).
+
+    Каждый тег (например, "seller:5") - счетчик gen:<tag> в Redis.
+    Ключ представления включает текущие номера поколений своих тегов,
+    поэтому INCR тега одним действием делает недостижимыми все ключи,
+    построенные на нем: без KEYS/SCAN, старые ключи истекают по TTL.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def key(self, base: str, *tags: str) -> str:
+        """Строит ключ представления с текущими поколениями тегов."""
+        versions = await self.redis.mget([GENERATION_KEY.format(t) for t in tags])
+        suffix = ",".join(
+            f"{tag}={int(version or 0)}" for tag, version in zip(tags, versions)
+        )
+        return f"{base}@{suffix}"
+
+    async def bump(self, *tags: str) -> None:
+        """Инвалидирует все представления с этими тегами."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(GENERATION_KEY.format(tag))
+            await pipe.execute()
+
+
+# ═══════════════════════════════════════════════════════════════
+# NAMESPACES
+# ═══════════════════════════════════════════════════════════════
+
+product_local_cache = LocalCache(
+    "product",
+    max_bytes=settings.LOCAL_CACHE_PRODUCTS_MAX_MB * 1024 * 1024,
+    ttl=settings.LOCAL_CACHE_TTL_SECONDS,
+)
+user_local_cache = LocalCache(
+    "user",
+    max_bytes=settings.LOCAL_CACHE_USERS_MAX_MB * 1024 * 1024,
+    ttl=settings.LOCAL_CACHE_TTL_SECONDS,
+)
+catalog_local_cache = LocalCache(
+    "catalog",
+    max_bytes=settings.LOCAL_CACHE_CATALOG_MAX_MB * 1024 * 1024,
+    ttl=settings.LOCAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,199 @@
+# app/core/cache_metrics.py
+"""Метрики обращений к Redis: попадания, задержки, размеры и горячие ключи."""
+
+import heapq
+import random
+import time
+from operator import itemgetter
+
+from prometheus_client import Counter, Histogram
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from app.core.codecs import CODECS
+from app.core.config import settings
+
+# ═══════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════
+
+CACHE_REDIS_READS = Counter(
+    "cache_redis_reads_total",
+    "GET/MGET lookups in Redis by key namespace and result (hit or miss)",
+    ["namespace", "result"],
+)
+CACHE_REDIS_LATENCY = Histogram(
+    "cache_redis_latency_seconds",
+    "Redis round-trip time by command (or pipeline) and key namespace",
+    ["command", "namespace"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+CACHE_REDIS_PAYLOAD = Histogram(
+    "cache_redis_payload_bytes",
+    "Size of values read from (hits) and written to Redis",
+    ["namespace", "op"],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+
+# Префиксы кодеков ("j1:product:42"): пространство имен берется после них
+CODEC_PREFIXES = {codec.name for codec in CODECS.values()}
+
+# Команды, у которых первый аргумент не ключ
+KEYLESS_COMMANDS = {"SCRIPT LOAD", "SCRIPT EXISTS", "PING", "INFO", "HELLO"}
+
+# Сколько ключей отслеживает выборка горячих ключей
+HOT_KEYS_CAPACITY = 1000
+
+
+def key_namespace(key: str | bytes) -> str:
+    """Пространство имен ключа: "j1:product:42" -> "product"."""
+    if isinstance(key, bytes):
+        key = key.decode(errors="replace")
+    namespace, _, rest = key.partition(":")
+    if namespace in CODEC_PREFIXES and rest:
+        namespace = rest.partition(":")[0]
+    return namespace
+
+
+def command_namespace(args: tuple) -> str:
+    """Пространство имен первого ключа команды ("-" для команд без ключей)."""
+    if args[0] in ("EVAL", "EVALSHA"):
+        # EVALSHA sha numkeys key1 ...
+        return key_namespace(args[3]) if len(args) > 3 and int(args[2]) else "-"
+    if (
+        args[0] in KEYLESS_COMMANDS
+        or len(args) < 2
+        or not isinstance(args[1], (str, bytes))
+    ):
+        return "-"
+    return key_namespace(args[1])
+
+
+def _size(value) -> int:
+    return len(value) if isinstance(value, (str, bytes)) else 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# HOT KEYS
+# ═══════════════════════════════════════════════════════════════
+
+
+class HotKeys:
+    """
+    Приблизительный top-K самых читаемых ключей по выборке чтений.
+
+    Учитывается доля sample_rate чтений. При переполнении остается более
+    популярная половина ключей с уполовиненными счетчиками, так что ключи,
+    переставшие быть горячими, со временем вытесняются.
+
+    Ключи не попадают в метки метрик (число рядов росло бы без границ):
+    top-K отдается администраторам через GET /admin/cache/hot-keys.
+    Выборка своя у каждого процесса приложения.
+    """
+
+    def __init__(self, capacity: int, top_k: int, sample_rate: float) -> None:
+        self.capacity = capacity
+        self.top_k = top_k
+        self.sample_rate = sample_rate
+        self._counts: dict[str, float] = {}
+
+    def record(self, key: str | bytes) -> None:
+        """Учитывает чтение ключа (с вероятностью sample_rate)."""
+        if random.random() >= self.sample_rate:
+            return
+
+        if isinstance(key, bytes):
+            key = key.decode(errors="replace")
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if len(self._counts) > self.capacity:
+            survivors = heapq.nlargest(
+                self.capacity // 2, self._counts.items(), key=itemgetter(1)
+            )
+            self._counts = {k: count / 2 for k, count in survivors}
+
+    def top(self) -> list[tuple[str, float]]:
+        """top_k ключей с оценкой числа чтений (с учетом выборки)."""
+        top = heapq.nlargest(self.top_k, self._counts.items(), key=itemgetter(1))
+        return [(key, count / self.sample_rate) for key, count in top]
+
+
+hot_keys = HotKeys(
+    HOT_KEYS_CAPACITY,
+    top_k=settings.CACHE_HOT_KEYS_TOP_K,
+    sample_rate=settings.CACHE_HOT_KEYS_SAMPLE_RATE,
+)
+
+
+# ═══════════════════════════════════════════════════════════════
+# INSTRUMENTED CLIENT
+# ═══════════════════════════════════════════════════════════════
+
+
+def _record(args: tuple, result, namespace: str) -> None:
+    """Учитывает попадания, промахи и размеры значений команды."""
+    command = args[0]
+    if command == "GET":
+        _record_read(args[1], result, namespace)
+    elif command == "MGET":
+        for key, value in zip(args[1:], result):
+            _record_read(key, value, key_namespace(key))
+    elif command == "SET":
+        # Значения, записанные Lua-скриптами (FILL_SCRIPT, WRITE_THROUGH_SCRIPT),
+        # учитывает сам TwoTierCache
+        CACHE_REDIS_PAYLOAD.labels(namespace, "write").observe(_size(args[2]))
+
+
+def _record_read(key: str | bytes, value, namespace: str) -> None:
+    hot_keys.record(key)
+    if value is None:
+        CACHE_REDIS_READS.labels(namespace, "miss").inc()
+        return
+
+    CACHE_REDIS_READS.labels(namespace, "hit").inc()
+    CACHE_REDIS_PAYLOAD.labels(namespace, "read").observe(_size(value))
+
+
+class InstrumentedRedis(Redis):
+    """
+    Клиент Redis, записывающий метрики для каждой команды и конвейера.
+
+    Используется для глобальных клиентов (app.core.redis), поэтому любой
+    кэш, получающий клиента через get_redis_client/get_redis_binary_client,
+    измеряется без дополнительного кода.
+    """
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        result = await super().execute_command(*args, **options)
+        namespace = command_namespace(args)
+        CACHE_REDIS_LATENCY.labels(args[0].lower(), namespace).observe(
+            time.perf_counter() - started
+        )
+        _record(args, result, namespace)
+        return result
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: str | None = None
+    ) -> "InstrumentedPipeline":
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedPipeline(Pipeline):
+    """Конвейер: задержка измеряется на весь round trip, остальное по командам."""
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        stack = [args for args, _ in self.command_stack]
+        started = time.perf_counter()
+        results = await super().execute(raise_on_error)
+        if not stack:
+            return results
+
+        CACHE_REDIS_LATENCY.labels("pipeline", command_namespace(stack[0])).observe(
+            time.perf_counter() - started
+        )
+        for args, result in zip(stack, results):
+            if not isinstance(result, Exception):
+                _record(args, result, command_namespace(args))
+        return results
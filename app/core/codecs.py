@@ -0,0 +1,188 @@
+# app/core/codecs.py
+"""Кодеки записей кэша: сериализация, сжатие и бинарный конверт."""
+
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import msgpack
+except ImportError:  # опциональная зависимость (extra cache)
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # опциональная зависимость (extra cache)
+    zstandard = None
+
+# ═══════════════════════════════════════════════════════════════
+# SERIALIZERS
+# ═══════════════════════════════════════════════════════════════
+
+
+class CacheCodec(ABC):
+    """
+    Сериализатор pydantic-моделей в байты.
+
+    name входит в префикс ключа Redis: смена кодека или формата дает новые
+    ключи, поэтому процессы со старым и новым кодеком не читают чужие записи.
+    """
+
+    name: str
+
+    @abstractmethod
+    def dumps(self, value: BaseModel) -> bytes:
+        """Сериализует модель в байты."""
+
+    @abstractmethod
+    def loads(self, model: type[BaseModel], data: bytes) -> BaseModel:
+        """Восстанавливает модель model из байтов."""
+
+
+class JsonCodec(CacheCodec):
+    """JSON через pydantic-core: байты без промежуточной str."""
+
+    name = "j1"
+
+    def dumps(self, value: BaseModel) -> bytes:
+        return value.__pydantic_serializer__.to_json(value)
+
+    def loads(self, model: type[BaseModel], data: bytes) -> BaseModel:
+        return model.model_validate_json(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack (нужен пакет msgpack: extra cache)."""
+
+    name = "m1"
+
+    def dumps(self, value: BaseModel) -> bytes:
+        return msgpack.packb(value.model_dump(mode="json"))
+
+    def loads(self, model: type[BaseModel], data: bytes) -> BaseModel:
+        return model.model_validate(msgpack.unpackb(data))
+
+
+CODECS: dict[str, type[CacheCodec]] = {"json": JsonCodec, "msgpack": MsgpackCodec}
+
+
+def get_codec(name: str) -> CacheCodec:
+    """Возвращает кодек по имени из настроек."""
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec: {name}")
+    if name == "msgpack" and msgpack is None:
+        raise RuntimeError("CACHE_CODEC=msgpack requires the msgpack package")
+    return CODECS[name]()
+
+
+# ═══════════════════════════════════════════════════════════════
+# COMPRESSION
+# ═══════════════════════════════════════════════════════════════
+
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+FLAG_VERSIONED = 0x04
+FLAG_NEGATIVE = 0x80
+
+
+def compress(payload: bytes, method: str) -> tuple[bytes, int]:
+    """Сжимает payload, если он больше CACHE_COMPRESS_MIN_BYTES."""
+    if method == "none" or len(payload) < settings.CACHE_COMPRESS_MIN_BYTES:
+        return payload, 0
+    if method == "zstd":
+        if zstandard is None:
+            raise RuntimeError("CACHE_COMPRESSION=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3).compress(payload), FLAG_ZSTD
+    return zlib.compress(payload, 1), FLAG_ZLIB
+
+
+def decompress(payload: bytes, flags: int) -> bytes:
+    """Распаковывает payload по флагам конверта."""
+    if flags & FLAG_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd-compressed entry, but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if flags & FLAG_ZLIB:
+        return zlib.decompress(payload)
+    return payload
+
+
+# ═══════════════════════════════════════════════════════════════
+# ENVELOPE
+# ═══════════════════════════════════════════════════════════════
+#
+# [flags: u8][soft_expiry: f64][delta: f32][version: u64][payload]
+# version есть только при FLAG_VERSIONED.
+# Отсутствующая сущность: один байт FLAG_NEGATIVE.
+
+HEADER = struct.Struct("!Bdf")
+VERSION = struct.Struct("!Q")
+NEGATIVE = bytes([FLAG_NEGATIVE])
+
+# Ошибки разбора поврежденного конверта или записи под старую схему модели
+# (ValidationError pydantic и большая часть ошибок msgpack - это ValueError)
+DECODE_ERRORS: tuple[type[Exception], ...] = (
+    ValueError,
+    struct.error,
+    zlib.error,
+    *((msgpack.UnpackException,) if msgpack is not None else ()),
+    *((zstandard.ZstdError,) if zstandard is not None else ()),
+)
+
+
+class EntryCodec:
+    """Упаковывает значение кэша вместе с soft_expiry и delta."""
+
+    def __init__(self, codec: CacheCodec, compression: str) -> None:
+        self.codec = codec
+        self.compression = compression
+        self.key_prefix = f"{codec.name}:"
+
+    def encode(
+        self, value: BaseModel, soft_expiry: float, delta: float, version: int = 0
+    ) -> tuple[bytes, int]:
+        """
+        Возвращает (конверт, размер несжатого payload).
+
+        version - версия сущности (0, если неизвестна); хранится в конверте,
+        а не в полях модели, чтобы не попадать в ответы API.
+        """
+        payload = self.codec.dumps(value)
+        compressed, flags = compress(payload, self.compression)
+        if not version:
+            return HEADER.pack(flags, soft_expiry, delta) + compressed, len(payload)
+
+        header = HEADER.pack(flags | FLAG_VERSIONED, soft_expiry, delta)
+        return header + VERSION.pack(version) + compressed, len(payload)
+
+    def decode(
+        self, model: type[BaseModel], raw: bytes
+    ) -> tuple[Any, float, float, int, int]:
+        """
+        Возвращает (значение или None для NEGATIVE, soft_expiry, delta,
+        размер несжатого payload, версия или 0).
+        """
+        if raw == NEGATIVE:
+            return None, float("inf"), 0.0, 0, 0
+
+        flags, soft_expiry, delta = HEADER.unpack_from(raw)
+        offset, version = HEADER.size, 0
+        if flags & FLAG_VERSIONED:
+            (version,) = VERSION.unpack_from(raw, offset)
+            offset += VERSION.size
+        payload = decompress(raw[offset:], flags)
+        value = self.codec.loads(model, payload)
+        return value, soft_expiry, delta, len(payload), version
+
+
+entry_codec = EntryCodec(get_codec(settings.CACHE_CODEC), settings.CACHE_COMPRESSION)
+
+# Префиксы всех форматов, под которыми может лежать ключ (и ключ без
+# префикса из прежнего формата): инвалидация удаляет их все, чтобы во время
+# выкатки процессы с другим кодеком не отдавали устаревшие данные.
+ALL_KEY_PREFIXES = ["", *(f"{codec.name}:" for codec in CODECS.values())]
@@ -1,7 +1,12 @@
 # app/core/jwt_service.py
 """Сервис управления JWT токенами."""
 
+import hashlib
+import hmac
+import secrets
+import time
 import uuid
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
 from enum import Enum
 
@@ -9,6 +14,7 @@ import jwt
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import PyJWTError
 from loguru import logger
+from prometheus_client import Counter
 from redis.asyncio import Redis
 
 from app.core.config import settings
@@ -16,6 +22,94 @@ from app.core.schemas import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+ACCESS_TOKEN_CACHE_REQUESTS = Counter(
+    "access_token_cache_requests_total",
+    "Access token checks answered by the in-process cache (hit) or jwt.decode",
+    ["result"],
+)
+REFRESH_TOKEN_ROTATIONS = Counter(
+    "refresh_token_rotations_total",
+    "Refresh token rotations: rotated, invalid, concurrent (lost a race "
+    "within the grace window) or reused (already rotated token presented)",
+    ["result"],
+)
+
+REFRESH_TOKEN_KEY = "refresh_token:{}"
+REFRESH_TOKEN_USED_KEY = "refresh_token_used:{}"
+# Активные сессии пользователя: ZSET jti -> время истечения токена
+USER_SESSIONS_KEY = "user_sessions:{}"
+
+# Общая часть скриптов создания и ротации: удаляет истекшие jti из индекса
+# сессий, отзывает самые старые сессии сверх лимита и продлевает TTL
+# индекса до истечения самого позднего токена.
+# Ожидает локальные переменные sessions, now, limit.
+TRIM_SESSIONS_LUA = """
+redis.call("ZREMRANGEBYSCORE", sessions, "-inf", now)
+local excess = redis.call("ZCARD", sessions) - limit
+if excess > 0 then
+    local oldest = redis.call("ZPOPMIN", sessions, excess)
+    for i = 1, #oldest, 2 do
+        redis.call("DEL", "refresh_token:" .. oldest[i])
+    end
+end
+local last = redis.call("ZRANGE", sessions, -1, -1, "WITHSCORES")
+if last[2] then
+    redis.call("EXPIREAT", sessions, math.ceil(tonumber(last[2])))
+end
+"""
+
+# Регистрация нового refresh токена.
+# KEYS: refresh_token:<jti>, user_sessions:<user_id>
+# ARGV: user_id, TTL, текущее время, jti, лимит сессий
+CREATE_REFRESH_TOKEN_SCRIPT = (
+    """
+local sessions, now, limit = KEYS[2], tonumber(ARGV[3]), tonumber(ARGV[5])
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+redis.call("ZADD", sessions, now + tonumber(ARGV[2]), ARGV[4])
+"""
+    + TRIM_SESSIONS_LUA
+)
+
+# Ротация refresh токена за один round trip.
+# KEYS: refresh_token:<old jti>, refresh_token_used:<old jti>,
+#       refresh_token:<new jti>, user_sessions:<user_id>
+# ARGV: user_id, TTL нового токена, оставшийся TTL старого, текущее время,
+#       старый jti, новый jti, лимит сессий
+# Возвращает 1 при успехе, время ротации, если старый токен уже был
+# обменян (повторное использование), иначе 0.
+ROTATE_REFRESH_TOKEN_SCRIPT = (
+    """
+local sessions, now, limit = KEYS[4], tonumber(ARGV[4]), tonumber(ARGV[7])
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("SET", KEYS[2], ARGV[4], "EX", ARGV[3])
+    redis.call("SET", KEYS[3], ARGV[1], "EX", ARGV[2])
+    redis.call("ZREM", sessions, ARGV[5])
+    redis.call("ZADD", sessions, now + tonumber(ARGV[2]), ARGV[6])
+"""
+    + TRIM_SESSIONS_LUA
+    + """
+    return 1
+end
+local rotated_at = redis.call("GET", KEYS[2])
+if rotated_at then
+    return rotated_at
+end
+return 0
+"""
+)
+
+# Отзыв всех сессий пользователя: O(число его сессий).
+# KEYS: user_sessions:<user_id>. Возвращает число отозванных токенов.
+REVOKE_SESSIONS_SCRIPT = """
+local jtis = redis.call("ZRANGE", KEYS[1], 0, -1)
+for _, jti in ipairs(jtis) do
+    redis.call("DEL", "refresh_token:" .. jti)
+end
+redis.call("DEL", KEYS[1])
+return #jtis
+"""
+
 
 class TokenType(str, Enum):
     """Типы JWT токенов."""
@@ -24,6 +118,59 @@ class TokenType(str, Enum):
     REFRESH = "refresh"
 
 
+class AccessTokenCache:
+    """
+    Ограниченный LRU-кэш проверенных access токенов внутри процесса.
+
+    Ключ - HMAC-SHA256 токена на случайном секрете процесса: сами токены
+    в памяти не хранятся, а подобрать токен под чужую запись нельзя. Полный
+    digest сравнивается за постоянное время. Запись живет до exp токена:
+    access токены не отзываются, поэтому кэш не меняет результат проверки.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._secret = secrets.token_bytes(32)
+        # первые 16 байт digest -> (digest, exp, данные токена)
+        self._entries: OrderedDict[bytes, tuple[bytes, float, TokenData]] = (
+            OrderedDict()
+        )
+
+    def get(self, token: str) -> TokenData | None:
+        """Возвращает данные проверенного и еще не истекшего токена."""
+        digest = self._digest(token)
+        entry = self._entries.get(digest[:16])
+        if entry is None or not hmac.compare_digest(entry[0], digest):
+            return None
+
+        if entry[1] <= time.time():
+            del self._entries[digest[:16]]
+            return None
+
+        self._entries.move_to_end(digest[:16])
+        return entry[2]
+
+    def set(self, token: str, exp: float, data: TokenData) -> None:
+        """Запоминает проверенный токен до exp (Unix time)."""
+        if self.max_entries <= 0:
+            return
+
+        digest = self._digest(token)
+        self._entries[digest[:16]] = (digest, exp, data)
+        self._entries.move_to_end(digest[:16])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _digest(self, token: str) -> bytes:
+        return hmac.new(self._secret, token.encode(), hashlib.sha256).digest()
+
+
+access_token_cache = AccessTokenCache(settings.ACCESS_TOKEN_CACHE_MAX_ENTRIES)
+
+
 class JWTService:
     """Сервис для создания, проверки и управления JWT токенами."""
 
@@ -57,39 +204,140 @@ class JWTService:
         self, data: dict, expires_delta: timedelta | None = None
     ) -> str:
         """Создает refresh JWT токен и сохраняет его в Redis."""
-        to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
+        encoded_jwt, token_jti, ttl_seconds = self._encode_refresh_token(
+            data, expires_delta
+        )
+
+        if self.redis and ttl_seconds > 0:
+            user_id = str(data.get("sub"))
+            create = self.redis.register_script(CREATE_REFRESH_TOKEN_SCRIPT)
+            await create(
+                keys=[
+                    REFRESH_TOKEN_KEY.format(token_jti),
+                    USER_SESSIONS_KEY.format(user_id),
+                ],
+                args=[
+                    user_id,
+                    ttl_seconds,
+                    time.time(),
+                    token_jti,
+                    settings.MAX_SESSIONS_PER_USER,
+                ],
+            )
+
+        return encoded_jwt
+
+    async def rotate_refresh_token(self, token: str) -> tuple[TokenData, str] | None:
+        """
+        Обменивает refresh токен на новый атомарно (один скрипт Redis).
+
+        Токен декодируется один раз. Старый jti удаляется и помечается как
+        использованный до конца своего срока, новый регистрируется. Из
+        нескольких одновременных обменов одного токена успешен только один.
+        Предъявление уже обмененного токена позже
+        REFRESH_TOKEN_REUSE_GRACE_SECONDS считается повторным
+        использованием (возможная кража токена): попадает в лог и метрики,
+        а все сессии пользователя отзываются.
+
+        Returns:
+            (данные токена, новый refresh токен) или None, если обмен
+            невозможен.
+        """
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except PyJWTError as e:
+            logger.warning(f"JWT Error: {e}")
+            REFRESH_TOKEN_ROTATIONS.labels("invalid").inc()
+            return None
+
+        user_id: str | None = payload.get("sub")
+        jti: str | None = payload.get("jti")
+        if (
+            user_id is None
+            or jti is None
+            or payload.get("token_type") != TokenType.REFRESH
+        ):
+            REFRESH_TOKEN_ROTATIONS.labels("invalid").inc()
+            return None
+
+        new_token, new_jti, ttl_seconds = self._encode_refresh_token({"sub": user_id})
+        now = time.time()
+        rotate = self.redis.register_script(ROTATE_REFRESH_TOKEN_SCRIPT)
+        result = await rotate(
+            keys=[
+                REFRESH_TOKEN_KEY.format(jti),
+                REFRESH_TOKEN_USED_KEY.format(jti),
+                REFRESH_TOKEN_KEY.format(new_jti),
+                USER_SESSIONS_KEY.format(user_id),
+            ],
+            args=[
+                user_id,
+                ttl_seconds,
+                max(1, int(payload["exp"] - now)),
+                now,
+                jti,
+                new_jti,
+                settings.MAX_SESSIONS_PER_USER,
+            ],
+        )
+
+        if result == 1:
+            REFRESH_TOKEN_ROTATIONS.labels("rotated").inc()
+            return TokenData(id=user_id), new_token
+
+        if not result:
+            logger.warning("Токен не найден в Redis.")
+            REFRESH_TOKEN_ROTATIONS.labels("invalid").inc()
+        elif now - float(result) <= settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS:
+            logger.debug(f"Параллельный обмен refresh токена {jti}")
+            REFRESH_TOKEN_ROTATIONS.labels("concurrent").inc()
         else:
-            expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(
-                days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+            # Токен мог быть украден: отзываем все сессии пользователя
+            revoked = await self.revoke_all_sessions(int(user_id))
+            logger.warning(
+                f"Повторное использование refresh токена {jti} "
+                f"пользователя {user_id}: токен уже был обменян, "
+                f"отозвано сессий: {revoked}"
             )
+            REFRESH_TOKEN_ROTATIONS.labels("reused").inc()
+        return None
 
-        token_jti = str(uuid.uuid4())
-        user_id = str(data.get("sub"))
+    def _encode_refresh_token(
+        self, data: dict, expires_delta: timedelta | None = None
+    ) -> tuple[str, str, int]:
+        """Кодирует refresh токен: (токен, jti, TTL в секундах)."""
+        to_encode = data.copy()
+        if expires_delta is None:
+            expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
 
+        token_jti = str(uuid.uuid4())
         to_encode.update(
             {"exp": expire, "token_type": TokenType.REFRESH, "jti": token_jti}
         )
         encoded_jwt: str = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
         )
-
-        if self.redis:
-            current_time = datetime.now(UTC).replace(tzinfo=None)
-            ttl_seconds = int((expire - current_time).total_seconds())
-
-            if ttl_seconds > 0:
-                await self.redis.set(
-                    name=f"refresh_token:{token_jti}", value=user_id, ex=ttl_seconds
-                )
-
-        return encoded_jwt
+        return encoded_jwt, token_jti, int(expires_delta.total_seconds())
 
     async def verify_token(
         self, token: str, expected_token_type: TokenType
     ) -> TokenData | None:
-        """Проверяет валидность и тип JWT токена."""
+        """
+        Проверяет валидность и тип JWT токена.
+
+        Access токены, уже проверенные этим процессом, берутся из
+        access_token_cache без повторного jwt.decode.
+        """
+        if expected_token_type == TokenType.ACCESS:
+            cached = access_token_cache.get(token)
+            if cached is not None:
+                ACCESS_TOKEN_CACHE_REQUESTS.labels("hit").inc()
+                return cached
+            ACCESS_TOKEN_CACHE_REQUESTS.labels("miss").inc()
+
         try:
             payload = jwt.decode(
                 token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -107,13 +355,16 @@ class JWTService:
                         logger.warning("Не получилось получить jti у Refresh токена.")
                         return None
 
-                    is_active = await self.redis.get(f"refresh_token:{jti}")
+                    is_active = await self.redis.get(REFRESH_TOKEN_KEY.format(jti))
 
                     if not is_active:
                         logger.warning("Токен не найден в Redis.")
                         return None
 
-            return TokenData(id=user_id)
+            token_data = TokenData(id=user_id)
+            if expected_token_type == TokenType.ACCESS and "exp" in payload:
+                access_token_cache.set(token, payload["exp"], token_data)
+            return token_data
 
         except PyJWTError as e:
             logger.warning(f"JWT Error: {e}")
@@ -136,7 +387,10 @@ class JWTService:
             jti: str | None = payload.get("jti")
 
             if jti:
-                await self.redis.delete(f"refresh_token:{jti}")
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(REFRESH_TOKEN_KEY.format(jti))
+                    pipe.zrem(USER_SESSIONS_KEY.format(payload.get("sub")), jti)
+                    await pipe.execute()
                 logger.info(f"Refresh токен: {jti} был успешно удален.")
             else:
                 logger.warning("Не получилось получить jti у Refresh токена.")
@@ -145,3 +399,34 @@ class JWTService:
         except PyJWTError as e:
             logger.warning(f"JWT Error: {e}")
             return None
+
+    async def revoke_all_sessions(self, user_id: int) -> int:
+        """
+        Отзывает все refresh токены пользователя (выход со всех устройств).
+
+        Работает по индексу сессий user_sessions:<user_id> без SCAN.
+        Выданные access токены остаются действительными до своего exp.
+
+        Returns:
+            Число отозванных токенов.
+        """
+        revoke = self.redis.register_script(REVOKE_SESSIONS_SCRIPT)
+        revoked = await revoke(keys=[USER_SESSIONS_KEY.format(user_id)])
+        logger.info(f"Отозваны все сессии пользователя {user_id}: {revoked}")
+        return revoked
+
+    async def revoke_sessions(self, user_ids: list[int]) -> dict[int, int]:
+        """
+        Отзывает все сессии нескольких пользователей одним конвейером.
+
+        Returns:
+            Число отозванных токенов по ID пользователя.
+        """
+        revoke = self.redis.register_script(REVOKE_SESSIONS_SCRIPT)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                await revoke(keys=[USER_SESSIONS_KEY.format(user_id)], client=pipe)
+            revoked = await pipe.execute()
+
+        logger.info(f"Отозваны сессии пользователей {user_ids}: {sum(revoked)}")
+        return dict(zip(user_ids, revoked))
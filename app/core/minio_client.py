@@ -1,19 +1,92 @@
 # app/core/minio_client.py
-"""Клиент для работы с MinIO хранилищем файлов."""
+"""
+Клиент для работы с MinIO хранилищем файлов.
+
+Запросы к MinIO выполняются напрямую из цикла событий: общая для процесса
+aiohttp.ClientSession держит пул keep-alive соединений (MINIO_MAX_CONNECTIONS),
+запросы подписываются AWS Signature V4 функциями SDK minio. Число
+одновременных операций с хранилищем не ограничено пулом потоков, и
+вызов не передается в поток. SDK используется только для проверки
+бакетов при старте и для локальной подписи presigned URL и форм.
+"""
 
 import asyncio
-from datetime import timedelta
-from io import BytesIO
-from pathlib import Path
+import hashlib
+import json
+import time
 import uuid
+import xml.etree.ElementTree as ET
+from collections.abc import Mapping
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+from urllib.parse import urlsplit
 
+import aiohttp
 from loguru import logger
 from minio import Minio
+from minio.credentials import Credentials
+from minio.datatypes import PostPolicy
 from minio.error import S3Error
-
+from minio.helpers import md5sum_hash, queryencode, quote, sha256_hash
+from minio.signer import sign_v4_s3
+from minio.time import from_http_header, from_iso8601utc, to_amz_date
+from prometheus_client import Histogram
+from yarl import URL
 
 from app.core.config import settings
 
+MINIO_REQUEST_DURATION = Histogram(
+    "minio_request_duration_seconds",
+    "Duration of S3 requests to MinIO",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+# Данные объектов не хешируются для подписи: SHA-256 частей по несколько
+# МБ занимал бы цикл событий
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+# DeleteObjects принимает не больше 1000 ключей за запрос
+DELETE_BATCH_SIZE = 1000
+
+
+class HashingReader:
+    """
+    Обертка над потоком, считающая размер и SHA-256 прочитанных данных.
+
+    MinIOClient читает из нее кусками по part_size, поэтому хеш вычисляется
+    на лету без загрузки файла в память целиком.
+    """
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.size += len(data)
+        self._sha256.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """SHA-256 прочитанных данных."""
+        return self._sha256.hexdigest()
+
+
+class S3Response(NamedTuple):
+    """Ответ MinIO."""
+
+    headers: Mapping[str, str]
+    content: bytes
+    status: int = 200
+    # Путь запроса (resource в S3Error)
+    resource: str = ""
+
 
 class MinIOClient:
     """Клиент для управления файлами в MinIO."""
@@ -25,7 +98,24 @@ class MinIOClient:
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
+            region=settings.MINIO_REGION,
+        )
+        protocol = "https" if settings.MINIO_SECURE else "http"
+        self.base_url = f"{protocol}://{settings.MINIO_ENDPOINT}"
+        self._credentials = Credentials(
+            settings.MINIO_ACCESS_KEY, settings.MINIO_SECRET_KEY
+        )
+        self._request_timeout = aiohttp.ClientTimeout(
+            total=settings.MINIO_REQUEST_TIMEOUT_SECONDS,
+            connect=settings.MINIO_POOL_TIMEOUT_SECONDS,
+            sock_connect=settings.MINIO_CONNECT_TIMEOUT_SECONDS,
         )
+        self._transfer_timeout = aiohttp.ClientTimeout(
+            total=settings.MINIO_TRANSFER_TIMEOUT_SECONDS,
+            connect=settings.MINIO_POOL_TIMEOUT_SECONDS,
+            sock_connect=settings.MINIO_CONNECT_TIMEOUT_SECONDS,
+        )
+        self._http: aiohttp.ClientSession | None = None
         self._ensure_bucket_exists()
 
     def _ensure_bucket_exists(self):
@@ -40,43 +130,456 @@ class MinIOClient:
             logger.error(f"MinIO error: {e}")
             raise
 
+    @property
+    def http(self) -> aiohttp.ClientSession:
+        """HTTP-сессия с пулом соединений, создается при первом запросе."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.MINIO_MAX_CONNECTIONS,
+                    keepalive_timeout=settings.MINIO_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=self._request_timeout,
+            )
+        return self._http
+
+    async def close(self) -> None:
+        """Закрывает соединения с MinIO."""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        bucket: str,
+        object_name: str | None = None,
+        query: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        content_sha256: str | None = None,
+        transfer: bool = False,
+    ) -> S3Response:
+        """
+        Выполняет подписанный запрос к MinIO.
+
+        transfer - запрос передает данные объекта, для него действует
+        MINIO_TRANSFER_TIMEOUT_SECONDS вместо MINIO_REQUEST_TIMEOUT_SECONDS.
+
+        Raises:
+            S3Error: MinIO ответил ошибкой.
+        """
+        path = f"/{bucket}"
+        if object_name:
+            path += "/" + quote(object_name)
+        query_string = "&".join(
+            f"{queryencode(key)}={queryencode(value)}"
+            for key, value in sorted((query or {}).items())
+        )
+        url = self.base_url + path + (f"?{query_string}" if query_string else "")
+
+        date = datetime.now(UTC)
+        content_sha256 = content_sha256 or sha256_hash(body)
+        headers = {
+            **(headers or {}),
+            "Host": settings.MINIO_ENDPOINT,
+            "x-amz-date": to_amz_date(date),
+            "x-amz-content-sha256": content_sha256,
+        }
+        headers = sign_v4_s3(
+            method=method,
+            url=urlsplit(url),
+            region=settings.MINIO_REGION,
+            headers=headers,
+            credentials=self._credentials,
+            content_sha256=content_sha256,
+            date=date,
+        )
+
+        started = time.perf_counter()
+        try:
+            async with self.http.request(
+                method,
+                # URL уже закодирован для подписи, aiohttp не должен менять его
+                URL(url, encoded=True),
+                headers=headers,
+                data=body,
+                timeout=self._transfer_timeout if transfer else self._request_timeout,
+            ) as response:
+                content = await response.read()
+        finally:
+            MINIO_REQUEST_DURATION.labels(operation).observe(
+                time.perf_counter() - started
+            )
+
+        result = S3Response(
+            response.headers, content, response.status, response.url.path
+        )
+        if result.status >= 300:
+            raise self._s3_error(result, bucket, object_name)
+        return result
+
+    @staticmethod
+    def _s3_error(
+        response: S3Response, bucket: str, object_name: str | None
+    ) -> S3Error:
+        """
+        Ошибка S3 из ответа MinIO: по статусу или по телу <Error>.
+
+        У ответа на HEAD нет тела, а CompleteMultipartUpload может вернуть
+        <Error> со статусом 200.
+        """
+        code = message = host_id = None
+        if response.content:
+            with suppress(ET.ParseError):
+                root = ET.fromstring(response.content)
+                code = root.findtext("Code")
+                message = root.findtext("Message")
+                host_id = root.findtext("HostId")
+
+        if code is None:
+            code = {
+                403: "AccessDenied",
+                404: "NoSuchKey" if object_name else "NoSuchBucket",
+                409: "ResourceConflict",
+            }.get(response.status, "UnknownError")
+
+        return S3Error(
+            response,
+            code,
+            message or code,
+            response.resource,
+            response.headers.get("x-amz-request-id"),
+            host_id,
+            bucket_name=bucket,
+            object_name=object_name,
+        )
+
     async def upload_file(
         self,
         bucket: str,
-        file_data: BytesIO,
+        file_data: BinaryIO,
         file_size: int,
         original_filename: str,
         content_type: str = "application/octet-stream",
         folder: str | None = None,
     ) -> str:
-        """Загружает файл в MinIO хранилище и возвращает имя объекта."""
+        """
+        Загружает файл в MinIO хранилище и возвращает имя объекта.
+
+        Данные читаются из file_data частями по MINIO_UPLOAD_PART_SIZE_MB
+        (multipart upload для файлов больше части), поэтому в памяти
+        одновременно находится не больше MINIO_UPLOAD_PARALLEL_PARTS + 1
+        частей, а не весь файл.
+        """
+        object_name = self.make_object_name(original_filename, folder)
+        part_size = settings.MINIO_UPLOAD_PART_SIZE_MB * 1024 * 1024
+
+        try:
+            if file_size <= part_size:
+                await self._request(
+                    "put_object",
+                    "PUT",
+                    bucket,
+                    object_name,
+                    headers={"Content-Type": content_type},
+                    body=await self._read_part(file_data, file_size),
+                    content_sha256=UNSIGNED_PAYLOAD,
+                    transfer=True,
+                )
+            else:
+                await self._upload_multipart(
+                    bucket, object_name, file_data, file_size, content_type, part_size
+                )
+            logger.info(f"Uploaded file: {object_name} to bucket: {bucket}")
+            return object_name
+        except S3Error as e:
+            logger.error(f"MinIO upload error: {e}")
+            raise
+
+    @staticmethod
+    async def _read_part(file_data: BinaryIO, size: int) -> bytes:
+        """
+        Читает size байт из file_data.
+
+        Чтение выполняется в потоке: файл загрузки лежит на диске, а
+        HashingReader считает SHA-256 при чтении.
+        """
+        data = await asyncio.to_thread(file_data.read, size)
+        if len(data) != size:
+            raise OSError(f"Stream has {len(data)} bytes, expected {size}")
+        return data
+
+    async def _upload_multipart(
+        self,
+        bucket: str,
+        object_name: str,
+        file_data: BinaryIO,
+        file_size: int,
+        content_type: str,
+        part_size: int,
+    ) -> None:
+        """
+        Загружает объект частями через multipart upload.
+
+        Одновременно отправляется до MINIO_UPLOAD_PARALLEL_PARTS частей,
+        следующая часть читается, пока отправляются предыдущие. При ошибке
+        (в том числе при сборке объекта) multipart upload отменяется.
+        """
+        upload_id = await self.create_multipart_upload(
+            bucket, object_name, content_type
+        )
+        parallel = max(1, settings.MINIO_UPLOAD_PARALLEL_PARTS)
+        part_count = -(-file_size // part_size)
+        parts: list[tuple[int, str]] = []
+        uploading: set[asyncio.Task] = set()
+
+        try:
+            for part_number in range(1, part_count + 1):
+                size = min(part_size, file_size - (part_number - 1) * part_size)
+                data = await self._read_part(file_data, size)
+                if len(uploading) >= parallel:
+                    done, uploading = await asyncio.wait(
+                        uploading, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    parts.extend(task.result() for task in done)
+                uploading.add(
+                    asyncio.create_task(
+                        self._upload_part(
+                            bucket, object_name, upload_id, part_number, data
+                        )
+                    )
+                )
+                del data
+            parts.extend(await asyncio.gather(*uploading))
+            await self.complete_multipart_upload(
+                bucket, object_name, upload_id, sorted(parts)
+            )
+        except BaseException:
+            for task in uploading:
+                task.cancel()
+            with suppress(S3Error, aiohttp.ClientError, TimeoutError):
+                await self.abort_multipart_upload(bucket, object_name, upload_id)
+            raise
+
+    async def _upload_part(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> tuple[int, str]:
+        """Загружает одну часть и возвращает (part_number, etag)."""
+        response = await self._request(
+            "upload_part",
+            "PUT",
+            bucket,
+            object_name,
+            query={"partNumber": str(part_number), "uploadId": upload_id},
+            body=data,
+            content_sha256=UNSIGNED_PAYLOAD,
+            transfer=True,
+        )
+        return part_number, response.headers["ETag"].replace('"', "")
+
+    def make_object_name(
+        self, original_filename: str, folder: str | None = None
+    ) -> str:
+        """Генерирует уникальное имя объекта с расширением исходного файла."""
         ext = Path(original_filename).suffix.lower()
         unique_name = f"{uuid.uuid4().hex}{ext}"
 
         if folder:
-            object_name = f"{folder}/{unique_name}"
-        else:
-            object_name = unique_name
+            return f"{folder}/{unique_name}"
+        return unique_name
+
+    async def generate_presigned_post(
+        self,
+        bucket: str,
+        object_name: str,
+        content_type: str,
+        size: int,
+        expires_seconds: int = 3600,
+    ) -> tuple[str, dict[str, str]]:
+        """
+        Генерирует presigned POST для загрузки файла клиентом напрямую в MinIO.
+
+        Политика разрешает загрузить только объект object_name с заданным
+        Content-Type и размером ровно size байт.
+
+        Returns:
+            URL бакета и поля формы, которые клиент отправляет вместе
+            с файлом (поле file должно быть последним).
+        """
+        policy = PostPolicy(
+            bucket, datetime.now(UTC) + timedelta(seconds=expires_seconds)
+        )
+        policy.add_equals_condition("key", object_name)
+        policy.add_equals_condition("Content-Type", content_type)
+        policy.add_content_length_range_condition(size, size)
 
+        fields = self.client.presigned_post_policy(policy)
+        fields["key"] = object_name
+        fields["Content-Type"] = content_type
+        return f"{self.base_url}/{bucket}", fields
+
+    async def create_multipart_upload(
+        self, bucket: str, object_name: str, content_type: str
+    ) -> str:
+        """Начинает multipart upload и возвращает его upload_id."""
         try:
-            await asyncio.to_thread(
-                self.client.put_object,
-                bucket_name=bucket,
-                object_name=object_name,
-                data=file_data,
-                length=file_size,
-                content_type=content_type,
+            response = await self._request(
+                "create_multipart_upload",
+                "POST",
+                bucket,
+                object_name,
+                query={"uploads": ""},
+                headers={"Content-Type": content_type},
             )
-            logger.info(f"Uploaded file: {object_name} to bucket: {bucket}")
-            return object_name
         except S3Error as e:
-            logger.error(f"MinIO upload error: {e}")
+            logger.error(f"MinIO create multipart upload error: {e}")
+            raise
+        return ET.fromstring(response.content).findtext(f"{S3_NS}UploadId")
+
+    async def generate_presigned_part_url(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        expires_seconds: int = 3600,
+    ) -> str:
+        """Генерирует presigned PUT для загрузки одной части multipart upload."""
+        return self.client.get_presigned_url(
+            "PUT",
+            bucket,
+            object_name,
+            expires=timedelta(seconds=expires_seconds),
+            extra_query_params={
+                "uploadId": upload_id,
+                "partNumber": str(part_number),
+            },
+        )
+
+    async def list_parts(
+        self, bucket: str, object_name: str, upload_id: str
+    ) -> list[dict]:
+        """Возвращает загруженные части: part_number, etag, size."""
+        parts, marker = [], None
+        try:
+            while True:
+                query = {"uploadId": upload_id}
+                if marker:
+                    query["part-number-marker"] = marker
+                response = await self._request(
+                    "list_parts", "GET", bucket, object_name, query=query
+                )
+                root = ET.fromstring(response.content)
+                parts.extend(
+                    {
+                        "part_number": int(p.findtext(f"{S3_NS}PartNumber")),
+                        "etag": p.findtext(f"{S3_NS}ETag").replace('"', ""),
+                        "size": int(p.findtext(f"{S3_NS}Size")),
+                    }
+                    for p in root.findall(f"{S3_NS}Part")
+                )
+                if root.findtext(f"{S3_NS}IsTruncated") != "true":
+                    return parts
+                marker = root.findtext(f"{S3_NS}NextPartNumberMarker")
+        except S3Error as e:
+            logger.error(f"MinIO list parts error: {e}")
+            raise
+
+    async def complete_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]],
+    ) -> None:
+        """Собирает объект из частей (part_number, etag)."""
+        root = ET.Element("CompleteMultipartUpload", xmlns=S3_NS.strip("{}"))
+        for part_number, etag in parts:
+            part = ET.SubElement(root, "Part")
+            ET.SubElement(part, "PartNumber").text = str(part_number)
+            ET.SubElement(part, "ETag").text = f'"{etag}"'
+
+        try:
+            response = await self._request(
+                "complete_multipart_upload",
+                "POST",
+                bucket,
+                object_name,
+                query={"uploadId": upload_id},
+                headers={"Content-Type": "application/xml"},
+                body=ET.tostring(root),
+                transfer=True,
+            )
+            # Сборка может завершиться ошибкой уже после ответа 200
+            if ET.fromstring(response.content).tag == "Error":
+                raise self._s3_error(response, bucket, object_name)
+            logger.info(f"Completed multipart upload: {object_name}")
+        except S3Error as e:
+            logger.error(f"MinIO complete multipart upload error: {e}")
+            raise
+
+    async def abort_multipart_upload(
+        self, bucket: str, object_name: str, upload_id: str
+    ) -> None:
+        """Отменяет multipart upload и удаляет загруженные части."""
+        try:
+            await self._request(
+                "abort_multipart_upload",
+                "DELETE",
+                bucket,
+                object_name,
+                query={"uploadId": upload_id},
+            )
+            logger.info(f"Aborted multipart upload: {object_name}")
+        except S3Error as e:
+            logger.error(f"MinIO abort multipart upload error: {e}")
+            raise
+
+    async def list_multipart_uploads(
+        self, bucket: str, prefix: str | None = None
+    ) -> list[dict]:
+        """Незавершенные multipart uploads: object_name, upload_id, initiated."""
+        uploads, markers = [], {}
+        try:
+            while True:
+                query = {"uploads": "", **markers}
+                if prefix:
+                    query["prefix"] = prefix
+                response = await self._request(
+                    "list_multipart_uploads", "GET", bucket, query=query
+                )
+                root = ET.fromstring(response.content)
+                uploads.extend(
+                    {
+                        "object_name": u.findtext(f"{S3_NS}Key"),
+                        "upload_id": u.findtext(f"{S3_NS}UploadId"),
+                        "initiated": from_iso8601utc(u.findtext(f"{S3_NS}Initiated")),
+                    }
+                    for u in root.findall(f"{S3_NS}Upload")
+                )
+                if root.findtext(f"{S3_NS}IsTruncated") != "true":
+                    return uploads
+                markers = {
+                    "key-marker": root.findtext(f"{S3_NS}NextKeyMarker") or "",
+                    "upload-id-marker": (
+                        root.findtext(f"{S3_NS}NextUploadIdMarker") or ""
+                    ),
+                }
+        except S3Error as e:
+            logger.error(f"MinIO list multipart uploads error: {e}")
             raise
 
     async def delete_file(self, bucket: str, object_name: str):
         """Удаляет файл из MinIO хранилища."""
         try:
-            await asyncio.to_thread(self.client.remove_object, bucket, object_name)
+            await self._request("remove_object", "DELETE", bucket, object_name)
             logger.info(f"Deleted file: {object_name} from bucket {bucket}")
             return True
         except S3Error as e:
@@ -85,15 +588,30 @@ class MinIOClient:
 
     async def delete_files(self, bucket: str, object_names: list[str]) -> None:
         """Удаляет несколько файлов из MinIO хранилища."""
-        from minio.deleteobjects import DeleteObject
-
         try:
-            delete_objects = [DeleteObject(name) for name in object_names]
-            errors = await asyncio.to_thread(
-                lambda: list(self.client.remove_object(bucket, delete_objects))
-            )
-            for error in errors:
-                logger.error(f"Error deleting {error.name}: {error.message}")
+            for start in range(0, len(object_names), DELETE_BATCH_SIZE):
+                root = ET.Element("Delete")
+                ET.SubElement(root, "Quiet").text = "true"
+                for name in object_names[start : start + DELETE_BATCH_SIZE]:
+                    ET.SubElement(ET.SubElement(root, "Object"), "Key").text = name
+                body = ET.tostring(root)
+
+                response = await self._request(
+                    "remove_objects",
+                    "POST",
+                    bucket,
+                    query={"delete": ""},
+                    headers={
+                        "Content-Type": "application/xml",
+                        "Content-MD5": md5sum_hash(body),
+                    },
+                    body=body,
+                )
+                for error in ET.fromstring(response.content).findall(f"{S3_NS}Error"):
+                    logger.error(
+                        f"Error deleting {error.findtext(f'{S3_NS}Key')}: "
+                        f"{error.findtext(f'{S3_NS}Message')}"
+                    )
         except S3Error as e:
             logger.error(f"MinIO bulk delete error: {e}")
 
@@ -101,42 +619,33 @@ class MinIOClient:
         self, bucket: str, object_name: str, expires_seconds: int = 3600
     ) -> str:
         """Генерирует временную ссылку для скачивания файла."""
-        try:
-            url = await asyncio.to_thread(
-                self.client.presigned_get_object,
-                bucket_name=bucket,
-                object_name=object_name,
-                expires=timedelta(seconds=expires_seconds),
-            )
-            return url
-        except S3Error as e:
-            logger.error(f"URL generation error {e}")
-            raise
+        return self.client.presigned_get_object(
+            bucket_name=bucket,
+            object_name=object_name,
+            expires=timedelta(seconds=expires_seconds),
+        )
 
     async def generate_public_url(self, bucket: str, object_name: str) -> str:
         """Генерирует публичную ссылку на файл."""
-        if settings.MINIO_SECURE:
-            protocol = "https"
-        else:
-            protocol = "http"
-        return f"{protocol}://{settings.MINIO_ENDPOINT}/{bucket}/{object_name}"
+        return f"{self.base_url}/{bucket}/{object_name}"
 
     async def get_file_info(self, bucket: str, object_name: str) -> dict | None:
         """Получает информацию о файле (размер, тип, дату изменения)."""
         try:
-            stat = await asyncio.to_thread(self.client.stat_object, bucket, object_name)
-            return {
-                "size": stat.size,
-                "last_modified": stat.last_modified,
-                "content_type": stat.content_type,
-                "etag": stat.etag,
-            }
+            response = await self._request("stat_object", "HEAD", bucket, object_name)
         except S3Error as e:
             if e.code == "NoSuchKey":
                 return None
             logger.error(f"File info error {e}")
             raise
 
+        return {
+            "size": int(response.headers["Content-Length"]),
+            "last_modified": from_http_header(response.headers["Last-Modified"]),
+            "content_type": response.headers.get("Content-Type"),
+            "etag": response.headers.get("ETag", "").replace('"', ""),
+        }
+
     async def file_exists(self, bucket: str, object_name: str) -> bool:
         """Проверяет существует ли файл в MinIO хранилище."""
         info = await self.get_file_info(bucket, object_name)
@@ -156,11 +665,14 @@ class MinIOClient:
             ],
         }
 
-        import json
-
         try:
-            await asyncio.to_thread(
-                self.client.set_bucket_policy, bucket, json.dumps(policy)
+            await self._request(
+                "set_bucket_policy",
+                "PUT",
+                bucket,
+                query={"policy": ""},
+                headers={"Content-Type": "application/json"},
+                body=json.dumps(policy).encode(),
             )
             logger.info(f"Set public read policy for bucket: {bucket}")
         except S3Error as e:
@@ -1,13 +1,252 @@
 # app/core/rate_limit.py
-"""Конфигурация ограничения частоты запросов (rate limiting)."""
+"""
+Ограничение частоты запросов (rate limiting), общее для всех процессов.
+
+Лимиты хранятся в Redis и проверяются алгоритмом GCRA одним вызовом
+Lua-скрипта, поэтому "10/minute" означает 10 запросов в минуту на всё
+приложение, а не на каждый процесс uvicorn, и переживает перезапуск.
+
+Пока клиент заметно ниже лимита, скрипт выдает процессу сразу пачку
+разрешений (RATE_LIMIT_LOCAL_SHARE от лимита), которые расходуются
+локально без обращения к Redis в течение RATE_LIMIT_LOCAL_TTL_SECONDS.
+Пачка выдается, только если клиент шлет запросы чаще, чем успевает
+истечь прошлая выдача: редкие запросы списываются в Redis по одному, и
+неизрасходованные разрешения не уменьшают запас клиента. Вблизи лимита
+каждый запрос проверяется в Redis.
+"""
+
+import functools
+import math
+import time
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
 
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from slowapi import Limiter
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from loguru import logger
+from prometheus_client import Counter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.jwt_service import JWTService, TokenType
+from app.core.redis import get_redis_client
+
+RATE_LIMIT_REQUESTS = Counter(
+    "rate_limit_requests_total",
+    "Rate limit checks: local (served by the in-process allowance), "
+    "allowed / rejected (decided by Redis) or error (Redis failed, allowed)",
+    ["result"],
+)
+
+RATE_LIMIT_KEY = "rate:{}:{}"
+
+# Сколько ключей хранит локальный запас разрешений
+LOCAL_MAX_KEYS = 10_000
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# GCRA: TAT (theoretical arrival time) - время, к которому клиент
+# "израсходует" выданные разрешения; запрос разрешен, если TAT после него
+# не уходит дальше чем на период вперед. Время берется из Redis (TIME),
+# чтобы все процессы использовали одни часы.
+# KEYS: rate:<endpoint>:<client>
+# ARGV: интервал между запросами (мс), период (мс), запрошенная пачка
+# Возвращает {выдано разрешений, через сколько мс повторить}.
+GCRA_SCRIPT = """
+local time = redis.call("TIME")
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local interval, period, batch = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call("GET", KEYS[1])) or now, now)
+-- Пачка выдается, только если после нее останется не меньше еще одной пачки
+local granted = batch
+if tat + 2 * batch * interval - period > now then
+    granted = 1
+end
+local new_tat = tat + granted * interval
+if new_tat - period > now then
+    return {0, math.ceil(new_tat - period - now)}
+end
+redis.call("SET", KEYS[1], string.format("%.3f", new_tat), "PX", math.ceil(new_tat - now))
+return {granted, 0}
+"""
+
+
+class LocalAllowance(NamedTuple):
+    """Разрешения, выданные процессу из Redis одним вызовом."""
+
+    # Сколько еще можно израсходовать локально
+    tokens: int
+    # monotonic-время истечения
+    expires_at: float
+    # Сколько было выдано
+    granted: int
+
+
+class Rate(NamedTuple):
+    """Лимит: limit запросов за period секунд."""
+
+    limit: int
+    period: float
+
+
+def parse_rate(value: str) -> Rate:
+    """Разбирает лимит вида "10/minute" (second, minute, hour, day)."""
+    limit, _, period = value.partition("/")
+    period = period.strip().lower().removesuffix("s")
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported rate limit period: {value!r}")
+    return Rate(int(limit), PERIODS[period])
+
+
+class RateLimitExceeded(Exception):
+    """Лимит запросов превышен."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.3f}s")
+        self.retry_after = retry_after
+
+
+async def rate_limit_key(request: Request) -> str:
+    """
+    Клиент для лимита: ID пользователя по access токену, иначе IP.
+
+    Токен проверяется через кэш проверенных токенов (access_token_cache),
+    невалидный токен считается отсутствующим.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        token_data = await JWTService(None).verify_token(token, TokenType.ACCESS)
+        if token_data is not None:
+            return f"user:{token_data.id}"
+
+    host = request.client.host if request.client else "127.0.0.1"
+    return f"ip:{host}"
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов на Redis с локальным запасом разрешений.
+
+    Использование совпадает с прежним slowapi.Limiter: эндпоинт
+    декорируется limiter.limit("10/minute") и принимает request: Request.
+    При недоступности Redis запросы пропускаются (fail open).
+    """
+
+    def __init__(
+        self,
+        get_redis: Callable[[], Redis | None],
+        key_func: Callable[[Request], Awaitable[str]],
+        local_share: float,
+        local_ttl: float,
+    ) -> None:
+        self.get_redis = get_redis
+        self.key_func = key_func
+        self.local_share = local_share
+        self.local_ttl = local_ttl
+        self._local: dict[str, LocalAllowance] = {}
+
+    def limit(self, value: str):
+        """Декоратор эндпоинта с лимитом value, например "10/minute"."""
+        rate = parse_rate(value)
+
+        def decorator(func):
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                await self.hit(scope, kwargs["request"], rate)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    async def hit(self, scope: str, request: Request, rate: Rate) -> None:
+        """Учитывает запрос, RateLimitExceeded при превышении лимита."""
+        key = RATE_LIMIT_KEY.format(scope, await self.key_func(request))
+
+        allowance = self._take_local(key)
+        if allowance is not None and allowance.tokens:
+            RATE_LIMIT_REQUESTS.labels("local").inc()
+            return
+
+        redis = self.get_redis()
+        if redis is None:
+            RATE_LIMIT_REQUESTS.labels("error").inc()
+            return
+
+        # Redis списывает пачку целиком при выдаче, неизрасходованные
+        # разрешения не возвращаются. Поэтому пачка выдается, только если
+        # прошлая выдача израсходована до истечения (клиент действительно
+        # шлет запросы пачкой), и растет вдвое до local_share от лимита
+        batch = 1
+        if allowance is not None:
+            batch = min(
+                2 * allowance.granted, max(1, int(rate.limit * self.local_share))
+            )
+        interval = rate.period * 1000 / rate.limit
+        gcra = redis.register_script(GCRA_SCRIPT)
+        try:
+            granted, retry_after = await gcra(
+                keys=[key], args=[interval, rate.period * 1000, batch]
+            )
+        except RedisError as e:
+            logger.warning(f"Rate limit не проверен, Redis недоступен: {e}")
+            RATE_LIMIT_REQUESTS.labels("error").inc()
+            return
+
+        if not granted:
+            RATE_LIMIT_REQUESTS.labels("rejected").inc()
+            raise RateLimitExceeded(int(retry_after) / 1000)
+
+        RATE_LIMIT_REQUESTS.labels("allowed").inc()
+        if self.local_share > 0:
+            granted = int(granted)
+            self._put_local(
+                key,
+                LocalAllowance(
+                    granted - 1,
+                    time.monotonic() + min(self.local_ttl, rate.period),
+                    granted,
+                ),
+            )
+
+    def _take_local(self, key: str) -> LocalAllowance | None:
+        """
+        Расходует локальное разрешение, если оно есть.
+
+        Returns:
+            Действующая выдача (до расхода); tokens == 0 - выдача
+            израсходована до истечения. None - выдачи нет или она истекла.
+        """
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+
+        if entry.tokens:
+            self._local[key] = entry._replace(tokens=entry.tokens - 1)
+        return entry
+
+    def _put_local(self, key: str, allowance: LocalAllowance) -> None:
+        if len(self._local) >= LOCAL_MAX_KEYS:
+            now = time.monotonic()
+            self._local = {k: v for k, v in self._local.items() if v.expires_at > now}
+            if len(self._local) >= LOCAL_MAX_KEYS:
+                self._local.clear()
+        self._local[key] = allowance
+
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = RateLimiter(
+    get_redis=get_redis_client,
+    key_func=rate_limit_key,
+    local_share=settings.RATE_LIMIT_LOCAL_SHARE,
+    local_ttl=settings.RATE_LIMIT_LOCAL_TTL_SECONDS,
+)
 
 
 def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
@@ -15,4 +254,5 @@ def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         content={"detail": "Too many requests. Please try again later."},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
     )
@@ -1,23 +1,30 @@
 # app/core/redis.py
 """Управление подключением к Redis и жизненным циклом приложения."""
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from loguru import logger
 from redis.asyncio import ConnectionPool, Redis
 
+from app.core.cache import listen_invalidations
+from app.core.cache_metrics import InstrumentedRedis
 from app.core.config import settings
+from app.core.security import password_hasher_pool
 from app.core.taskiq import broker
 
 redis_pool: ConnectionPool | None = None
 redis_client: Redis | None = None
+# Пул без decode_responses для бинарных записей кэша (app.core.codecs)
+redis_binary_pool: ConnectionPool | None = None
+redis_binary_client: Redis | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Управляет инициализацией и завершением Redis и Taskiq."""
-    global redis_pool, redis_client
+    global redis_pool, redis_client, redis_binary_pool, redis_binary_client
 
     redis_pool = ConnectionPool(
         host=settings.REDIS_HOST,
@@ -26,11 +33,42 @@ async def lifespan(app: FastAPI):
         decode_responses=True,
         max_connections=500,
     )
-    redis_client = Redis(connection_pool=redis_pool, db=settings.REDIS_DB_CACHE)
+    redis_client = InstrumentedRedis(
+        connection_pool=redis_pool, db=settings.REDIS_DB_CACHE
+    )
+
+    redis_binary_pool = ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB_CACHE,
+        max_connections=500,
+    )
+    redis_binary_client = InstrumentedRedis(connection_pool=redis_binary_pool)
 
     await redis_client.ping()
     logger.info(f"Redis Cache подключен (DB {settings.REDIS_DB_CACHE})")
 
+    invalidation_listener = asyncio.create_task(listen_invalidations(redis_client))
+
+    # Прогрев кэша товаров в фоне, чтобы после выкатки первые запросы
+    # не уходили в БД. Выполняется в процессе приложения, его метрики
+    # видны в /metrics; tasks импортирует этот модуль.
+    warm_up = None
+    if not broker.is_worker_process:
+        from app.modules.products.tasks import warm_product_cache
+
+        warm_up = asyncio.create_task(
+            warm_product_cache(redis=redis_client, cache_redis=redis_binary_client)
+        )
+        warm_up.add_done_callback(
+            lambda task: (
+                task.cancelled()
+                or task.exception() is None
+                or logger.warning(f"Прогрев кэша товаров не удался: {task.exception()}")
+            )
+        )
+
     if not broker.is_worker_process:
         await broker.startup()
     logger.info(f"Taskiq Broker подключен (DB {settings.REDIS_DB_QUEUE})")
@@ -41,11 +79,34 @@ async def lifespan(app: FastAPI):
         await broker.shutdown()
     logger.info("Taskiq Broker остановлен.")
 
+    invalidation_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await invalidation_listener
+
+    if warm_up is not None:
+        warm_up.cancel()
+        with suppress(Exception, asyncio.CancelledError):
+            await warm_up
+
+    password_hasher_pool.shutdown()
+
+    # Клиент MinIO проверяет бакеты при импорте: импортируем только здесь
+    from app.core.minio_client import minio_client
+
+    await minio_client.close()
+
     await redis_client.aclose()
     await redis_pool.disconnect()
+    await redis_binary_client.aclose()
+    await redis_binary_pool.disconnect()
     logger.info("Redis Cache отключен.")
 
 
 def get_redis_client() -> Redis:
     """Возвращает глобальный экземпляр Redis клиента."""
     return redis_client
+
+
+def get_redis_binary_client() -> Redis:
+    """Возвращает Redis клиент без декодирования ответов (для кэша)."""
+    return redis_binary_client
@@ -8,3 +8,11 @@ class TokenData(BaseModel):
     """Данные, содержащиеся в JWT токене."""
 
     id: int
+
+
+class HotKeyResponse(BaseModel):
+    """Горячий ключ Redis с оценкой числа чтений (по выборке процесса)."""
+
+    key: str
+    namespace: str
+    reads_estimated: float
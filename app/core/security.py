@@ -1,13 +1,44 @@
 # app/core/security.py
 """Функции безопасности для хеширования и проверки паролей."""
 
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
 from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from app.core.config import settings
+
 bcrypt_hasher = BcryptHasher(rounds=10)
 
 password_hash = PasswordHash((bcrypt_hasher,))
 
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password hashing job waited for a free worker process",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password in the worker process",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1),
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Password hashing jobs running or queued in this process",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hashing jobs rejected because the queue was full",
+)
+
 
 def hash_password(password: str) -> str:
     """Хеширует пароль с использованием bcrypt."""
@@ -17,3 +48,86 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     """Проверяет пароль против его хеша."""
     return password_hash.verify(password, hashed_password)
+
+
+# ═══════════════════════════════════════════════════════════════
+# HASHER POOL
+# ═══════════════════════════════════════════════════════════════
+
+
+class PasswordHasherOverloaded(Exception):
+    """Очередь пула хеширования заполнена."""
+
+
+def _timed(fn: Callable, *args: Any) -> tuple[float, float, Any]:
+    """Выполняется в процессе пула: (время начала, длительность, результат)."""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time() - started, result
+
+
+class PasswordHasherPool:
+    """
+    Отдельный пул процессов для bcrypt с ограниченной очередью.
+
+    Хеширование не занимает пул потоков по умолчанию (asyncio.to_thread),
+    через который работают, например, вызовы MinIO, и не упирается в GIL.
+    Если одновременно задач больше, чем workers + max_queue, новые
+    отклоняются (PasswordHasherOverloaded) вместо бесконечного ожидания.
+
+    Процессы запускаются при первом вызове (spawn: без копирования
+    состояния приложения), в каждом процессе приложения свой пул.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Выполняет fn(*args) в пуле процессов."""
+        if self._pending >= self.workers + self.max_queue:
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHasherOverloaded()
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        self._pending += 1
+        PASSWORD_HASH_PENDING.set(self._pending)
+        submitted = time.time()
+        try:
+            (
+                started,
+                duration,
+                result,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, fn, *args
+            )
+        except BrokenProcessPool:
+            # Процесс пула упал: следующий вызов создаст новый пул
+            self._executor = None
+            raise
+        finally:
+            self._pending -= 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+        PASSWORD_HASH_QUEUE_WAIT.observe(max(0.0, started - submitted))
+        PASSWORD_HASH_DURATION.labels(fn.__name__).observe(duration)
+        return result
+
+    def shutdown(self) -> None:
+        """Останавливает процессы пула."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_HASHER_WORKERS,
+    max_queue=settings.PASSWORD_HASHER_MAX_QUEUE,
+)
@@ -2,6 +2,8 @@
 """Конфигурация асинхронного брокера задач Taskiq."""
 
 import taskiq_fastapi
+from taskiq import TaskiqScheduler
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_redis import ListQueueBroker
 
 from app.core.config import settings
@@ -11,3 +13,6 @@ broker = ListQueueBroker(url=settings.REDIS_URL_QUEUE)
 
 # Инициализация интеграции с FastAPI
 taskiq_fastapi.init(broker, "app.main:app")
+
+# Планировщик периодических задач (расписание задается через labels задач)
+scheduler = TaskiqScheduler(broker=broker, sources=[LabelScheduleSource(broker)])
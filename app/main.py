@@ -4,10 +4,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
-from slowapi.errors import RateLimitExceeded
 
+from app.core.admin import router as admin_router
 from app.core.config import settings
-from app.core.rate_limit import limiter, rate_limit_exception_handler
+from app.core.rate_limit import RateLimitExceeded, rate_limit_exception_handler
 from app.core.redis import lifespan
 from app.modules.auth.router import router as auth_router
 from app.modules.users.router import router as users_router
@@ -18,7 +18,6 @@ from app.modules.products.router import router as products_router
 # ═══════════════════════════════════════════════════════════════
 
 app = FastAPI(title="CodeVenture API", lifespan=lifespan)
-app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exception_handler)
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +34,7 @@ app.add_middleware(
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(products_router)
+app.include_router(admin_router)
 
 
 from app.modules.products.models import Product  # noqa: E402, F401
@@ -1,10 +1,14 @@
 from fastapi import Depends, HTTPException, status
 from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db_helper import get_session
 from app.core.jwt_service import JWTService, TokenType, oauth2_scheme
 from app.core.redis import get_redis_client
 from app.modules.auth.service import AuthService
 from app.modules.users.dependencies import get_full_user_service
+from app.modules.users.models import User
 from app.modules.users.service import UserService
 
 
@@ -33,3 +37,22 @@ async def get_current_user_id(
             detail="Could not validate credentials",
         )
     return payload.id
+
+
+async def get_current_admin_id(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_session),
+) -> int:
+    """
+    Возвращает ID текущего пользователя, если он администратор.
+
+    Права читаются из БД, а не из кэша пользователя: снятие прав
+    администратора действует сразу.
+    """
+    is_admin = await db.scalar(select(User.is_admin).where(User.id == user_id))
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return user_id
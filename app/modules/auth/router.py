@@ -2,8 +2,12 @@ from fastapi import APIRouter, Depends, Request, Response
 
 from app.core.rate_limit import limiter
 from app.core.sso import google_sso, github_sso
-from app.modules.auth.dependencies import get_auth_service
-from app.modules.auth.schemas import UserLogin, UserRegister
+from app.modules.auth.dependencies import (
+    get_auth_service,
+    get_current_admin_id,
+    get_current_user_id,
+)
+from app.modules.auth.schemas import SessionsRevoke, UserLogin, UserRegister
 from app.modules.auth.service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -60,6 +64,26 @@ async def logout_user(
     return await service.delete_refresh_token(request, response)
 
 
+@router.post("/logout-all")
+async def logout_all_sessions(
+    response: Response,
+    user_id: int = Depends(get_current_user_id),
+    service: AuthService = Depends(get_auth_service),
+):
+    """Выполняет выход пользователя со всех устройств."""
+    return await service.revoke_all_sessions(user_id, response)
+
+
+@router.post("/admin/sessions/revoke")
+async def revoke_users_sessions(
+    schema: SessionsRevoke,
+    admin_id: int = Depends(get_current_admin_id),
+    service: AuthService = Depends(get_auth_service),
+):
+    """Отзывает все сессии указанных пользователей (для администраторов)."""
+    return await service.revoke_users_sessions(admin_id, schema)
+
+
 @router.get("/google/login")
 async def login_with_google():
     """Инициирует вход через Google."""
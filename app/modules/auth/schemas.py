@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserRegister(BaseModel):
@@ -29,3 +29,9 @@ class UserLoginOAuth2(BaseModel):
 
     username: str | None
     email: EmailStr
+
+
+class SessionsRevoke(BaseModel):
+    """Схема для отзыва всех сессий нескольких пользователей."""
+
+    user_ids: list[int] = Field(min_length=1, max_length=1000)
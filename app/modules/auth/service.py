@@ -1,15 +1,21 @@
-import asyncio
 from datetime import timedelta
+from typing import NoReturn
 
 from fastapi import HTTPException, Request, Response, status
 from fastapi.responses import RedirectResponse
 from loguru import logger
 
 from app.core.config import settings
-from app.core.jwt_service import JWTService, TokenType
-from app.core.security import hash_password, verify_password
+from app.core.jwt_service import JWTService
+from app.core.security import (
+    PasswordHasherOverloaded,
+    hash_password,
+    password_hasher_pool,
+    verify_password,
+)
 from app.core.sso import google_sso, github_sso
 from app.modules.auth.schemas import (
+    SessionsRevoke,
     UserLogin,
     UserLoginOAuth2,
     UserRegister,
@@ -33,33 +39,36 @@ class AuthService:
         self.jwt_service = jwt_service
 
     async def register_user(self, schema: UserRegister, response: Response):
-        """Регистрирует нового пользователя и создает токены доступа."""
-        existing_user = await self.user_service.get_by_email(schema.email)
+        """
+        Регистрирует нового пользователя и создает токены доступа.
 
-        if existing_user:
-            logger.warning(
-                f"Попытка регистрации с занятым аккаунтом. Email: {schema.email}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
+        Занятый email отсекается дешевым запросом до хеширования пароля;
+        одновременные регистрации с одним email по-прежнему разрешает
+        ON CONFLICT в create_user.
+        """
+        if await self.user_service.email_exists(schema.email):
+            self._raise_email_taken(schema.email)
 
-        hashed_password = await asyncio.to_thread(hash_password, schema.password)
+        hashed_password = await self._run_password_hasher(
+            hash_password, schema.password
+        )
         schema.password = hashed_password
 
-        new_user = await self.user_service.create_user(schema)
+        new_user_id = await self.user_service.create_user(schema)
+
+        if new_user_id is None:
+            self._raise_email_taken(schema.email)
 
         await send_welcome_email.kiq(schema.email)
 
         access_token_expire = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = await self.jwt_service.create_access_token(
-            data={"sub": str(new_user.id)},
+            data={"sub": str(new_user_id)},
             expires_delta=access_token_expire,
         )
 
         refresh_token = await self.jwt_service.create_refresh_token(
-            data={"sub": str(new_user.id)}
+            data={"sub": str(new_user_id)}
         )
         max_age = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
@@ -74,11 +83,19 @@ class AuthService:
 
         return {"access_token": access_token, "token_type": "bearer"}
 
+    @staticmethod
+    def _raise_email_taken(email: str) -> NoReturn:
+        logger.warning(f"Попытка регистрации с занятым аккаунтом. Email: {email}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+
     async def login_user(self, schema: UserLogin, response: Response) -> dict:
         """Авторизирует пользователя и создает токены доступа."""
-        existing_user = await self.user_service.get_by_email(schema.email)
+        credentials = await self.user_service.get_credentials_by_email(schema.email)
 
-        if existing_user is None:
+        if credentials is None:
             logger.warning(
                 f"Неудачная попытка входа. Пользователя с email: {schema.email} не существует."
             )
@@ -87,7 +104,7 @@ class AuthService:
                 detail="Invalid email or password",
             )
 
-        if existing_user.password is None:
+        if credentials.password is None:
             logger.warning(
                 f"Неудачная попытка входа. У пользователя с email: {schema.email} нет пароля."
             )
@@ -96,8 +113,17 @@ class AuthService:
                 detail="Invalid email or password",
             )
 
-        correct_password = await asyncio.to_thread(
-            verify_password, schema.password, existing_user.password
+        if not credentials.is_active:
+            logger.warning(
+                f"Неудачная попытка входа. Пользователь с email: {schema.email} деактивирован."
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password",
+            )
+
+        correct_password = await self._run_password_hasher(
+            verify_password, schema.password, credentials.password
         )
 
         if not correct_password:
@@ -108,12 +134,12 @@ class AuthService:
 
         access_token_expire = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = await self.jwt_service.create_access_token(
-            data={"sub": str(existing_user.id)},
+            data={"sub": str(credentials.id)},
             expires_delta=access_token_expire,
         )
 
         refresh_token = await self.jwt_service.create_refresh_token(
-            data={"sub": str(existing_user.id)}
+            data={"sub": str(credentials.id)}
         )
         max_age = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
@@ -128,6 +154,18 @@ class AuthService:
 
         return {"access_token": access_token, "token_type": "bearer"}
 
+    async def _run_password_hasher(self, fn, *args):
+        """Выполняет хеширование в пуле процессов, 503 при переполнении."""
+        try:
+            return await password_hasher_pool.run(fn, *args)
+        except PasswordHasherOverloaded:
+            logger.warning("Очередь хеширования паролей заполнена")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
     async def update_access_token(self, request: Request, response: Response) -> dict:
         """Обновляет access token используя refresh token."""
         refresh_token = request.cookies.get("refresh_token")
@@ -137,23 +175,17 @@ class AuthService:
                 detail="Refresh token missing.",
             )
 
-        user_data = await self.jwt_service.verify_token(
-            refresh_token, TokenType.REFRESH
-        )
-        if not user_data:
+        rotated = await self.jwt_service.rotate_refresh_token(refresh_token)
+        if not rotated:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token",
             )
-
-        await self.jwt_service.revoke_refresh_token(refresh_token)
+        user_data, new_refresh_token = rotated
 
         new_access_token = await self.jwt_service.create_access_token(
             data={"sub": str(user_data.id)}
         )
-        new_refresh_token = await self.jwt_service.create_refresh_token(
-            data={"sub": str(user_data.id)}
-        )
 
         max_age = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
         response.set_cookie(
@@ -191,6 +223,33 @@ class AuthService:
 
         return {"status": "success"}
 
+    async def revoke_all_sessions(self, user_id: int, response: Response) -> dict:
+        """Выполняет выход пользователя со всех устройств."""
+        response.delete_cookie(
+            "refresh_token",
+            domain="localhost",
+            path="/",
+            secure=False,
+            samesite="lax",
+        )
+
+        revoked = await self.jwt_service.revoke_all_sessions(user_id)
+
+        return {"status": "success", "revoked": revoked}
+
+    async def revoke_users_sessions(
+        self, admin_id: int, schema: SessionsRevoke
+    ) -> dict:
+        """
+        Отзывает все сессии указанных пользователей.
+
+        Права администратора проверяет зависимость get_current_admin_id.
+        """
+        revoked = await self.jwt_service.revoke_sessions(schema.user_ids)
+        logger.info(f"Администратор {admin_id} отозвал сессии: {revoked}")
+
+        return {"status": "success", "revoked": revoked}
+
     async def auth_user_with_oauth2(
         self, request: Request, response: Response, method: str
     ):
@@ -202,26 +261,26 @@ class AuthService:
         else:
             logger.error("Unknown method for oauth2.0 authorization")
 
-        existing_user = await self.user_service.get_by_email(user.email)
+        existing_user = await self.user_service.get_credentials_by_email(user.email)
 
         if existing_user:
-            new_access_token = await self.jwt_service.create_access_token(
-                data={"sub": str(existing_user.id)}
-            )
-            new_refresh_token = await self.jwt_service.create_refresh_token(
-                data={"sub": str(existing_user.id)}
-            )
-
+            user_id = existing_user.id
         else:
             user_schema = UserLoginOAuth2(username=user.display_name, email=user.email)
-            new_user = await self.user_service.create_user(user_schema)
+            user_id = await self.user_service.create_user(user_schema)
+            if user_id is None:
+                # Пользователь был создан параллельным запросом
+                existing_user = await self.user_service.get_credentials_by_email(
+                    user.email
+                )
+                user_id = existing_user.id
 
-            new_access_token = await self.jwt_service.create_access_token(
-                data={"sub": str(new_user.id)}
-            )
-            new_refresh_token = await self.jwt_service.create_refresh_token(
-                data={"sub": str(new_user.id)}
-            )
+        new_access_token = await self.jwt_service.create_access_token(
+            data={"sub": str(user_id)}
+        )
+        new_refresh_token = await self.jwt_service.create_refresh_token(
+            data={"sub": str(user_id)}
+        )
 
         if method == "Google":
             frontend_url = f"{settings.FRONTEND_URL}/auth/google/login/success?token={new_access_token}"
@@ -0,0 +1,260 @@
+# app/modules/products/autocomplete.py
+"""Индекс автодополнения названий товаров на Redis sorted sets."""
+
+import re
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+
+from redis.asyncio import Redis
+
+from app.modules.products.schemas import ProductSuggestion
+
+# ═══════════════════════════════════════════════════════════════
+# KEYS
+# ═══════════════════════════════════════════════════════════════
+#
+# autocomplete:titles        HASH  product_id -> title
+# autocomplete:p:{prefix}    ZSET  product_id (score = created_at timestamp)
+# autocomplete:t:{trigram}   ZSET  product_id (score = created_at timestamp)
+
+TITLES_KEY = "autocomplete:titles"
+PREFIX_KEY = "autocomplete:p:{}"
+TRIGRAM_KEY = "autocomplete:t:{}"
+
+MIN_PREFIX_LENGTH = 1
+MAX_PREFIX_LENGTH = 15
+# Сколько кандидатов читается из каждого ключа на горячем пути.
+CANDIDATES_PER_KEY = 200
+# Минимальная доля триграмм запроса, найденных в слове названия.
+MIN_TRIGRAM_SIMILARITY = 0.4
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Заменяет записи товара в индексе, если его название в TITLES_KEY все еще
+# равно прочитанному клиентом (compare-and-set); иначе возвращает 0.
+# KEYS: TITLES_KEY, ключи для ZREM (n_stale), ключи для ZADD
+# ARGV: product_id, ожидаемое название ("" - нет в индексе), n_stale,
+#       новое название ("" - удалить), score
+UPDATE_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if (current or "") ~= ARGV[2] then
+    return 0
+end
+local n_stale = tonumber(ARGV[3])
+for i = 2, n_stale + 1 do
+    redis.call("ZREM", KEYS[i], ARGV[1])
+end
+if ARGV[4] == "" then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+    return 1
+end
+for i = n_stale + 2, #KEYS do
+    redis.call("ZADD", KEYS[i], ARGV[5], ARGV[1])
+end
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[4])
+return 1
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    """Разбивает текст на нормализованные слова."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def prefixes(token: str) -> list[str]:
+    """Возвращает префиксы слова, которые попадают в индекс."""
+    upper = min(len(token), MAX_PREFIX_LENGTH)
+    return [token[:i] for i in range(MIN_PREFIX_LENGTH, upper + 1)]
+
+
+def trigrams(token: str) -> set[str]:
+    """Возвращает триграммы слова (с выравниванием, как в pg_trgm)."""
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def index_keys(title: str) -> set[str]:
+    """Возвращает все ключи индекса, в которые попадает название."""
+    keys = set()
+    for token in tokenize(title):
+        keys.update(PREFIX_KEY.format(p) for p in prefixes(token))
+        keys.update(TRIGRAM_KEY.format(t) for t in trigrams(token))
+    return keys
+
+
+def matches_prefixes(query_tokens: list[str], title: str) -> bool:
+    """Каждое слово запроса - префикс какого-либо слова названия."""
+    title_tokens = tokenize(title)
+    return all(
+        any(token.startswith(query[:MAX_PREFIX_LENGTH]) for token in title_tokens)
+        for query in query_tokens
+    )
+
+
+def similarity(query_token: str, title: str) -> float:
+    """
+    Доля триграмм слова запроса, найденных в лучшем слове названия.
+
+    Аналог word_similarity из pg_trgm: длинные слова названия не штрафуются,
+    что важно для набираемого (незаконченного) слова.
+    """
+    query_trigrams = trigrams(query_token)
+    best = 0
+    for token in tokenize(title):
+        best = max(best, len(query_trigrams & trigrams(token)))
+    return best / len(query_trigrams)
+
+
+class AutocompleteIndex:
+    """
+    Индекс автодополнения по названиям опубликованных товаров.
+
+    Горячий путь (suggest) обращается только к Redis: один конвейер
+    для чтения кандидатов и один HMGET для названий.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._update_script = redis.register_script(UPDATE_SCRIPT)
+
+    async def upsert(self, product_id: int, title: str, score: float) -> None:
+        """Добавляет или обновляет товар в индексе."""
+        await self._update(product_id, title, score)
+
+    async def remove(self, product_id: int) -> None:
+        """Удаляет товар из индекса."""
+        await self._update(product_id, None, 0)
+
+    async def _update(self, product_id: int, title: str | None, score: float) -> None:
+        """
+        Заменяет записи товара в индексе записями для title (None - удалить).
+
+        Ключи для удаления считаются по прочитанному старому названию, а
+        скрипт применяет изменение, только если название с тех пор не
+        поменялось; иначе разница пересчитывается. Так параллельные
+        обновления одного товара (A -> B и B -> C) не оставляют в индексе
+        ключей промежуточного названия.
+        """
+        while True:
+            old_title = await self.redis.hget(TITLES_KEY, product_id)
+            if old_title is None and title is None:
+                return
+
+            new_keys = index_keys(title) if title is not None else set()
+            stale_keys = index_keys(old_title) - new_keys if old_title else set()
+            applied = await self._update_script(
+                keys=[TITLES_KEY, *stale_keys, *new_keys],
+                args=[product_id, old_title or "", len(stale_keys), title or "", score],
+            )
+            if applied:
+                return
+
+    async def reconcile(self, products: Iterable[tuple[int, str | None, float]]) -> int:
+        """
+        Приводит записи товаров в индексе в соответствие с БД.
+
+        Названия товаров читаются одним HMGET, исправляются только
+        расхождения.
+
+        Args:
+            products: Кортежи (id, title, score); title None - товар не
+                должен быть в индексе (снят с публикации или удален).
+
+        Returns:
+            Количество исправленных записей.
+        """
+        products = list(products)
+        if not products:
+            return 0
+
+        indexed = await self.redis.hmget(
+            TITLES_KEY, [product_id for product_id, _, _ in products]
+        )
+        fixed = 0
+        for (product_id, title, score), indexed_title in zip(products, indexed):
+            if indexed_title == title:
+                continue
+            if title is None:
+                await self.remove(product_id)
+            else:
+                await self.upsert(product_id, title, score)
+            fixed += 1
+        return fixed
+
+    async def indexed_ids(self, batch_size: int) -> AsyncIterator[list[int]]:
+        """ID товаров в индексе пачками (HSCAN, без чтения всего хеша)."""
+        cursor = 0
+        while True:
+            cursor, titles = await self.redis.hscan(
+                TITLES_KEY, cursor, count=batch_size
+            )
+            if titles:
+                yield [int(product_id) for product_id in titles]
+            if cursor == 0:
+                return
+
+    async def suggest(self, query: str, limit: int = 10) -> list[ProductSuggestion]:
+        """Возвращает подсказки для введенного текста."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        # С запасом: кандидаты, чье название уже не подходит, отбрасываются
+        candidates = (await self._prefix_candidates(tokens))[: limit * 2]
+        if not candidates:
+            return await self._fuzzy_suggestions(tokens[-1], limit)
+
+        titles = await self.redis.hmget(TITLES_KEY, candidates)
+        return [
+            ProductSuggestion(id=int(product_id), title=title)
+            for product_id, title in zip(candidates, titles)
+            if title is not None and matches_prefixes(tokens, title)
+        ][:limit]
+
+    async def _prefix_candidates(self, tokens: list[str]) -> list[str]:
+        """Кандидаты, в названии которых есть слова с префиксами из запроса."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for token in tokens:
+                key = PREFIX_KEY.format(token[:MAX_PREFIX_LENGTH])
+                pipe.zrevrange(key, 0, CANDIDATES_PER_KEY - 1)
+            results = await pipe.execute()
+
+        # Порядок берется по последнему (набираемому) слову
+        ordered = results[-1]
+        for other in results[:-1]:
+            allowed = set(other)
+            ordered = [product_id for product_id in ordered if product_id in allowed]
+        return ordered
+
+    async def _fuzzy_suggestions(
+        self, token: str, limit: int
+    ) -> list[ProductSuggestion]:
+        """Подсказки с учетом опечаток: совпадение по триграммам слова."""
+        token_trigrams = sorted(trigrams(token))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for trigram in token_trigrams:
+                pipe.zrevrange(TRIGRAM_KEY.format(trigram), 0, CANDIDATES_PER_KEY - 1)
+            results = await pipe.execute()
+
+        hits = Counter(product_id for ids in results for product_id in ids)
+        threshold = len(token_trigrams) * MIN_TRIGRAM_SIMILARITY
+        shortlisted = [
+            product_id
+            for product_id, count in hits.most_common(limit * 5)
+            if count >= threshold
+        ]
+        if not shortlisted:
+            return []
+
+        titles = await self.redis.hmget(TITLES_KEY, shortlisted)
+        scored = [
+            (similarity(token, title), product_id, title)
+            for product_id, title in zip(shortlisted, titles)
+            if title is not None
+        ]
+        scored = [item for item in scored if item[0] >= MIN_TRIGRAM_SIMILARITY]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            ProductSuggestion(id=int(product_id), title=title)
+            for _, product_id, title in scored[:limit]
+        ]
@@ -0,0 +1,116 @@
+# app/modules/products/cards.py
+"""
+Поддержка read model product_cards.
+
+Карточка пересобирается одним INSERT ... SELECT ... ON CONFLICT в той же
+транзакции, что и изменение товара, поэтому каталог не расходится с
+products. Для восстановления есть полная пересборка:
+
+    uv run python -m app.modules.products.cards
+"""
+
+import asyncio
+
+from loguru import logger
+from sqlalchemy import Select, delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.products.models import Product, ProductCard, ProductImage
+from app.modules.users.models import User
+
+CARD_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "price",
+    "seller_id",
+    "seller_username",
+    "main_image_key",
+    "images_count",
+    "has_file",
+    "created_at",
+]
+
+
+def _card_source() -> Select:
+    """SELECT, формирующий карточки опубликованных товаров из products."""
+    images_count = (
+        select(func.count(ProductImage.id))
+        .where(ProductImage.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    main_image_key = (
+        select(ProductImage.image_key)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_main.desc(), ProductImage.position, ProductImage.id)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Product.id,
+            Product.title,
+            Product.description,
+            Product.price,
+            Product.user_id,
+            User.username,
+            main_image_key,
+            images_count,
+            Product.file_key.is_not(None),
+            Product.created_at,
+        )
+        .join(User, User.id == Product.user_id)
+        .where(Product.is_published.is_(True))
+    )
+
+
+async def refresh_product_card(db: AsyncSession, product_id: int) -> None:
+    """
+    Пересобирает карточку товара в текущей транзакции.
+
+    Опубликованный товар получает актуальную карточку, для неопубликованного
+    или удаленного карточка удаляется. Коммит остается за вызывающим кодом.
+    """
+    stmt = insert(ProductCard).from_select(
+        CARD_COLUMNS, _card_source().where(Product.id == product_id)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProductCard.id],
+        set_={column: stmt.excluded[column] for column in CARD_COLUMNS[1:]},
+    )
+    await db.execute(stmt)
+
+    await db.execute(
+        delete(ProductCard)
+        .where(ProductCard.id == product_id)
+        .where(
+            ~exists().where(Product.id == product_id, Product.is_published.is_(True))
+        )
+    )
+
+
+async def rebuild_product_cards(db: AsyncSession) -> int:
+    """Полностью пересобирает product_cards из products. Возвращает число карточек."""
+    await db.execute(delete(ProductCard))
+    await db.execute(insert(ProductCard).from_select(CARD_COLUMNS, _card_source()))
+    count = (
+        await db.execute(select(func.count()).select_from(ProductCard))
+    ).scalar_one()
+    await db.commit()
+    return count
+
+
+async def main() -> None:
+    from app.core.db_helper import engine, sessionmaker
+
+    async with sessionmaker() as db:
+        count = await rebuild_product_cards(db)
+    await engine.dispose()
+    logger.info(f"product_cards пересобраны: {count} карточек")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
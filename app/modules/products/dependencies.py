@@ -3,20 +3,30 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db_helper import get_session
-from app.core.redis import get_redis_client
+from app.core.redis import get_redis_binary_client, get_redis_client
+from app.modules.products.autocomplete import AutocompleteIndex
 from app.modules.products.service import ProductService
 
 
 def get_full_product_service(
     redis: Redis = Depends(get_redis_client),
+    cache_redis: Redis = Depends(get_redis_binary_client),
     db: AsyncSession = Depends(get_session),
 ) -> ProductService:
     """Возвращает экземпляр ProductService с доступом к БД."""
-    return ProductService(redis=redis, db=db)
+    return ProductService(redis=redis, cache_redis=cache_redis, db=db)
 
 
 def get_cached_product_service(
     redis: Redis = Depends(get_redis_client),
+    cache_redis: Redis = Depends(get_redis_binary_client),
 ) -> ProductService:
     """Возвращает экземпляр ProductService только с Redis кэшем."""
-    return ProductService(redis=redis)
+    return ProductService(redis=redis, cache_redis=cache_redis)
+
+
+def get_autocomplete_index(
+    redis: Redis = Depends(get_redis_client),
+) -> AutocompleteIndex:
+    """Возвращает индекс автодополнения названий товаров."""
+    return AutocompleteIndex(redis)
@@ -1,11 +1,25 @@
 """Модели товаров для ORM SQLAlchemy."""
 
 import datetime
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import (
+    BigInteger,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db_helper import Base
 
+# Конфигурация полнотекстового поиска. Должна совпадать с той, что
+# используется в генерируемой колонке search_vector (см. миграцию).
+SEARCH_CONFIG = "simple"
+
 
 class Product(Base):
     """Модель товара."""
@@ -23,12 +37,17 @@ class Product(Base):
     file_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     file_size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     file_content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    file_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     is_published: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    # Индекс нужен инкрементальной сверке автодополнения (изменения с момента)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=func.now(), onupdate=func.now()
+        DateTime, default=func.now(), onupdate=func.now(), index=True
     )
+    # Растет при каждом изменении товара (включая изображения и файл);
+    # по нему кэш отбрасывает запись от более старого writer-а
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
 
     seller: Mapped["User"] = relationship(back_populates="products")  # noqa: F821
     images: Mapped[list["ProductImage"]] = relationship(
@@ -45,7 +64,7 @@ class ProductImage(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     product_id: Mapped[int] = mapped_column(
-        ForeignKey("products.id", ondelete="CASCADE")
+        ForeignKey("products.id", ondelete="CASCADE"), index=True
     )
 
     image_key: Mapped[str] = mapped_column(String(500))
@@ -59,3 +78,59 @@ class ProductImage(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
     product: Mapped["Product"] = relationship(back_populates="images")
+
+
+class ProductCard(Base):
+    """
+    Денормализованная карточка опубликованного товара (read model).
+
+    Содержит ровно то, что нужно для ProductPublicResponse, и поддерживается
+    в актуальном состоянии из write-путей ProductService (см. cards.py).
+    Каталог и поиск читают только эту таблицу.
+    """
+
+    __tablename__ = "product_cards"
+
+    id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    title: Mapped[str] = mapped_column(String(150))
+    description: Mapped[str] = mapped_column(Text)
+    price: Mapped[float]
+    seller_id: Mapped[int]
+    seller_username: Mapped[str | None] = mapped_column(String(25), nullable=True)
+    main_image_key: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    images_count: Mapped[int] = mapped_column(default=0)
+    has_file: Mapped[bool] = mapped_column(default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+
+# Индексы для keyset-пагинации каталога: (created_at, id) по убыванию.
+Index(
+    "ix_product_cards_created_at_id",
+    ProductCard.created_at.desc(),
+    ProductCard.id.desc(),
+)
+Index(
+    "ix_product_cards_seller_created_at_id",
+    ProductCard.seller_id,
+    ProductCard.created_at.desc(),
+    ProductCard.id.desc(),
+)
+
+# GIN-индекс для полнотекстового поиска по названию и описанию.
+Index(
+    "ix_product_cards_search_vector",
+    ProductCard.search_vector,
+    postgresql_using="gin",
+)
@@ -1,10 +1,21 @@
 # app/modules/products/router.py
 
-from fastapi import APIRouter, Depends, File, Form, Query, Request, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 
 from app.core.rate_limit import limiter
 from app.modules.auth.dependencies import get_current_user_id
+from app.modules.products.autocomplete import AutocompleteIndex
 from app.modules.products.dependencies import (
+    get_autocomplete_index,
     get_cached_product_service,
     get_full_product_service,
 )
@@ -14,7 +25,16 @@ from app.modules.products.schemas import (
     ProductDownloadResponse,
     ProductFileUploadResponse,
     ProductImageUploadResponse,
+    ProductListResponse,
+    ProductSearchResponse,
+    ProductSuggestion,
     ProductUpdate,
+    ProductUploadInitiate,
+    ProductUploadInitiateResponse,
+    ProductUploadPartUrlsRequest,
+    ProductUploadPartUrlsResponse,
+    ProductUploadSessionCreate,
+    ProductUploadSessionResponse,
 )
 from app.modules.products.service import ProductService
 
@@ -43,13 +63,102 @@ async def create_product(
     return await service.create_product(user_id, product)
 
 
+@router.get("/", response_model=ProductListResponse)
+async def list_products(
+    cursor: str | None = Query(None, description="Cursor of the next page"),
+    limit: int = Query(20, ge=1, le=100),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    seller_id: int | None = Query(None),
+    approximate_total: bool = Query(
+        False, description="Estimate total from planner statistics"
+    ),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """
+    Получает каталог опубликованных товаров.
+
+    - Курсорная пагинация: передайте `next_cursor` из предыдущего ответа
+    - `approximate_total` заменяет COUNT(*) на оценку планировщика
+    """
+    return await service.list_products(
+        limit=limit,
+        cursor=cursor,
+        min_price=min_price,
+        max_price=max_price,
+        seller_id=seller_id,
+        approximate_total=approximate_total,
+    )
+
+
+@router.get("/search", response_model=ProductSearchResponse)
+async def search_products(
+    q: str = Query(..., min_length=2, max_length=200, description="Search query"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """
+    Полнотекстовый поиск по опубликованным товарам.
+
+    - Поддерживается синтаксис websearch: "фраза", -исключение, OR
+    - Результаты отсортированы по релевантности (ts_rank)
+    """
+    return await service.search_products(q, limit=limit, offset=offset)
+
+
+@router.get("/autocomplete", response_model=list[ProductSuggestion])
+async def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed text"),
+    limit: int = Query(10, ge=1, le=20),
+    index: AutocompleteIndex = Depends(get_autocomplete_index),
+):
+    """
+    Подсказки по названиям опубликованных товаров.
+
+    - Работает только через Redis, без обращений к БД
+    - Учитывает опечатки (по триграммам), если точных префиксов нет
+    """
+    return await index.suggest(q, limit=limit)
+
+
+@router.get("/batch", response_model=list[ProductDetailResponse])
+async def get_products_batch(
+    ids: str = Query(..., description="Comma-separated product IDs, up to 100"),
+    service: ProductService = Depends(get_cached_product_service),
+):
+    """
+    Получает несколько товаров по ID за один запрос.
+
+    - Порядок ответа совпадает с порядком `ids`
+    - Несуществующие товары пропускаются
+    """
+    return await service.get_products_with_cache(service.parse_product_ids(ids))
+
+
 @router.get("/{product_id}", response_model=ProductDetailResponse)
 async def get_product(
     product_id: int,
     service: ProductService = Depends(get_cached_product_service),
 ):
     """Получает товар по ID."""
-    return await service.get_product_with_cache(product_id)
+    return Response(
+        content=await service.get_product_json(product_id),
+        media_type="application/json",
+    )
+
+
+@router.patch("/{product_id}", response_model=ProductDetailResponse)
+@limiter.limit("30/minute")
+async def update_product(
+    request: Request,
+    product_id: int,
+    schema: ProductUpdate,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Обновляет товар (в т.ч. публикует или снимает с публикации)."""
+    return await service.update_product(user_id, product_id, schema)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -109,6 +218,141 @@ async def delete_product_file(
     return await service.delete_product_file(user_id, product_id)
 
 
+# ═══════════════════════════════════════════════════════════════
+# DIRECT UPLOAD
+# ═══════════════════════════════════════════════════════════════
+
+
+@router.post(
+    "/{product_id}/uploads",
+    response_model=ProductUploadInitiateResponse,
+    summary="Initiate direct upload to storage",
+)
+@limiter.limit("20/minute")
+async def initiate_upload(
+    request: Request,
+    product_id: int,
+    schema: ProductUploadInitiate,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """
+    Начинает прямую загрузку файла или изображения в хранилище.
+
+    - Возвращает URL и поля формы presigned POST
+    - Размер и Content-Type файла должны совпадать с заявленными
+    - После загрузки нужно вызвать /uploads/{upload_id}/complete
+    """
+    return await service.initiate_upload(user_id, product_id, schema)
+
+
+@router.post(
+    "/{product_id}/uploads/{upload_id}/complete",
+    response_model=ProductFileUploadResponse | ProductImageUploadResponse,
+    summary="Complete direct upload",
+)
+@limiter.limit("20/minute")
+async def complete_upload(
+    request: Request,
+    product_id: int,
+    upload_id: str,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Проверяет загруженный объект и привязывает его к товару."""
+    return await service.complete_upload(user_id, product_id, upload_id)
+
+
+# ═══════════════════════════════════════════════════════════════
+# RESUMABLE UPLOAD
+# ═══════════════════════════════════════════════════════════════
+
+
+@router.post(
+    "/{product_id}/file/sessions",
+    response_model=ProductUploadSessionResponse,
+    status_code=201,
+    summary="Create resumable upload session",
+)
+@limiter.limit("5/minute")
+async def create_upload_session(
+    request: Request,
+    product_id: int,
+    schema: ProductUploadSessionCreate,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """
+    Создает сессию возобновляемой загрузки файла товара.
+
+    - Файл загружается частями по part_size байт (последняя - остаток)
+    - Части можно загружать в любом порядке, параллельно и повторно
+    - Сессия действует 24 часа с момента создания
+    """
+    return await service.create_upload_session(user_id, product_id, schema)
+
+
+@router.get(
+    "/{product_id}/file/sessions/{session_id}",
+    response_model=ProductUploadSessionResponse,
+    summary="Get upload session status",
+)
+async def get_upload_session(
+    product_id: int,
+    session_id: str,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Возвращает состояние сессии и список уже загруженных частей."""
+    return await service.get_upload_session(user_id, product_id, session_id)
+
+
+@router.post(
+    "/{product_id}/file/sessions/{session_id}/parts",
+    response_model=ProductUploadPartUrlsResponse,
+    summary="Get upload URLs for parts",
+)
+@limiter.limit("120/minute")
+async def get_upload_part_urls(
+    request: Request,
+    product_id: int,
+    session_id: str,
+    schema: ProductUploadPartUrlsRequest,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Возвращает presigned PUT ссылки для загрузки частей в хранилище."""
+    return await service.get_upload_part_urls(
+        user_id, product_id, session_id, schema.part_numbers
+    )
+
+
+@router.post(
+    "/{product_id}/file/sessions/{session_id}/complete",
+    response_model=ProductFileUploadResponse,
+    summary="Complete resumable upload",
+)
+async def complete_upload_session(
+    product_id: int,
+    session_id: str,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Собирает файл из частей и привязывает его к товару."""
+    return await service.complete_upload_session(user_id, product_id, session_id)
+
+
+@router.delete("/{product_id}/file/sessions/{session_id}")
+async def abort_upload_session(
+    product_id: int,
+    session_id: str,
+    user_id: int = Depends(get_current_user_id),
+    service: ProductService = Depends(get_full_product_service),
+):
+    """Отменяет загрузку и удаляет загруженные части."""
+    return await service.abort_upload_session(user_id, product_id, session_id)
+
+
 # ═══════════════════════════════════════════════════════════════
 # IMAGE OPERATIONS
 # ═══════════════════════════════════════════════════════════════
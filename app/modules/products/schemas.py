@@ -1,6 +1,8 @@
 # app/modules/products/schemas.py
 
 from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -73,14 +75,74 @@ class ProductFileUploadResponse(BaseModel):
     file_name: str
     file_size: int
     file_content_type: str
+    file_sha256: str | None = None
     message: str = "File uploaded successfully"
 
 
+class ProductUploadInitiate(BaseModel):
+    """Схема для начала прямой загрузки файла или изображения в хранилище."""
+
+    kind: Literal["file", "image"]
+    file_name: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(..., min_length=1, max_length=100)
+    size: int = Field(..., gt=0)
+    is_main: bool = False
+
+
+class ProductUploadInitiateResponse(BaseModel):
+    """Presigned POST для загрузки в хранилище без участия API."""
+
+    upload_id: str
+    url: str
+    fields: dict[str, str]
+    expires_in: int
+
+
+class ProductUploadSessionCreate(BaseModel):
+    """Схема для создания сессии возобновляемой загрузки файла товара."""
+
+    file_name: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field("application/octet-stream", max_length=100)
+    size: int = Field(..., gt=0)
+
+
+class ProductUploadedPart(BaseModel):
+    """Загруженная часть файла."""
+
+    part_number: int
+    size: int
+
+
+class ProductUploadSessionResponse(BaseModel):
+    """Состояние сессии возобновляемой загрузки."""
+
+    session_id: str
+    size: int
+    part_size: int
+    part_count: int
+    uploaded_parts: list[ProductUploadedPart] = []
+    expires_at: datetime
+
+
+class ProductUploadPartUrlsRequest(BaseModel):
+    """Номера частей (с 1), для которых нужны ссылки на загрузку."""
+
+    part_numbers: list[int] = Field(..., min_length=1, max_length=100)
+
+
+class ProductUploadPartUrlsResponse(BaseModel):
+    """Presigned PUT ссылки на загрузку частей."""
+
+    urls: dict[int, str]
+    expires_in: int
+
+
 class ProductDownloadResponse(BaseModel):
     """Ответ с URL для скачивания файла товара."""
 
     download_url: str
     file_name: str
+    file_sha256: str | None = None
     expires_in: int = 3600  # seconds
 
 
@@ -133,10 +195,38 @@ class ProductPrivateResponse(ProductDetailResponse):
 
 
 class ProductListResponse(BaseModel):
-    """Ответ со списком товаров с пагинацией."""
+    """Ответ со списком товаров с курсорной (keyset) пагинацией."""
 
     items: list[ProductPublicResponse]
     total: int
-    page: int
+    is_total_approximate: bool = False
+    per_page: int
+    next_cursor: str | None = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# SEARCH RESPONSES
+# ═══════════════════════════════════════════════════════════════
+
+
+class ProductSearchResult(ProductPublicResponse):
+    """Товар в результатах полнотекстового поиска."""
+
+    rank: float
+    headline: str
+
+
+class ProductSearchResponse(BaseModel):
+    """Ответ с результатами полнотекстового поиска."""
+
+    items: list[ProductSearchResult]
+    query: str
     per_page: int
-    pages: int
+    offset: int
+
+
+class ProductSuggestion(BaseModel):
+    """Подсказка автодополнения по названию товара."""
+
+    id: int
+    title: str
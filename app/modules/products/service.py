@@ -1,20 +1,49 @@
 # app/modules/products/service.py
 
+import asyncio
+import base64
+import binascii
+import json
 import mimetypes
-from io import BytesIO
+import secrets
+import time
+import uuid
+from datetime import UTC, datetime
 from pathlib import Path
 
 from fastapi import HTTPException, UploadFile, status
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, literal_column, select, text, tuple_
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import (
+    CACHE_WARM_DURATION,
+    CACHE_WARM_KEYS,
+    CACHE_WARM_PROGRESS,
+    RELEASE_LOCK_SCRIPT,
+    CacheTags,
+    TwoTierCache,
+    Versioned,
+    catalog_local_cache,
+    product_local_cache,
+)
 from app.core.config import settings
 from app.core.db_helper import sessionmaker as async_session_factory
-from app.core.minio_client import minio_client
-from app.modules.products.models import Product, ProductImage
+from app.core.minio_client import HashingReader, minio_client
+from app.modules.products.cards import refresh_product_card
+from app.modules.products.models import (
+    SEARCH_CONFIG,
+    Product,
+    ProductCard,
+    ProductImage,
+)
+from app.modules.products.tasks import (
+    PENDING_UPLOADS_KEY,
+    sync_product_autocomplete,
+)
 from app.modules.products.schemas import (
     ProductCreate,
     ProductUpdate,
@@ -24,15 +53,52 @@ from app.modules.products.schemas import (
     ProductFileUploadResponse,
     ProductImageResponse,
     ProductImageUploadResponse,
+    ProductListResponse,
     ProductPublicResponse,
+    ProductSearchResponse,
+    ProductSearchResult,
+    ProductUploadedPart,
+    ProductUploadInitiate,
+    ProductUploadInitiateResponse,
+    ProductUploadPartUrlsResponse,
+    ProductUploadSessionCreate,
+    ProductUploadSessionResponse,
 )
 
+# Максимум ID в одном запросе GET /products/batch
+MAX_BATCH_SIZE = 100
+
+# Незавершенная прямая загрузка в хранилище (presigned POST)
+PRODUCT_UPLOAD_KEY = "product_upload:{}"
+# Сессия возобновляемой загрузки файла товара (multipart upload)
+UPLOAD_SESSION_KEY = "upload_session:{}"
+# Сессию завершает или отменяет сейчас один запрос (значение - его токен)
+UPLOAD_SESSION_CLAIM_KEY = "upload_session_claim:{}"
+
 
 class ProductService:
-    def __init__(self, redis: Redis, db: AsyncSession | None = None) -> None:
+    def __init__(
+        self, redis: Redis, cache_redis: Redis, db: AsyncSession | None = None
+    ) -> None:
         self.redis = redis
         self.db = db
         self.minio = minio_client
+        self.cache = TwoTierCache(
+            cache_redis,
+            product_local_cache,
+            ProductDetailResponse,
+            soft_ttl=settings.CACHE_PRODUCT_SOFT_TTL_SECONDS,
+            hard_ttl=settings.CACHE_PRODUCT_HARD_TTL_SECONDS,
+        )
+        # Страницы каталога продавца под ключами с тегом seller:<id>
+        self.pages = TwoTierCache(
+            cache_redis,
+            catalog_local_cache,
+            ProductListResponse,
+            soft_ttl=settings.CACHE_SELLER_PAGE_TTL_SECONDS,
+            hard_ttl=settings.CACHE_SELLER_PAGE_TTL_SECONDS,
+        )
+        self.tags = CacheTags(redis)
 
     # ═══════════════════════════════════════════════════════════════
     # CRUD OPERATIONS
@@ -48,12 +114,35 @@ class ProductService:
         )
 
         self.db.add(new_product)
+        await self.db.flush()
+        await refresh_product_card(self.db, new_product.id)
         await self.db.commit()
         await self.db.refresh(new_product)
+        await self.invalidate_product_cache(new_product.id, user_id)
+
+        await sync_product_autocomplete.kiq(new_product.id)
 
         logger.info(f"Created product {new_product.id} by user {user_id}")
         return new_product
 
+    async def update_product(
+        self, user_id: int, product_id: int, schema: ProductUpdate
+    ) -> ProductDetailResponse:
+        """Обновляет товар (название, описание, цену, публикацию)."""
+        product = await self._get_product_for_owner(product_id, user_id)
+
+        for field, value in schema.model_dump(
+            exclude_unset=True, exclude_none=True
+        ).items():
+            setattr(product, field, value)
+
+        detail = await self._commit_and_write_through(product)
+
+        await sync_product_autocomplete.kiq(product_id)
+
+        logger.info(f"Updated product {product_id} by user {user_id}")
+        return detail
+
     async def get_product_by_id(self, product_id: int) -> Product | None:
         """Получает товар по ID с изображениями."""
         result = await self.db.execute(
@@ -64,38 +153,130 @@ class ProductService:
         return result.scalar_one_or_none()
 
     async def get_product_with_cache(self, product_id: int) -> ProductDetailResponse:
-        """Получает товар с кэшированием."""
-        cache_key = f"product:{product_id}"
+        """
+        Получает товар с кэшированием.
 
-        # Проверка кэша
-        cached = await self.redis.get(cache_key)
-        if cached:
-            return ProductDetailResponse.model_validate_json(cached)
+        Конкурентные промахи по одному товару объединяются: из БД
+        загружает только один запрос, остальные ждут его результата.
+        Устаревшая запись отдается сразу и обновляется в фоне, отсутствие
+        товара кэшируется на короткое время.
+        """
+        product = await self.cache.get_or_load(
+            f"product:{product_id}", lambda: self._load_product_detail(product_id)
+        )
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            )
+        return product
 
-        # Получение из БД
-        if self.db:
-            product = await self.get_product_by_id(product_id)
-        else:
-            async with async_session_factory() as temp_db:
-                result = await temp_db.execute(
-                    select(Product)
-                    .options(selectinload(Product.images))
-                    .where(Product.id == product_id)
-                )
-                product = result.scalar_one_or_none()
+    async def get_product_json(self, product_id: int) -> bytes:
+        """
+        Получает товар с кэшированием в виде готового JSON ответа.
 
-        if not product:
+        Быстрый путь для GET /products/{product_id}: без повторной
+        валидации и сериализации ответа в FastAPI.
+        """
+        product = await self.cache.get_or_load_json(
+            f"product:{product_id}", lambda: self._load_product_detail(product_id)
+        )
+        if product is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
             )
+        return product
+
+    async def _load_product_detail(self, product_id: int) -> Versioned | None:
+        """
+        Загружает товар из БД и формирует детальный ответ (None, если нет)
+        вместе с версией товара для условной записи в кэш.
+
+        Использует собственную сессию: загрузчик может выполняться в фоне
+        уже после завершения запроса.
+        """
+        async with async_session_factory() as temp_db:
+            result = await temp_db.execute(
+                select(Product)
+                .options(selectinload(Product.images))
+                .where(Product.id == product_id)
+            )
+            product = result.scalar_one_or_none()
+
+        if not product:
+            return None
 
-        # Формирование ответа
-        response = await self._build_product_detail_response(product)
+        detail = await self._build_product_detail_response(product)
+        return Versioned(detail, product.version)
 
-        # Кэширование
-        await self.redis.set(cache_key, response.model_dump_json(), ex=1800)
+    async def get_products_with_cache(
+        self, product_ids: list[int]
+    ) -> list[ProductDetailResponse]:
+        """
+        Получает несколько товаров с кэшированием.
 
-        return response
+        Локальный кэш процесса, затем один MGET для остальных ключей, один
+        IN-запрос для промахов и один конвейер условной записи в кэш
+        (TwoTierCache.set_many).
+        Порядок ответа совпадает с порядком ID в запросе, несуществующие
+        товары пропускаются (и кэшируются как отсутствующие).
+        """
+        # Проверка кэша
+        cached = await self.cache.get_many(
+            [f"product:{pid}" for pid in product_ids],
+            loaders=lambda key: (
+                lambda: self._load_product_detail(int(key.split(":")[1]))
+            ),
+        )
+        found: dict[int, ProductDetailResponse] = {
+            product.id: product for product in cached.values() if product
+        }
+
+        # Получение промахов из БД одним запросом
+        missing = [pid for pid in product_ids if f"product:{pid}" not in cached]
+        if missing:
+            started = time.monotonic()
+            stmt = (
+                select(Product)
+                .options(selectinload(Product.images))
+                .where(Product.id.in_(missing))
+            )
+            if self.db:
+                products = (await self.db.execute(stmt)).scalars().all()
+            else:
+                async with async_session_factory() as temp_db:
+                    products = (await temp_db.execute(stmt)).scalars().all()
+
+            # Кэширование
+            filled = {}
+            for product in products:
+                found[product.id] = await self._build_product_detail_response(product)
+                filled[f"product:{product.id}"] = Versioned(
+                    found[product.id], product.version
+                )
+            await self.cache.set_many(filled, delta=time.monotonic() - started)
+            await self.cache.set_missing(
+                [f"product:{pid}" for pid in missing if pid not in found]
+            )
+
+        return [found[pid] for pid in product_ids if pid in found]
+
+    @staticmethod
+    def parse_product_ids(ids: str) -> list[int]:
+        """Разбирает список ID товаров через запятую (без повторов)."""
+        try:
+            product_ids = [int(part) for part in ids.split(",") if part.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids"
+            )
+
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids or len(product_ids) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Expected 1 to {MAX_BATCH_SIZE} product ids",
+            )
+        return product_ids
 
     async def _build_product_detail_response(
         self, product: Product
@@ -133,9 +314,350 @@ class ProductService:
             updated_at=product.updated_at,
         )
 
-    async def invalidate_product_cache(self, product_id: int) -> None:
-        """Инвалидирует кэш товара."""
-        await self.redis.delete(f"product:{product_id}")
+    async def invalidate_product_cache(self, product_id: int, seller_id: int) -> None:
+        """
+        Инвалидирует кэш товара и все представления с тегом его продавца
+        (закэшированные страницы продавца).
+        """
+        await self.cache.invalidate(f"product:{product_id}")
+        await self.tags.bump(f"seller:{seller_id}")
+
+    async def _commit_and_write_through(
+        self, product: Product
+    ) -> ProductDetailResponse:
+        """
+        Фиксирует изменения товара и сразу записывает новый ответ в кэш.
+
+        Версия товара увеличивается в той же транзакции: UPDATE строки
+        держит блокировку до COMMIT, поэтому порядок версий совпадает
+        с порядком фиксации конкурентных изменений, и запись в кэш от
+        более старого writer-а отбрасывается (TwoTierCache.write_through).
+
+        Товар с изображениями перечитывается в объект сессии до COMMIT:
+        изображения могли меняться UPDATE-запросами в обход ORM.
+        """
+        product.version = Product.version + 1
+        await refresh_product_card(self.db, product.id)
+        await self.db.execute(
+            select(Product)
+            .options(selectinload(Product.images))
+            .where(Product.id == product.id)
+            .execution_options(populate_existing=True)
+        )
+        await self.db.commit()
+
+        detail = await self._build_product_detail_response(product)
+        await self.cache.write_through(f"product:{product.id}", detail, product.version)
+        await self.tags.bump(f"seller:{product.user_id}")
+        return detail
+
+    # ═══════════════════════════════════════════════════════════════
+    # CACHE WARMING
+    # ═══════════════════════════════════════════════════════════════
+
+    async def warm_cache(
+        self, limit: int, batch_size: int, batches_per_second: float
+    ) -> int:
+        """
+        Предзагружает в кэш детальные ответы самых новых опубликованных
+        товаров (после выкатки или очистки Redis).
+
+        Пачками по batch_size: EXISTS ключей одним конвейером, один
+        IN-запрос для отсутствующих и один конвейер условной записи: товар,
+        измененный во время прогрева, не заменяется прочитанной раньше
+        версией. Пачки, которым понадобилась БД, выполняются не чаще
+        batches_per_second в секунду.
+
+        Returns:
+            Число загруженных в кэш товаров.
+        """
+        started = time.monotonic()
+        CACHE_WARM_PROGRESS.labels("product").set(0)
+
+        async with async_session_factory() as temp_db:
+            result = await temp_db.execute(
+                select(ProductCard.id)
+                .order_by(ProductCard.created_at.desc(), ProductCard.id.desc())
+                .limit(limit)
+            )
+            product_ids = result.scalars().all()
+
+        loaded = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch_started = time.monotonic()
+            batch = product_ids[start : start + batch_size]
+            missing = await self.cache.missing([f"product:{pid}" for pid in batch])
+            CACHE_WARM_KEYS.labels("product", "cached").inc(len(batch) - len(missing))
+
+            if missing:
+                async with async_session_factory() as temp_db:
+                    result = await temp_db.execute(
+                        select(Product)
+                        .options(selectinload(Product.images))
+                        .where(Product.id.in_([int(k.split(":")[1]) for k in missing]))
+                    )
+                    products = result.scalars().all()
+
+                details = {
+                    f"product:{product.id}": Versioned(
+                        await self._build_product_detail_response(product),
+                        product.version,
+                    )
+                    for product in products
+                }
+                written = await self.cache.set_many(
+                    details, delta=time.monotonic() - batch_started
+                )
+                loaded += written
+                CACHE_WARM_KEYS.labels("product", "loaded").inc(written)
+
+                # Ограничение нагрузки на PostgreSQL
+                pause = 1 / batches_per_second - (time.monotonic() - batch_started)
+                if pause > 0:
+                    await asyncio.sleep(pause)
+
+            CACHE_WARM_PROGRESS.labels("product").set(
+                (start + len(batch)) / len(product_ids)
+            )
+
+        duration = time.monotonic() - started
+        CACHE_WARM_PROGRESS.labels("product").set(1)
+        CACHE_WARM_DURATION.labels("product").observe(duration)
+        logger.info(
+            f"Прогрев кэша товаров: загружено {loaded} из {len(product_ids)} "
+            f"за {duration:.1f} с"
+        )
+        return loaded
+
+    # ═══════════════════════════════════════════════════════════════
+    # CATALOG
+    # ═══════════════════════════════════════════════════════════════
+
+    async def list_products(
+        self,
+        limit: int = 20,
+        cursor: str | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        seller_id: int | None = None,
+        approximate_total: bool = False,
+    ) -> ProductListResponse:
+        """
+        Возвращает страницу опубликованных товаров.
+
+        Пагинация курсорная по (created_at, id), поэтому стоимость страницы
+        не зависит от ее глубины. Данные читаются из product_cards одним
+        запросом, без JOIN и ленивых загрузок.
+
+        Страницы продавца (seller_id) кэшируются под тегом seller:<id>:
+        любое изменение его товаров инвалидирует их одним INCR.
+        """
+        if seller_id is None:
+            return await self._query_products(
+                self.db,
+                limit,
+                cursor,
+                min_price,
+                max_price,
+                seller_id,
+                approximate_total,
+            )
+
+        cache_key = await self.tags.key(
+            f"catalog:seller:{seller_id}:{limit}:{cursor}:{min_price}:{max_price}"
+            f":{approximate_total}",
+            f"seller:{seller_id}",
+        )
+        return await self.pages.get_or_load(
+            cache_key,
+            lambda: self._load_products_page(
+                limit, cursor, min_price, max_price, seller_id, approximate_total
+            ),
+        )
+
+    async def _load_products_page(
+        self,
+        limit: int,
+        cursor: str | None,
+        min_price: float | None,
+        max_price: float | None,
+        seller_id: int | None,
+        approximate_total: bool,
+    ) -> ProductListResponse:
+        """
+        Загрузчик страницы для кэша. Использует собственную сессию:
+        может выполняться в фоне уже после завершения запроса.
+        """
+        async with async_session_factory() as temp_db:
+            return await self._query_products(
+                temp_db,
+                limit,
+                cursor,
+                min_price,
+                max_price,
+                seller_id,
+                approximate_total,
+            )
+
+    async def _query_products(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: str | None,
+        min_price: float | None,
+        max_price: float | None,
+        seller_id: int | None,
+        approximate_total: bool,
+    ) -> ProductListResponse:
+        """Читает страницу каталога из product_cards."""
+        filters = []
+        if min_price is not None:
+            filters.append(ProductCard.price >= min_price)
+        if max_price is not None:
+            filters.append(ProductCard.price <= max_price)
+        if seller_id is not None:
+            filters.append(ProductCard.seller_id == seller_id)
+
+        stmt = (
+            select(ProductCard)
+            .where(*filters)
+            .order_by(ProductCard.created_at.desc(), ProductCard.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            cursor_created_at, cursor_id = self._decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(ProductCard.created_at, ProductCard.id)
+                < tuple_(cursor_created_at, cursor_id)
+            )
+
+        cards = (await db.execute(stmt)).scalars().all()
+        has_next = len(cards) > limit
+        cards = cards[:limit]
+
+        items = [await self._build_public_response(card) for card in cards]
+
+        next_cursor = None
+        if has_next:
+            last = cards[-1]
+            next_cursor = self._encode_cursor(last.created_at, last.id)
+
+        count_stmt = select(ProductCard.id).where(*filters)
+        if approximate_total:
+            total = await self._estimate_count(db, count_stmt)
+        else:
+            total = (
+                await db.execute(
+                    select(func.count()).select_from(count_stmt.subquery())
+                )
+            ).scalar_one()
+
+        return ProductListResponse(
+            items=items,
+            total=total,
+            is_total_approximate=approximate_total,
+            per_page=limit,
+            next_cursor=next_cursor,
+        )
+
+    async def search_products(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> ProductSearchResponse:
+        """
+        Полнотекстовый поиск по названию и описанию опубликованных товаров.
+
+        Ранжирование выполняется по GIN-индексу search_vector в product_cards,
+        а дорогой ts_headline считается только для строк итоговой страницы.
+        """
+        search_config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        ts_query = func.websearch_to_tsquery(search_config, query)
+        rank = func.ts_rank(ProductCard.search_vector, ts_query)
+
+        ranked = (
+            select(ProductCard.id.label("id"), rank.label("rank"))
+            .where(ProductCard.search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), ProductCard.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        headline = func.ts_headline(
+            search_config,
+            ProductCard.title + " " + ProductCard.description,
+            ts_query,
+            "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, "
+            "MaxFragments=2",
+        )
+
+        stmt = (
+            select(ProductCard, ranked.c.rank, headline.label("headline"))
+            .join(ranked, ranked.c.id == ProductCard.id)
+            .order_by(ranked.c.rank.desc(), ProductCard.id.desc())
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        items = []
+        for card, rank_value, headline_value in rows:
+            public = await self._build_public_response(card)
+            items.append(
+                ProductSearchResult(
+                    **public.model_dump(), rank=rank_value, headline=headline_value
+                )
+            )
+
+        return ProductSearchResponse(
+            items=items, query=query, per_page=limit, offset=offset
+        )
+
+    async def _build_public_response(self, card: ProductCard) -> ProductPublicResponse:
+        """Формирует публичный ответ из карточки товара."""
+        main_image_url = None
+        if card.main_image_key:
+            main_image_url = await self.minio.generate_public_url(
+                settings.MINIO_BUCKET_IMAGES, card.main_image_key
+            )
+        return ProductPublicResponse(
+            id=card.id,
+            title=card.title,
+            description=card.description,
+            price=card.price,
+            seller_id=card.seller_id,
+            seller_username=card.seller_username,
+            main_image_url=main_image_url,
+            images_count=card.images_count,
+            has_file=card.has_file,
+            created_at=card.created_at,
+        )
+
+    async def _estimate_count(self, db: AsyncSession, stmt: Select) -> int:
+        """Оценивает количество строк по плану запроса (без COUNT(*))."""
+        compiled = stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def _encode_cursor(created_at: datetime, product_id: int) -> str:
+        """Кодирует позицию последнего товара страницы в курсор."""
+        raw = f"{created_at.isoformat()}|{product_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+        """Декодирует курсор в пару (created_at, id)."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded).decode()
+            created_at, product_id = raw.split("|", 1)
+            return datetime.fromisoformat(created_at), int(product_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
 
     # ═══════════════════════════════════════════════════════════════
     # FILE UPLOAD / DOWNLOAD
@@ -152,70 +674,91 @@ class ProductService:
         product = await self._get_product_for_owner(product_id, user_id)
 
         # Валидация файла
-        await self._validate_product_file(file)
-
-        # Чтение файла
-        file_data = await file.read()
-        file_size = len(file_data)
+        file_size = await self._validate_product_file(file)
 
         # Определение content-type
         content_type = file.content_type or mimetypes.guess_type(file.filename)[0]
         if not content_type:
             content_type = "application/octet-stream"
 
-        # Удаление старого файла если есть
-        if product.file_key:
-            await self.minio.delete_file(
-                settings.MINIO_BUCKET_PRODUCTS, product.file_key
-            )
-
-        # Загрузка нового файла
+        # Загрузка нового файла потоком из временного файла UploadFile:
+        # размер и SHA-256 считаются по мере чтения частей
+        reader = HashingReader(file.file)
         file_key = await self.minio.upload_file(
             bucket=settings.MINIO_BUCKET_PRODUCTS,
-            file_data=BytesIO(file_data),
+            file_data=reader,
             file_size=file_size,
             original_filename=file.filename,
             content_type=content_type,
             folder=f"products/{product_id}",
         )
 
-        # Обновление записи в БД
+        return await self._attach_product_file(
+            product,
+            file_key=file_key,
+            file_name=file.filename,
+            file_size=reader.size,
+            content_type=content_type,
+            sha256=reader.hexdigest(),
+        )
+
+    async def _attach_product_file(
+        self,
+        product: Product,
+        file_key: str,
+        file_name: str,
+        file_size: int,
+        content_type: str,
+        sha256: str | None,
+    ) -> ProductFileUploadResponse:
+        """Привязывает загруженный объект к товару, удаляя прежний файл."""
+        old_file_key = product.file_key
+
         product.file_key = file_key
-        product.file_name = file.filename
+        product.file_name = file_name
         product.file_size = file_size
         product.file_content_type = content_type
+        product.file_sha256 = sha256
 
-        await self.db.commit()
-        await self.invalidate_product_cache(product_id)
+        await self._commit_and_write_through(product)
+
+        if old_file_key:
+            await self.minio.delete_file(settings.MINIO_BUCKET_PRODUCTS, old_file_key)
 
-        logger.info(f"Uploaded file for product {product_id}: {file.filename}")
+        logger.info(f"Uploaded file for product {product.id}: {file_name}")
 
         return ProductFileUploadResponse(
-            file_name=file.filename,
+            file_name=file_name,
             file_size=file_size,
             file_content_type=content_type,
+            file_sha256=sha256,
         )
 
-    async def _validate_product_file(self, file: UploadFile) -> None:
-        """Валидирует файл товара."""
-        if not file.filename:
+    async def _validate_product_file(self, file: UploadFile) -> int:
+        """Валидирует файл товара и возвращает его размер."""
+        # Проверка размера (без чтения файла)
+        file.file.seek(0, 2)  # Переход в конец
+        size = file.file.tell()
+        file.file.seek(0)  # Возврат в начало
+
+        self._check_product_file(file.filename, size)
+        return size
+
+    def _check_product_file(self, file_name: str | None, size: int) -> None:
+        """Проверяет имя, расширение и размер файла товара."""
+        if not file_name:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Filename is required"
             )
 
         # Проверка расширения
-        ext = Path(file.filename).suffix.lower()
+        ext = Path(file_name).suffix.lower()
         if ext not in settings.ALLOWED_PRODUCT_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File type not allowed. Allowed: {settings.ALLOWED_PRODUCT_EXTENSIONS}",
             )
 
-        # Проверка размера (читаем частично)
-        file.file.seek(0, 2)  # Переход в конец
-        size = file.file.tell()
-        file.file.seek(0)  # Возврат в начало
-
         max_size = settings.MINIO_MAX_FILE_SIZE_MB * 1024 * 1024
         if size > max_size:
             raise HTTPException(
@@ -259,6 +802,7 @@ class ProductService:
         return ProductDownloadResponse(
             download_url=download_url,
             file_name=product.file_name,
+            file_sha256=product.file_sha256,
             expires_in=3600,
         )
 
@@ -283,9 +827,9 @@ class ProductService:
         product.file_name = None
         product.file_size = None
         product.file_content_type = None
+        product.file_sha256 = None
 
-        await self.db.commit()
-        await self.invalidate_product_cache(product_id)
+        await self._commit_and_write_through(product)
 
         return {"status": "success", "message": "File deleted"}
 
@@ -304,19 +848,10 @@ class ProductService:
         product = await self._get_product_for_owner(product_id, user_id)
 
         # Проверка лимита изображений
-        images_count = await self._count_product_images(product_id)
-        if images_count >= settings.MAX_IMAGES_PER_PRODUCT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Maximum {settings.MAX_IMAGES_PER_PRODUCT} images allowed",
-            )
+        await self._check_images_limit(product_id)
 
         # Валидация изображения
-        await self._validate_image_file(file)
-
-        # Чтение файла
-        file_data = await file.read()
-        file_size = len(file_data)
+        file_size = await self._validate_image_file(file)
 
         # Content-type
         content_type = file.content_type or "image/jpeg"
@@ -324,49 +859,65 @@ class ProductService:
         # Загрузка в MinIO
         image_key = await self.minio.upload_file(
             bucket=settings.MINIO_BUCKET_IMAGES,
-            file_data=BytesIO(file_data),
+            file_data=file.file,
             file_size=file_size,
             original_filename=file.filename,
             content_type=content_type,
             folder=f"products/{product_id}",
         )
 
+        return await self._attach_product_image(
+            product,
+            image_key=image_key,
+            original_name=file.filename,
+            content_type=content_type,
+            size=file_size,
+            is_main=is_main,
+        )
+
+    async def _attach_product_image(
+        self,
+        product: Product,
+        image_key: str,
+        original_name: str,
+        content_type: str,
+        size: int,
+        is_main: bool,
+    ) -> ProductImageUploadResponse:
+        """Создает запись изображения для загруженного объекта."""
         # Если это главное изображение - убираем флаг у остальных
         if is_main:
-            await self._unset_main_image(product_id)
+            await self._unset_main_image(product.id)
 
         # Позиция для нового изображения
-        position = images_count
+        position = await self._count_product_images(product.id)
 
         # Создание записи
         new_image = ProductImage(
-            product_id=product_id,
+            product_id=product.id,
             image_key=image_key,
-            original_name=file.filename,
+            original_name=original_name,
             content_type=content_type,
-            size=file_size,
+            size=size,
             is_main=is_main,
             position=position,
         )
 
         self.db.add(new_image)
-        await self.db.commit()
-        await self.db.refresh(new_image)
-
-        await self.invalidate_product_cache(product_id)
+        await self._commit_and_write_through(product)
 
         # Генерация URL
         image_url = await self.minio.generate_public_url(
             settings.MINIO_BUCKET_IMAGES, image_key
         )
 
-        logger.info(f"Uploaded image for product {product_id}: {file.filename}")
+        logger.info(f"Uploaded image for product {product.id}: {original_name}")
 
         return ProductImageUploadResponse(
             id=new_image.id,
             image_url=image_url,
-            original_name=file.filename,
-            size=file_size,
+            original_name=original_name,
+            size=size,
             is_main=is_main,
             position=position,
         )
@@ -391,32 +942,39 @@ class ProductService:
             results.append(result)
         return results
 
-    async def _validate_image_file(self, file: UploadFile) -> None:
-        """Валидирует файл изображения."""
-        if not file.filename:
+    async def _validate_image_file(self, file: UploadFile) -> int:
+        """Валидирует файл изображения и возвращает его размер."""
+        # Проверка размера
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        file.file.seek(0)
+
+        self._check_image_file(file.filename, file.content_type, size)
+        return size
+
+    def _check_image_file(
+        self, file_name: str | None, content_type: str | None, size: int
+    ) -> None:
+        """Проверяет имя, расширение, MIME-type и размер изображения."""
+        if not file_name:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Filename is required"
             )
 
         # Проверка расширения
-        ext = Path(file.filename).suffix.lower()
-        if ext not in settings.ALLOWED_IMAGE_EXTENSIONS:
+        ext = Path(file_name).suffix.lower()
+        if ext not in settings.ALLOWED_IMAGES_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Image type not allowed. Allowed: {settings.ALLOWED_IMAGE_EXTENSIONS}",
+                detail=f"Image type not allowed. Allowed: {settings.ALLOWED_IMAGES_EXTENSIONS}",
             )
 
         # Проверка MIME-type
-        if file.content_type and not file.content_type.startswith("image/"):
+        if content_type and not content_type.startswith("image/"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="File is not an image"
             )
 
-        # Проверка размера
-        file.file.seek(0, 2)
-        size = file.file.tell()
-        file.file.seek(0)
-
         max_size = settings.MINIO_MAX_IMAGE_SIZE_MB * 1024 * 1024
         if size > max_size:
             raise HTTPException(
@@ -424,6 +982,15 @@ class ProductService:
                 detail=f"Image too large. Max size: {settings.MINIO_MAX_IMAGE_SIZE_MB}MB",
             )
 
+    async def _check_images_limit(self, product_id: int) -> None:
+        """Проверяет, что у товара можно добавить еще одно изображение."""
+        images_count = await self._count_product_images(product_id)
+        if images_count >= settings.MAX_IMAGES_PER_PRODUCT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {settings.MAX_IMAGES_PER_PRODUCT} images allowed",
+            )
+
     async def delete_product_image(
         self,
         user_id: int,
@@ -431,7 +998,7 @@ class ProductService:
         image_id: int,
     ) -> dict:
         """Удаляет изображение товара."""
-        await self._get_product_for_owner(product_id, user_id)
+        product = await self._get_product_for_owner(product_id, user_id)
 
         result = await self.db.execute(
             select(ProductImage)
@@ -450,9 +1017,7 @@ class ProductService:
 
         # Удаление из БД
         await self.db.delete(image)
-        await self.db.commit()
-
-        await self.invalidate_product_cache(product_id)
+        await self._commit_and_write_through(product)
 
         return {"status": "success", "message": "Image deleted"}
 
@@ -463,7 +1028,7 @@ class ProductService:
         image_id: int,
     ) -> dict:
         """Устанавливает главное изображение."""
-        await self._get_product_for_owner(product_id, user_id)
+        product = await self._get_product_for_owner(product_id, user_id)
 
         result = await self.db.execute(
             select(ProductImage)
@@ -480,11 +1045,14 @@ class ProductService:
         # Убираем флаг у остальных
         await self._unset_main_image(product_id)
 
-        # Устанавливаем для выбранного
-        image.is_main = True
-        await self.db.commit()
-
-        await self.invalidate_product_cache(product_id)
+        # Устанавливаем для выбранного (тоже UPDATE: если изображение уже
+        # было главным, ORM не увидит изменения атрибута)
+        await self.db.execute(
+            ProductImage.__table__.update()
+            .where(ProductImage.id == image.id)
+            .values(is_main=True)
+        )
+        await self._commit_and_write_through(product)
 
         return {"status": "success", "message": "Main image set"}
 
@@ -495,7 +1063,7 @@ class ProductService:
         image_ids: list[int],
     ) -> dict:
         """Изменяет порядок изображений."""
-        await self._get_product_for_owner(product_id, user_id)
+        product = await self._get_product_for_owner(product_id, user_id)
 
         for position, image_id in enumerate(image_ids):
             await self.db.execute(
@@ -505,11 +1073,446 @@ class ProductService:
                 .values(position=position)
             )
 
-        await self.db.commit()
-        await self.invalidate_product_cache(product_id)
+        await self._commit_and_write_through(product)
 
         return {"status": "success", "message": "Images reordered"}
 
+    # ═══════════════════════════════════════════════════════════════
+    # DIRECT UPLOAD
+    # ═══════════════════════════════════════════════════════════════
+
+    async def initiate_upload(
+        self,
+        user_id: int,
+        product_id: int,
+        schema: ProductUploadInitiate,
+    ) -> ProductUploadInitiateResponse:
+        """
+        Начинает прямую загрузку файла или изображения в MinIO.
+
+        Проверяет файл по заявленным имени, типу и размеру и возвращает
+        presigned POST: клиент загружает файл в хранилище сам, минуя
+        процессы API, после чего вызывает complete_upload. Параметры
+        загрузки хранятся в Redis до ее завершения.
+        """
+        await self._get_product_for_owner(product_id, user_id)
+
+        if schema.kind == "image":
+            self._check_image_file(schema.file_name, schema.content_type, schema.size)
+            await self._check_images_limit(product_id)
+            bucket = settings.MINIO_BUCKET_IMAGES
+        else:
+            self._check_product_file(schema.file_name, schema.size)
+            bucket = settings.MINIO_BUCKET_PRODUCTS
+
+        object_name = self.minio.make_object_name(
+            schema.file_name, folder=f"products/{product_id}"
+        )
+        expires_in = settings.MINIO_PRESIGNED_UPLOAD_EXPIRE_SECONDS
+        url, fields = await self.minio.generate_presigned_post(
+            bucket=bucket,
+            object_name=object_name,
+            content_type=schema.content_type,
+            size=schema.size,
+            expires_seconds=expires_in,
+        )
+
+        upload_id = uuid.uuid4().hex
+        upload = {
+            "user_id": user_id,
+            "product_id": product_id,
+            "bucket": bucket,
+            "object_name": object_name,
+            **schema.model_dump(),
+        }
+        # Форма проверяется в начале загрузки, сама загрузка может длиться
+        # дольше: оставляем запас на ее завершение. Объект, который не будет
+        # привязан к товару, удалит delete_abandoned_direct_uploads (еще
+        # через expires_in, чтобы не мешать начатому complete_upload)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                PRODUCT_UPLOAD_KEY.format(upload_id),
+                json.dumps(upload),
+                ex=2 * expires_in,
+            )
+            pipe.zadd(
+                PENDING_UPLOADS_KEY,
+                {f"{bucket}/{object_name}": time.time() + 3 * expires_in},
+            )
+            await pipe.execute()
+
+        logger.info(
+            f"Initiated {schema.kind} upload {upload_id} for product {product_id}"
+        )
+        return ProductUploadInitiateResponse(
+            upload_id=upload_id, url=url, fields=fields, expires_in=expires_in
+        )
+
+    async def complete_upload(
+        self,
+        user_id: int,
+        product_id: int,
+        upload_id: str,
+    ) -> ProductFileUploadResponse | ProductImageUploadResponse:
+        """
+        Завершает прямую загрузку: проверяет объект в MinIO и обновляет БД.
+
+        Если объект еще не загружен, загрузку можно завершить повторно.
+        Если размер или тип не совпадают с заявленными, объект удаляется.
+        """
+        key = PRODUCT_UPLOAD_KEY.format(upload_id)
+        raw = await self.redis.get(key)
+        upload = json.loads(raw) if raw else None
+        if (
+            upload is None
+            or upload["user_id"] != user_id
+            or upload["product_id"] != product_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or expired",
+            )
+
+        product = await self._get_product_for_owner(product_id, user_id)
+
+        bucket, object_name = upload["bucket"], upload["object_name"]
+        info = await self.minio.get_file_info(bucket, object_name)
+        if info is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="File has not been uploaded yet",
+            )
+
+        # Завершить загрузку может только один запрос
+        if not await self.redis.delete(key):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or expired",
+            )
+
+        if (
+            info["size"] != upload["size"]
+            or info["content_type"] != upload["content_type"]
+        ):
+            await self.minio.delete_file(bucket, object_name)
+            logger.warning(
+                f"Upload {upload_id} does not match: {info['size']} bytes, "
+                f"{info['content_type']}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file does not match the declared size or type",
+            )
+
+        if upload["kind"] == "file":
+            response = await self._attach_product_file(
+                product,
+                file_key=object_name,
+                file_name=upload["file_name"],
+                file_size=info["size"],
+                content_type=info["content_type"],
+                sha256=None,
+            )
+        else:
+            # Лимит мог быть исчерпан параллельными загрузками
+            try:
+                await self._check_images_limit(product_id)
+            except HTTPException:
+                await self.minio.delete_file(bucket, object_name)
+                raise
+
+            response = await self._attach_product_image(
+                product,
+                image_key=object_name,
+                original_name=upload["file_name"],
+                content_type=info["content_type"],
+                size=info["size"],
+                is_main=upload["is_main"],
+            )
+
+        await self.redis.zrem(PENDING_UPLOADS_KEY, f"{bucket}/{object_name}")
+        return response
+
+    # ═══════════════════════════════════════════════════════════════
+    # RESUMABLE UPLOAD
+    # ═══════════════════════════════════════════════════════════════
+
+    async def create_upload_session(
+        self,
+        user_id: int,
+        product_id: int,
+        schema: ProductUploadSessionCreate,
+    ) -> ProductUploadSessionResponse:
+        """
+        Создает сессию возобновляемой загрузки файла товара.
+
+        Файл загружается частями по part_size (последняя - остаток) через
+        presigned PUT ссылки в MinIO multipart upload: части можно
+        загружать в любом порядке, параллельно и повторно, а после обрыва
+        узнать, какие уже загружены. Сессия хранится в Redis
+        UPLOAD_SESSION_TTL_SECONDS с момента создания.
+        """
+        await self._get_product_for_owner(product_id, user_id)
+        self._check_product_file(schema.file_name, schema.size)
+
+        bucket = settings.MINIO_BUCKET_PRODUCTS
+        object_name = self.minio.make_object_name(
+            schema.file_name, folder=f"products/{product_id}"
+        )
+        upload_id = await self.minio.create_multipart_upload(
+            bucket, object_name, schema.content_type
+        )
+
+        part_size = settings.UPLOAD_SESSION_PART_SIZE_MB * 1024 * 1024
+        session_id = uuid.uuid4().hex
+        session = {
+            "user_id": user_id,
+            "product_id": product_id,
+            "bucket": bucket,
+            "object_name": object_name,
+            "upload_id": upload_id,
+            "file_name": schema.file_name,
+            "content_type": schema.content_type,
+            "size": schema.size,
+            "part_size": part_size,
+            "part_count": (schema.size + part_size - 1) // part_size,
+            "expires_at": time.time() + settings.UPLOAD_SESSION_TTL_SECONDS,
+        }
+        await self.redis.set(
+            UPLOAD_SESSION_KEY.format(session_id),
+            json.dumps(session),
+            ex=settings.UPLOAD_SESSION_TTL_SECONDS,
+        )
+
+        logger.info(f"Created upload session {session_id} for product {product_id}")
+        return self._upload_session_response(session_id, session, [])
+
+    async def get_upload_session(
+        self, user_id: int, product_id: int, session_id: str
+    ) -> ProductUploadSessionResponse:
+        """Возвращает состояние сессии и уже загруженные части."""
+        session = await self._get_upload_session(user_id, product_id, session_id)
+        parts = await self.minio.list_parts(
+            session["bucket"], session["object_name"], session["upload_id"]
+        )
+        return self._upload_session_response(session_id, session, parts)
+
+    async def get_upload_part_urls(
+        self,
+        user_id: int,
+        product_id: int,
+        session_id: str,
+        part_numbers: list[int],
+    ) -> ProductUploadPartUrlsResponse:
+        """Генерирует presigned PUT ссылки для загрузки частей."""
+        session = await self._get_upload_session(user_id, product_id, session_id)
+
+        invalid = [n for n in part_numbers if not 1 <= n <= session["part_count"]]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid part numbers: {invalid}. "
+                f"Allowed: 1..{session['part_count']}",
+            )
+
+        expires_in = settings.MINIO_PRESIGNED_UPLOAD_EXPIRE_SECONDS
+        part_numbers = sorted(set(part_numbers))
+        urls = await asyncio.gather(
+            *(
+                self.minio.generate_presigned_part_url(
+                    session["bucket"],
+                    session["object_name"],
+                    session["upload_id"],
+                    part_number,
+                    expires_seconds=expires_in,
+                )
+                for part_number in part_numbers
+            )
+        )
+        return ProductUploadPartUrlsResponse(
+            urls=dict(zip(part_numbers, urls)), expires_in=expires_in
+        )
+
+    async def complete_upload_session(
+        self, user_id: int, product_id: int, session_id: str
+    ) -> ProductFileUploadResponse:
+        """
+        Собирает файл из загруженных частей и привязывает его к товару.
+
+        Если каких-то частей нет или их размер не совпадает с ожидаемым,
+        возвращает 409 со списком частей, которые нужно (пере)загрузить;
+        сессия при этом сохраняется.
+
+        Завершение захватывает сессию маркером SET NX, а сама сессия
+        удаляется только после сборки объекта и привязки его к товару.
+        При ошибке маркер снимается и завершение можно повторить; объект,
+        уже собранный в прошлой попытке, повторно не собирается.
+        """
+        key = UPLOAD_SESSION_KEY.format(session_id)
+        await self._get_upload_session(user_id, product_id, session_id)
+        product = await self._get_product_for_owner(product_id, user_id)
+
+        claim_key, token = await self._claim_upload_session(session_id)
+        try:
+            # До захвата сессию могли собрать, завершить или отменить
+            # другие запросы: решение принимается по ее свежей копии
+            session = await self._get_upload_session(user_id, product_id, session_id)
+
+            if not session.get("assembled"):
+                parts = await self._uploaded_session_parts(session)
+                # Собранный, но не привязанный объект удалит
+                # delete_abandoned_direct_uploads
+                await self.redis.zadd(
+                    PENDING_UPLOADS_KEY,
+                    {
+                        f"{session['bucket']}/{session['object_name']}": (
+                            session["expires_at"]
+                            + settings.MINIO_TRANSFER_TIMEOUT_SECONDS
+                        )
+                    },
+                )
+                await self.minio.complete_multipart_upload(
+                    session["bucket"],
+                    session["object_name"],
+                    session["upload_id"],
+                    parts,
+                )
+                session["assembled"] = True
+                await self.redis.set(key, json.dumps(session), keepttl=True)
+
+            response = await self._attach_product_file(
+                product,
+                file_key=session["object_name"],
+                file_name=session["file_name"],
+                file_size=session["size"],
+                content_type=session["content_type"],
+                sha256=None,
+            )
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                pipe.zrem(
+                    PENDING_UPLOADS_KEY,
+                    f"{session['bucket']}/{session['object_name']}",
+                )
+                await pipe.execute()
+            return response
+        finally:
+            await self._release_upload_session(claim_key, token)
+
+    async def abort_upload_session(
+        self, user_id: int, product_id: int, session_id: str
+    ) -> dict:
+        """Отменяет сессию и удаляет загруженные части (или собранный файл)."""
+        await self._get_upload_session(user_id, product_id, session_id)
+
+        claim_key, token = await self._claim_upload_session(session_id)
+        try:
+            session = await self._get_upload_session(user_id, product_id, session_id)
+            if await self.redis.delete(UPLOAD_SESSION_KEY.format(session_id)):
+                if session.get("assembled"):
+                    await self.minio.delete_file(
+                        session["bucket"], session["object_name"]
+                    )
+                else:
+                    await self.minio.abort_multipart_upload(
+                        session["bucket"], session["object_name"], session["upload_id"]
+                    )
+        finally:
+            await self._release_upload_session(claim_key, token)
+
+        return {"status": "success", "message": "Upload aborted"}
+
+    async def _uploaded_session_parts(self, session: dict) -> list[tuple[int, str]]:
+        """
+        Возвращает (part_number, etag) всех частей сессии для сборки.
+
+        Raises:
+            HTTPException: 409 со списком частей, которых нет или размер
+                которых не совпадает с ожидаемым.
+        """
+        parts = await self.minio.list_parts(
+            session["bucket"], session["object_name"], session["upload_id"]
+        )
+        uploaded = {part["part_number"]: part for part in parts}
+        part_size, part_count = session["part_size"], session["part_count"]
+        last_size = session["size"] - (part_count - 1) * part_size
+
+        pending = [
+            n
+            for n in range(1, part_count + 1)
+            if n not in uploaded
+            or uploaded[n]["size"] != (last_size if n == part_count else part_size)
+        ]
+        if pending:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload is incomplete. Upload parts: {pending}",
+            )
+        return [(n, uploaded[n]["etag"]) for n in range(1, part_count + 1)]
+
+    async def _claim_upload_session(self, session_id: str) -> tuple[str, str]:
+        """
+        Захватывает сессию для завершения или отмены.
+
+        Маркер живет не дольше сборки объекта с запасом, чтобы упавший
+        процесс не блокировал сессию навсегда.
+
+        Returns:
+            Ключ маркера и токен для _release_upload_session.
+        """
+        claim_key = UPLOAD_SESSION_CLAIM_KEY.format(session_id)
+        token = secrets.token_hex(8)
+        if not await self.redis.set(
+            claim_key,
+            token,
+            nx=True,
+            ex=int(2 * settings.MINIO_TRANSFER_TIMEOUT_SECONDS),
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload session is already being completed or aborted",
+            )
+        return claim_key, token
+
+    async def _release_upload_session(self, claim_key: str, token: str) -> None:
+        release = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        await release(keys=[claim_key], args=[token])
+
+    async def _get_upload_session(
+        self, user_id: int, product_id: int, session_id: str
+    ) -> dict:
+        """Загружает сессию из Redis и проверяет, что она принадлежит пользователю."""
+        raw = await self.redis.get(UPLOAD_SESSION_KEY.format(session_id))
+        session = json.loads(raw) if raw else None
+        if (
+            session is None
+            or session["user_id"] != user_id
+            or session["product_id"] != product_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found or expired",
+            )
+        return session
+
+    def _upload_session_response(
+        self, session_id: str, session: dict, parts: list[dict]
+    ) -> ProductUploadSessionResponse:
+        return ProductUploadSessionResponse(
+            session_id=session_id,
+            size=session["size"],
+            part_size=session["part_size"],
+            part_count=session["part_count"],
+            uploaded_parts=[
+                ProductUploadedPart(part_number=p["part_number"], size=p["size"])
+                for p in sorted(parts, key=lambda p: p["part_number"])
+            ],
+            expires_at=datetime.fromtimestamp(session["expires_at"], UTC).replace(
+                tzinfo=None
+            ),
+        )
+
     # ═══════════════════════════════════════════════════════════════
     # HELPER METHODS
     # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,269 @@
+# app/modules/products/tasks.py
+"""Задачи (tasks) для модуля товаров."""
+
+import secrets
+import time
+from datetime import UTC, datetime, timedelta
+
+from loguru import logger
+from minio.error import S3Error
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from taskiq import TaskiqDepends
+
+from app.core.cache import RELEASE_LOCK_SCRIPT
+from app.core.config import settings
+from app.core.db_helper import get_session
+from app.core.redis import get_redis_binary_client, get_redis_client
+from app.core.taskiq import broker
+from app.modules.products.autocomplete import AutocompleteIndex
+from app.modules.products.models import Product, ProductImage
+
+# Время прошлой сверки индекса автодополнения с БД и запас окна сверки
+AUTOCOMPLETE_WATERMARK_KEY = "autocomplete:reconciled_at"
+AUTOCOMPLETE_RECONCILE_OVERLAP = timedelta(minutes=5)
+AUTOCOMPLETE_RECONCILE_BATCH_SIZE = 1000
+
+# Не дает нескольким процессам прогревать кэш одновременно
+WARM_LOCK_KEY = "lock:warm:product"
+WARM_LOCK_TTL_SECONDS = 600
+
+# Объекты прямых загрузок (presigned POST), еще не привязанные к товару:
+# ZSET "<bucket>/<object_name>" -> время, после которого загрузку уже нельзя
+# завершить. Просроченные удаляет delete_abandoned_direct_uploads
+PENDING_UPLOADS_KEY = "product_uploads:pending"
+PENDING_UPLOADS_BATCH_SIZE = 1000
+
+# ═══════════════════════════════════════════════════════════════
+# AUTOCOMPLETE TASKS
+# ═══════════════════════════════════════════════════════════════
+
+
+@broker.task(retry_on_error=True, max_tries=5)
+async def sync_product_autocomplete(
+    product_id: int,
+    redis: Redis = TaskiqDepends(get_redis_client),
+    db: AsyncSession = TaskiqDepends(get_session),
+):
+    """Синхронизирует запись товара в индексе автодополнения с БД."""
+    result = await db.execute(
+        select(Product.title, Product.is_published, Product.created_at).where(
+            Product.id == product_id
+        )
+    )
+    row = result.one_or_none()
+
+    index = AutocompleteIndex(redis)
+    if row is None or not row.is_published:
+        await index.remove(product_id)
+    else:
+        await index.upsert(product_id, row.title, row.created_at.timestamp())
+
+
+@broker.task(schedule=[{"cron": "* * * * *"}])
+async def reconcile_autocomplete_index(
+    redis: Redis = TaskiqDepends(get_redis_client),
+    db: AsyncSession = TaskiqDepends(get_session),
+):
+    """
+    Сверяет индекс автодополнения с товарами, измененными с прошлой сверки.
+
+    Время прошлой сверки хранится в Redis; окно берется с запасом
+    AUTOCOMPLETE_RECONCILE_OVERLAP для транзакций, зафиксированных позже
+    своего updated_at. Записи удаленных товаров исправляет
+    reconcile_autocomplete_index_full.
+    """
+    started = (await db.execute(select(func.localtimestamp()))).scalar_one()
+    watermark = await redis.get(AUTOCOMPLETE_WATERMARK_KEY)
+
+    conditions = []
+    if watermark is not None:
+        since = datetime.fromisoformat(watermark) - AUTOCOMPLETE_RECONCILE_OVERLAP
+        conditions.append(Product.updated_at >= since)
+
+    fixed = await _reconcile_products(AutocompleteIndex(redis), db, *conditions)
+    await redis.set(AUTOCOMPLETE_WATERMARK_KEY, started.isoformat())
+    if fixed:
+        logger.info(f"Индекс автодополнения: исправлено записей {fixed}")
+
+
+@broker.task(schedule=[{"cron": "30 * * * *"}])
+async def reconcile_autocomplete_index_full(
+    redis: Redis = TaskiqDepends(get_redis_client),
+    db: AsyncSession = TaskiqDepends(get_session),
+):
+    """Полная сверка индекса автодополнения с БД пачками."""
+    index = AutocompleteIndex(redis)
+    fixed = await _reconcile_products(index, db, Product.is_published.is_(True))
+
+    # Записи товаров, которые удалены или сняты с публикации
+    async for ids in index.indexed_ids(AUTOCOMPLETE_RECONCILE_BATCH_SIZE):
+        published = set(
+            await db.scalars(
+                select(Product.id).where(
+                    Product.id.in_(ids), Product.is_published.is_(True)
+                )
+            )
+        )
+        fixed += await index.reconcile(
+            (product_id, None, 0) for product_id in ids if product_id not in published
+        )
+
+    if fixed:
+        logger.info(f"Индекс автодополнения (полная сверка): исправлено {fixed}")
+
+
+async def _reconcile_products(
+    index: AutocompleteIndex, db: AsyncSession, *conditions
+) -> int:
+    """Сверяет индекс с товарами по условиям, читая их пачками."""
+    result = await db.stream(
+        select(Product.id, Product.title, Product.is_published, Product.created_at)
+        .where(*conditions)
+        .order_by(Product.id)
+        .execution_options(yield_per=AUTOCOMPLETE_RECONCILE_BATCH_SIZE)
+    )
+
+    fixed = 0
+    async for rows in result.partitions():
+        fixed += await index.reconcile(
+            (
+                row.id,
+                row.title if row.is_published else None,
+                row.created_at.timestamp(),
+            )
+            for row in rows
+        )
+    return fixed
+
+
+# ═══════════════════════════════════════════════════════════════
+# CACHE TASKS
+# ═══════════════════════════════════════════════════════════════
+
+
+@broker.task(schedule=[{"cron": "*/10 * * * *"}])
+async def warm_product_cache(
+    redis: Redis = TaskiqDepends(get_redis_client),
+    cache_redis: Redis = TaskiqDepends(get_redis_binary_client),
+) -> int:
+    """
+    Прогревает кэш товаров (см. ProductService.warm_cache).
+
+    Запускается по расписанию в воркере и при старте приложения (прямым
+    вызовом из lifespan). Одновременно выполняется только один прогрев.
+    """
+    # service импортирует этот модуль (sync_product_autocomplete)
+    from app.modules.products.service import ProductService
+
+    # Токен не дает снять блокировку, которую после истечения TTL уже
+    # взял другой процесс
+    token = secrets.token_hex(8)
+    if not await redis.set(WARM_LOCK_KEY, token, nx=True, ex=WARM_LOCK_TTL_SECONDS):
+        return 0
+
+    try:
+        return await ProductService(redis=redis, cache_redis=cache_redis).warm_cache(
+            limit=settings.CACHE_WARM_PRODUCTS_LIMIT,
+            batch_size=settings.CACHE_WARM_BATCH_SIZE,
+            batches_per_second=settings.CACHE_WARM_BATCHES_PER_SECOND,
+        )
+    finally:
+        release = redis.register_script(RELEASE_LOCK_SCRIPT)
+        await release(keys=[WARM_LOCK_KEY], args=[token])
+
+
+# ═══════════════════════════════════════════════════════════════
+# STORAGE TASKS
+# ═══════════════════════════════════════════════════════════════
+
+
+@broker.task(schedule=[{"cron": "0 * * * *"}])
+async def abort_abandoned_uploads() -> int:
+    """
+    Отменяет брошенные multipart uploads в бакете файлов товаров.
+
+    Сессия возобновляемой загрузки живет UPLOAD_SESSION_TTL_SECONDS с момента
+    создания, поэтому незавершенная загрузка старше TTL уже никому не
+    доступна, а ее части только занимают место в хранилище.
+    """
+    # Клиент MinIO проверяет бакеты при импорте: импортируем только здесь
+    from app.core.minio_client import minio_client
+
+    ttl = timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+    cutoff = datetime.now(UTC) - ttl
+    uploads = await minio_client.list_multipart_uploads(
+        settings.MINIO_BUCKET_PRODUCTS, prefix="products/"
+    )
+
+    aborted = 0
+    for upload in uploads:
+        if upload["initiated"] is None or upload["initiated"] > cutoff:
+            continue
+        try:
+            await minio_client.abort_multipart_upload(
+                settings.MINIO_BUCKET_PRODUCTS,
+                upload["object_name"],
+                upload["upload_id"],
+            )
+            aborted += 1
+        except S3Error:
+            # Загрузку уже завершили или отменили
+            continue
+
+    if aborted:
+        logger.info(f"Отменено брошенных multipart uploads: {aborted}")
+    return aborted
+
+
+@broker.task(schedule=[{"cron": "*/15 * * * *"}])
+async def delete_abandoned_direct_uploads(
+    redis: Redis = TaskiqDepends(get_redis_client),
+    db: AsyncSession = TaskiqDepends(get_session),
+) -> int:
+    """
+    Удаляет объекты прямых загрузок, которые так и не привязали к товару.
+
+    Клиент мог загрузить объект по presigned POST и не вызвать
+    complete_upload (или завершение отклонили). Объект просроченной
+    загрузки удаляется, если на него не ссылается товар или изображение:
+    привязка могла пройти, а удаление из PENDING_UPLOADS_KEY - нет.
+    """
+    # Клиент MinIO проверяет бакеты при импорте: импортируем только здесь
+    from app.core.minio_client import minio_client
+
+    key_columns = {
+        settings.MINIO_BUCKET_PRODUCTS: Product.file_key,
+        settings.MINIO_BUCKET_IMAGES: ProductImage.image_key,
+    }
+
+    deleted = 0
+    while members := await redis.zrangebyscore(
+        PENDING_UPLOADS_KEY,
+        "-inf",
+        time.time(),
+        start=0,
+        num=PENDING_UPLOADS_BATCH_SIZE,
+    ):
+        by_bucket: dict[str, list[str]] = {}
+        for member in members:
+            bucket, _, object_name = member.partition("/")
+            by_bucket.setdefault(bucket, []).append(object_name)
+
+        for bucket, object_names in by_bucket.items():
+            column = key_columns.get(bucket)
+            if column is None:
+                continue
+            result = await db.execute(select(column).where(column.in_(object_names)))
+            attached = set(result.scalars())
+            orphans = [name for name in object_names if name not in attached]
+            if orphans:
+                await minio_client.delete_files(bucket, orphans)
+                deleted += len(orphans)
+
+        await redis.zrem(PENDING_UPLOADS_KEY, *members)
+
+    if deleted:
+        logger.info(f"Удалено непривязанных объектов прямых загрузок: {deleted}")
+    return deleted
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DateTime, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db_helper import Base
@@ -11,7 +11,7 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(25), nullable=True)
-    email: Mapped[str] = mapped_column(index=True)
+    email: Mapped[str] = mapped_column()
     description: Mapped[str] = mapped_column(Text, nullable=True)
     password: Mapped[str] = mapped_column(nullable=True)
 
@@ -24,3 +24,8 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
     products: Mapped[list["Product"]] = relationship(back_populates="seller")  # noqa: F821
+
+
+# Email уникален без учета регистра: по этому индексу ищутся учетные данные
+# при входе и разрешаются конфликты при регистрации.
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
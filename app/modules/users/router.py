@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 
 from app.core.rate_limit import limiter
 from app.modules.auth.dependencies import get_current_user_id
@@ -26,7 +26,10 @@ async def get_me(
     service: UserService = Depends(get_cached_user_service),
 ):
     """Получает информацию о текущем пользователе."""
-    return await service.get_by_id(user_id)
+    return Response(
+        content=await service.get_json_by_id(user_id),
+        media_type="application/json",
+    )
 
 
 @router.get("/{id}", response_model=UserPublicResponse)
@@ -34,7 +37,10 @@ async def get_user_by_id(
     id: int, service: UserService = Depends(get_cached_user_service)
 ):
     """Получает публичную информацию о пользователе по ID."""
-    return await service.get_by_id(id)
+    return Response(
+        content=await service.get_json_by_id(id, public=True),
+        media_type="application/json",
+    )
 
 
 @router.post("/become-seller")
@@ -16,7 +16,7 @@ class UserPublicResponse(BaseModel):
 
     id: int
     username: str | None
-    description: str
+    description: str | None
     is_seller: bool
     is_admin: bool
     created_at: datetime
@@ -1,14 +1,18 @@
 from fastapi import HTTPException, status
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy import select
+from sqlalchemy import Row, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CacheTags, TwoTierCache, user_local_cache
+from app.core.config import settings
 from app.core.db_helper import sessionmaker as async_session_factory
 from app.modules.users.models import User
 from app.modules.users.schemas import (
     UserCreate,
     UserPrivateResponse,
+    UserPublicResponse,
 )
 
 
@@ -18,77 +22,131 @@ class UserService:
     def __init__(
         self,
         redis_client: Redis,
+        cache_redis: Redis,
         db: AsyncSession | None = None,
     ):
         """
         Инициализирует сервис управления пользователями.
 
         Args:
-            redis_client: Клиент Redis для кэширования.
+            redis_client: Клиент Redis.
+            cache_redis: Клиент Redis без decode_responses для кэша.
             db: Сессия базы данных (опционально).
         """
         self.redis = redis_client
         self.db = db
+        self.cache = TwoTierCache(
+            cache_redis,
+            user_local_cache,
+            UserPrivateResponse,
+            soft_ttl=settings.CACHE_USER_SOFT_TTL_SECONDS,
+            hard_ttl=settings.CACHE_USER_HARD_TTL_SECONDS,
+        )
 
     async def get_by_id(self, id: int):
-        """Получает пользователя по ID с кэшированием."""
-        cached_user = await self.redis.get(f"user:{id}")
-        if cached_user:
-            return UserPrivateResponse.model_validate_json(cached_user)
+        """
+        Получает пользователя по ID с кэшированием.
+
+        Конкурентные промахи по одному пользователю объединяются в одну
+        загрузку из БД. Устаревшая запись отдается сразу и обновляется в фоне,
+        отсутствие пользователя кэшируется на короткое время.
+        """
+        user = await self.cache.get_or_load(f"user:{id}", lambda: self._load_user(id))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        return user
+
+    async def get_json_by_id(self, id: int, public: bool = False) -> bytes:
+        """
+        Получает пользователя с кэшированием в виде готового JSON ответа.
 
-        if self.db:
-            existing_user = await self.db.execute(select(User).where(User.id == id))
+        Args:
+            id: ID пользователя.
+            public: Только публичные поля (UserPublicResponse). Проекция
+                строится один раз для записи локального кэша.
+        """
+        user = await self.cache.get_or_load_json(
+            f"user:{id}",
+            lambda: self._load_user(id),
+            schema=UserPublicResponse if public else UserPrivateResponse,
+        )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        return user
+
+    async def _load_user(self, id: int) -> UserPrivateResponse | None:
+        """
+        Загружает пользователя из БД (None, если его нет).
+
+        Использует собственную сессию: загрузчик может выполняться в фоне
+        уже после завершения запроса.
+        """
+        async with async_session_factory() as temp_db:
+            existing_user = await temp_db.execute(select(User).where(User.id == id))
             existing_user = existing_user.scalar_one_or_none()
 
-            if existing_user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found",
-                )
-        else:
-            async with async_session_factory() as temp_db:
-                existing_user = await temp_db.execute(select(User).where(User.id == id))
-                existing_user = existing_user.scalar_one_or_none()
+        if existing_user is None:
+            return None
 
-                if existing_user is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="User not found",
-                    )
+        return UserPrivateResponse.model_validate(existing_user)
 
-        user_schema = UserPrivateResponse.model_validate(existing_user)
+    async def get_credentials_by_email(self, email: str) -> Row | None:
+        """
+        Получает учетные данные пользователя (id, password, is_active) по email.
 
-        await self.redis.set(f"user:{id}", user_schema.model_dump_json(), ex=1800)
+        Выбираются только нужные для входа колонки, поиск без учета регистра
+        идет по уникальному индексу ix_users_email_lower.
+        """
+        result = await self.db.execute(
+            select(User.id, User.password, User.is_active).where(
+                func.lower(User.email) == func.lower(email)
+            )
+        )
+        return result.one_or_none()
 
-        return user_schema
+    async def email_exists(self, email: str) -> bool:
+        """Проверяет по индексу ix_users_email_lower, занят ли email."""
+        return await self.db.scalar(
+            select(exists().where(func.lower(User.email) == func.lower(email)))
+        )
 
-    async def get_by_email(self, email: str):
-        """Получает пользователя по email."""
-        existing_user = await self.db.execute(select(User).where(User.email == email))
-        existing_user = existing_user.scalar_one_or_none()
+    async def create_user(self, schema: UserCreate) -> int | None:
+        """
+        Создает нового пользователя и возвращает его ID.
 
-        return existing_user
+        Вставка выполняется через INSERT ... ON CONFLICT DO NOTHING по
+        уникальному индексу email, поэтому отдельная проверка существования
+        не нужна и одновременные регистрации не создают дубликатов.
 
-    async def create_user(self, schema: UserCreate):
-        """Создает нового пользователя."""
+        Returns:
+            ID нового пользователя или None, если email уже занят.
+        """
+        values = {"username": schema.username, "email": schema.email}
         password = getattr(schema, "password", None)
         if password:
-            new_user = User(
-                username=schema.username,
-                email=schema.email,
-                password=schema.password,
-            )
-        else:
-            new_user = User(
-                username=schema.username,
-                email=schema.email,
-            )
-
-        self.db.add(new_user)
+            values["password"] = password
+
+        new_user_id = await self.db.scalar(
+            insert(User)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+            .returning(User.id)
+        )
         await self.db.commit()
 
-        logger.debug(f"Был создан пользователь с email: {new_user.email}.")
-        return new_user
+        if new_user_id is None:
+            return None
+
+        await self._invalidate_user_cache(new_user_id)
+
+        logger.debug(f"Был создан пользователь с email: {schema.email}.")
+        return new_user_id
 
     async def delete_user(self, id: int):
         """Удаляет пользователя по ID."""
@@ -110,7 +168,7 @@ class UserService:
 
     async def _invalidate_user_cache(self, id: int):
         """Инвалидирует кэш пользователя."""
-        await self.redis.delete(f"user:{id}")
+        await self.cache.invalidate(f"user:{id}")
         logger.debug(f"Кэш пользователя {id} инвалидирован.")
 
     async def become_seller(self, id: int):
@@ -136,5 +194,6 @@ class UserService:
         await self.db.refresh(existing_user)
 
         await self._invalidate_user_cache(id)
+        await CacheTags(self.redis).bump(f"seller:{id}")
 
         return {"status": "success", "seller_id": id}
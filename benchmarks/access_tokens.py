@@ -0,0 +1,109 @@
+# benchmarks/access_tokens.py
+"""
+Бенчмарк проверки access токенов с кэшем проверенных токенов и без него.
+
+Запросы идут в тестовое FastAPI-приложение через httpx.ASGITransport (без
+сети) на эндпоинт, зависящий только от get_current_user_id, как
+GET /users/me, но без обращения к кэшу пользователя. Токены --tokens
+разных пользователей выбираются случайно, чтобы в кэше было много записей.
+
+Выводится req/s для обоих вариантов и время одной проверки
+JWTService.verify_token в микросекундах.
+
+Запуск:
+    uv run python -m benchmarks.access_tokens --tokens 1000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.core.jwt_service import JWTService, TokenType, access_token_cache
+from app.modules.auth.dependencies import get_current_user_id, get_jwt_service
+
+
+def build_app() -> FastAPI:
+    """Приложение с одним эндпоинтом, требующим access токен."""
+    app = FastAPI()
+    # Access токены проверяются без Redis
+    app.dependency_overrides[get_jwt_service] = lambda: JWTService(None)
+
+    @app.get("/me")
+    async def me(user_id: int = Depends(get_current_user_id)):
+        return {"id": user_id}
+
+    return app
+
+
+async def measure(
+    client: httpx.AsyncClient, tokens: list[str], requests: int, concurrency: int
+) -> float:
+    """Возвращает req/s при заданной конкурентности."""
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            token = random.choice(tokens)
+            response = await client.get(
+                "/me", headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def verify_time(tokens: list[str], iterations: int) -> float:
+    """Среднее время verify_token в микросекундах."""
+    service = JWTService(None)
+    started = time.perf_counter()
+    for i in range(iterations):
+        await service.verify_token(tokens[i % len(tokens)], TokenType.ACCESS)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+async def main(tokens: int, requests: int, concurrency: int, rounds: int):
+    service = JWTService(None)
+    issued = [
+        await service.create_access_token({"sub": str(user_id)})
+        for user_id in range(1, tokens + 1)
+    ]
+    transport = httpx.ASGITransport(app=build_app())
+    max_entries = access_token_cache.max_entries
+
+    results = {"jwt.decode": [0.0, 0.0], "cached": [0.0, 0.0]}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # Чередуем варианты и берем лучший из rounds замеров
+        for _ in range(rounds):
+            for name, entries in (("jwt.decode", 0), ("cached", max_entries)):
+                access_token_cache.clear()
+                access_token_cache.max_entries = entries
+                # Прогрев кэша (для варианта без кэша - просто прогрев)
+                await verify_time(issued, len(issued))
+                rps = await measure(c, issued, requests, concurrency)
+                per_call = await verify_time(issued, requests)
+                results[name][0] = max(results[name][0], rps)
+                results[name][1] = min(results[name][1] or per_call, per_call)
+
+    access_token_cache.max_entries = max_entries
+    print(f"{tokens} tokens, concurrency {concurrency}")
+    print(f"{'variant':<12}{'req/s':>10}{'verify, us':>12}")
+    for name, (rps, per_call) in results.items():
+        print(f"{name:<12}{rps:>10.0f}{per_call:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.requests, args.concurrency, args.rounds))
@@ -0,0 +1,179 @@
+# benchmarks/cache_codecs.py
+"""
+Микробенчмарк кодеков кэша против прежнего формата (JSON-строка через пул
+с decode_responses=True).
+
+Для каждого варианта измеряется время кодирования и декодирования
+ProductDetailResponse (в микросекундах) и размер записи. Если доступен
+Redis из настроек (или --redis-url), дополнительно выводится MEMORY USAGE
+ключа в байтах.
+
+Варианты msgpack и zstd пропускаются, если пакеты не установлены.
+
+Запуск:
+    uv run python -m benchmarks.cache_codecs --images 10 --description 4000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from functools import partial
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core import codecs
+from app.core.config import settings
+from app.modules.products.schemas import (
+    ProductDetailResponse,
+    ProductFileInfo,
+    ProductImageResponse,
+)
+
+
+def make_product(images: int, description: int) -> ProductDetailResponse:
+    """Синтетический товар с заданным числом изображений и длиной описания."""
+    now = datetime.now()
+    return ProductDetailResponse(
+        id=123456,
+        title="FastAPI + SQLAlchemy starter kit with auth and payments",
+        description=("Production-ready template. " * (description // 27 + 1))[
+            :description
+        ],
+        price=49.99,
+        seller_id=4242,
+        images=[
+            ProductImageResponse(
+                id=1000 + i,
+                image_url=(
+                    f"http://{settings.MINIO_ENDPOINT}/{settings.MINIO_BUCKET_IMAGES}"
+                    f"/products/123456/{i:02d}-0f8fad5bd9cb469fa16570867728950e.png"
+                ),
+                is_main=i == 0,
+                position=i,
+            )
+            for i in range(images)
+        ],
+        file_info=ProductFileInfo(
+            file_name="starter-kit.zip",
+            file_size=12_582_912,
+            file_content_type="application/zip",
+            has_file=True,
+        ),
+        is_published=True,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class LegacyJson:
+    """Прежний формат: model_dump_json() в str, чтение через decode_responses."""
+
+    def encode(self, value: ProductDetailResponse) -> bytes:
+        return value.model_dump_json().encode()
+
+    def decode(self, raw: bytes) -> ProductDetailResponse:
+        return ProductDetailResponse.model_validate_json(raw.decode())
+
+
+class Envelope:
+    """Текущий формат: конверт app.core.codecs с заданным кодеком и сжатием."""
+
+    def __init__(self, codec: str, compression: str) -> None:
+        self.entry = codecs.EntryCodec(codecs.CODECS[codec](), compression)
+
+    def encode(self, value: ProductDetailResponse) -> bytes:
+        return self.entry.encode(value, time.time() + 600, 0.01)[0]
+
+    def decode(self, raw: bytes) -> ProductDetailResponse:
+        return self.entry.decode(ProductDetailResponse, raw)[0]
+
+
+def variants() -> dict[str, object]:
+    result = {
+        "legacy json str": LegacyJson(),
+        "json": Envelope("json", "none"),
+        "json+zlib": Envelope("json", "zlib"),
+    }
+    if codecs.zstandard is not None:
+        result["json+zstd"] = Envelope("json", "zstd")
+    if codecs.msgpack is not None:
+        result["msgpack"] = Envelope("msgpack", "none")
+        result["msgpack+zlib"] = Envelope("msgpack", "zlib")
+    return result
+
+
+def timeit(fn, iterations: int, repeats: int = 5) -> float:
+    """Время одного вызова в микросекундах (лучший из repeats прогонов)."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1_000_000
+
+
+async def memory_usage(redis_url: str | None, entries: dict[str, bytes]) -> dict:
+    """MEMORY USAGE для каждого варианта или пустой словарь без Redis."""
+    redis = (
+        Redis.from_url(redis_url)
+        if redis_url
+        else Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+    )
+    try:
+        await redis.ping()
+    except RedisError:
+        return {}
+
+    usage = {}
+    try:
+        for name, raw in entries.items():
+            key = f"bench:codec:{name}"
+            await redis.set(key, raw)
+            usage[name] = await redis.memory_usage(key)
+            await redis.delete(key)
+    finally:
+        await redis.aclose()
+    return usage
+
+
+def main(images: int, description: int, iterations: int, redis_url: str | None):
+    product = make_product(images, description)
+    print(
+        f"ProductDetailResponse: {images} images, {description} chars description, "
+        f"compression threshold {settings.CACHE_COMPRESS_MIN_BYTES} B"
+    )
+
+    rows = {}
+    for name, variant in variants().items():
+        raw = variant.encode(product)
+        assert variant.decode(raw) == product
+        rows[name] = (
+            timeit(partial(variant.encode, product), iterations),
+            timeit(partial(variant.decode, raw), iterations),
+            raw,
+        )
+
+    usage = asyncio.run(
+        memory_usage(redis_url, {name: row[2] for name, row in rows.items()})
+    )
+
+    header = f"{'variant':<18}{'encode, us':>12}{'decode, us':>12}{'bytes':>8}"
+    print(header + (f"{'redis mem':>11}" if usage else ""))
+    for name, (encode, decode, raw) in rows.items():
+        line = f"{name:<18}{encode:>12.2f}{decode:>12.2f}{len(raw):>8}"
+        if usage:
+            line += f"{usage[name]:>11}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--description", type=int, default=4000)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    main(args.images, args.description, args.iterations, args.redis_url)
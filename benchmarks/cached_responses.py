@@ -0,0 +1,159 @@
+# benchmarks/cached_responses.py
+"""
+Бенчмарк быстрого пути закэшированных GET-ответов (req/s).
+
+Сравнивает для товара, приватного и публичного профиля пользователя:
+- before: сервис возвращает модель, FastAPI валидирует ее по response_model
+  и сериализует заново;
+- after: сервис возвращает готовый JSON из кэша (Response).
+
+Запросы идут в тестовое FastAPI-приложение через httpx.ASGITransport, без
+сети, поэтому разница показывает именно стоимость обработки ответа. Кэш
+прогревается до замера, Redis и PostgreSQL берутся из настроек.
+
+Запуск:
+    uv run python -m benchmarks.cached_responses --product-id 1 --user-id 1
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Response
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.modules.products.schemas import ProductDetailResponse
+from app.modules.products.service import ProductService
+from app.modules.users.schemas import UserPrivateResponse, UserPublicResponse
+from app.modules.users.service import UserService
+
+
+def build_app(redis: Redis, cache_redis: Redis) -> FastAPI:
+    """Приложение с обоими вариантами каждого эндпоинта."""
+    app = FastAPI()
+
+    def products() -> ProductService:
+        return ProductService(redis=redis, cache_redis=cache_redis)
+
+    def users() -> UserService:
+        return UserService(redis_client=redis, cache_redis=cache_redis)
+
+    @app.get("/before/products/{id}", response_model=ProductDetailResponse)
+    async def product_before(id: int):
+        return await products().get_product_with_cache(id)
+
+    @app.get("/after/products/{id}", response_model=ProductDetailResponse)
+    async def product_after(id: int):
+        content = await products().get_product_json(id)
+        return Response(content=content, media_type="application/json")
+
+    @app.get("/before/users/me/{id}", response_model=UserPrivateResponse)
+    async def me_before(id: int):
+        return await users().get_by_id(id)
+
+    @app.get("/after/users/me/{id}", response_model=UserPrivateResponse)
+    async def me_after(id: int):
+        content = await users().get_json_by_id(id)
+        return Response(content=content, media_type="application/json")
+
+    @app.get("/before/users/{id}", response_model=UserPublicResponse)
+    async def user_before(id: int):
+        return await users().get_by_id(id)
+
+    @app.get("/after/users/{id}", response_model=UserPublicResponse)
+    async def user_after(id: int):
+        content = await users().get_json_by_id(id, public=True)
+        return Response(content=content, media_type="application/json")
+
+    return app
+
+
+async def measure(
+    client: httpx.AsyncClient, url: str, requests: int, concurrency: int
+) -> float:
+    """Возвращает req/s для url при заданной конкурентности."""
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get(url)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(
+    product_id: int, user_id: int, requests: int, concurrency: int, rounds: int
+):
+    redis = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB_CACHE,
+        decode_responses=True,
+    )
+    cache_redis = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB_CACHE,
+    )
+    transport = httpx.ASGITransport(app=build_app(redis, cache_redis))
+
+    endpoints = [
+        ("GET /products/{id}", f"/products/{product_id}"),
+        ("GET /users/me", f"/users/me/{user_id}"),
+        ("GET /users/{id}", f"/users/{user_id}"),
+    ]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        print(f"{'endpoint':<20}{'before, req/s':>15}{'after, req/s':>15}{'x':>7}")
+        for name, path in endpoints:
+            # Прогрев кэша и проверка, что оба варианта отдают одно и то же
+            before = await c.get(f"/before{path}")
+            after = await c.get(f"/after{path}")
+            assert before.json() == after.json(), name
+
+            # Чередуем варианты и берем лучший из rounds замеров
+            rps_before = rps_after = 0.0
+            for _ in range(rounds):
+                rps_before = max(
+                    rps_before,
+                    await measure(c, f"/before{path}", requests, concurrency),
+                )
+                rps_after = max(
+                    rps_after,
+                    await measure(c, f"/after{path}", requests, concurrency),
+                )
+            print(
+                f"{name:<20}{rps_before:>15.0f}{rps_after:>15.0f}"
+                f"{rps_after / rps_before:>7.2f}"
+            )
+
+    await redis.aclose()
+    await cache_redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--product-id", type=int, default=1)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.product_id,
+            args.user_id,
+            args.requests,
+            args.concurrency,
+            args.rounds,
+        )
+    )
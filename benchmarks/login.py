@@ -0,0 +1,179 @@
+# benchmarks/login.py
+"""
+Бенчмарк поиска учетных данных при входе: прежний запрос против нового.
+
+Создает синтетическую таблицу bench_users (по умолчанию 100 000 строк) с теми
+же колонками, что и users, и описанием длиной --description символов, и оба
+индекса: прежний неуникальный по email и уникальный по lower(email).
+
+Варианты:
+- before: SELECT всех колонок пользователя по email с учетом регистра
+  (как get_by_email, загружавший всю сущность User);
+- after: SELECT id, password, is_active по lower(email)
+  (как get_credentials_by_email).
+
+Каждый вход берет соединение из пула, как запрос со своей сессией.
+Выводится logins/s и p50/p99 латентности. С --verify ко входу добавляется
+проверка пароля bcrypt в пуле password_hasher_pool, как в login_user: так
+видна доля поиска в полной стоимости входа.
+
+Запуск (нужен доступный PostgreSQL из DB_URL):
+    uv run python -m benchmarks.login --rows 100000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.security import hash_password, password_hasher_pool, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+SETUP_SQL = [
+    "DROP TABLE IF EXISTS bench_users",
+    """
+    CREATE TABLE bench_users (
+        id BIGSERIAL PRIMARY KEY,
+        username VARCHAR(25),
+        email VARCHAR NOT NULL,
+        description TEXT,
+        password VARCHAR,
+        balance DOUBLE PRECISION NOT NULL DEFAULT 0,
+        is_active BOOLEAN NOT NULL DEFAULT true,
+        is_seller BOOLEAN NOT NULL DEFAULT false,
+        is_admin BOOLEAN NOT NULL DEFAULT false,
+        created_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    # md5 на каждый кусок, чтобы описание не сжималось в TOAST до пары байт
+    """
+    INSERT INTO bench_users (username, email, description, password)
+    SELECT
+        'user' || g,
+        'user' || g || '@example.com',
+        (SELECT string_agg(md5(g::text || i::text), ' ')
+         FROM generate_series(1, :description / 33 + 1) AS i),
+        :password
+    FROM generate_series(1, :rows) AS g
+    """,
+    "CREATE INDEX ON bench_users (email)",
+    "CREATE UNIQUE INDEX ON bench_users (lower(email))",
+    "VACUUM ANALYZE bench_users",
+]
+
+BEFORE_SQL = text("SELECT * FROM bench_users WHERE email = :email")
+
+AFTER_SQL = text(
+    "SELECT id, password, is_active FROM bench_users WHERE lower(email) = :email"
+)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Возвращает перцентиль выборки в миллисекундах."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index] * 1000
+
+
+async def measure(
+    engine, statement, rows: int, logins: int, concurrency: int, verify: bool
+) -> tuple[float, list[float]]:
+    """Возвращает logins/s и длительности входов при заданной конкурентности."""
+    remaining = logins
+    timings = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            email = f"user{random.randint(1, rows)}@example.com"
+            started = time.perf_counter()
+            async with engine.connect() as conn:
+                user = (await conn.execute(statement, {"email": email})).one()
+            if verify:
+                assert await password_hasher_pool.run(
+                    verify_password, PASSWORD, user.password
+                )
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return logins / (time.perf_counter() - started), timings
+
+
+async def main(
+    rows: int,
+    description: int,
+    logins: int,
+    concurrency: int,
+    rounds: int,
+    verify: bool,
+    skip_setup: bool,
+) -> None:
+    engine = create_async_engine(settings.DB_URL, pool_size=concurrency, max_overflow=0)
+
+    if not skip_setup:
+        print(f"Creating bench_users with {rows} rows...")
+        params = {
+            "rows": rows,
+            "description": description,
+            "password": hash_password(PASSWORD),
+        }
+        async with engine.begin() as conn:
+            for sql in SETUP_SQL[:-1]:
+                await conn.execute(text(sql), params)
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(SETUP_SQL[-1]))
+
+    # Чередуем варианты и берем лучший из rounds замеров
+    results = {}
+    for _ in range(rounds):
+        for name, statement in (("before", BEFORE_SQL), ("after", AFTER_SQL)):
+            rps, timings = await measure(
+                engine, statement, rows, logins, concurrency, verify
+            )
+            if name not in results or rps > results[name][0]:
+                results[name] = (rps, timings)
+
+    password_hasher_pool.shutdown()
+    await engine.dispose()
+
+    print(
+        f"{rows} users, {description} chars description, "
+        f"concurrency {concurrency}, bcrypt {'on' if verify else 'off'}"
+    )
+    print(f"{'variant':<10}{'logins/s':>10}{'p50, ms':>10}{'p99, ms':>10}")
+    for name, (rps, timings) in results.items():
+        print(
+            f"{name:<10}{rps:>10.0f}"
+            f"{percentile(timings, 50):>10.2f}{percentile(timings, 99):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--description", type=int, default=2000)
+    parser.add_argument("--logins", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--skip-setup", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.rows,
+            args.description,
+            args.logins,
+            args.concurrency,
+            args.rounds,
+            args.verify,
+            args.skip_setup,
+        )
+    )
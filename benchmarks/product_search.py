@@ -0,0 +1,150 @@
+# benchmarks/product_search.py
+"""
+Бенчмарк полнотекстового поиска товаров против последовательного ILIKE.
+
+Создает синтетическую таблицу bench_products (по умолчанию 1 000 000 строк)
+с той же генерируемой колонкой search_vector и GIN-индексом, что и
+product_cards,
+после чего измеряет p50/p99 латентности для обоих вариантов поиска.
+
+Словарь синтетический (VOCABULARY токенов с распределением, смещенным к
+частым словам), запросы состоят из одного-двух случайных токенов.
+
+Запуск (нужен доступный PostgreSQL из DB_URL):
+    uv run python -m benchmarks.product_search --rows 1000000 --queries 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+VOCABULARY = 20_000
+
+# Токен: 'w' || N, где N смещено к маленьким значениям (power(random(), 2)).
+# Условие "WHERE g > 0" коррелирует подзапрос со строкой, чтобы текст
+# генерировался заново для каждой строки.
+RANDOM_TEXT = """
+    (SELECT string_agg('w' || floor(power(random(), 2) * {vocabulary})::int, ' ')
+     FROM generate_series(1, {words}) WHERE g > 0)
+"""
+
+SETUP_SQL = [
+    "DROP TABLE IF EXISTS bench_products",
+    """
+    CREATE TABLE bench_products (
+        id BIGSERIAL PRIMARY KEY,
+        title VARCHAR(150) NOT NULL,
+        description TEXT NOT NULL,
+        is_published BOOLEAN NOT NULL,
+        search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+    )
+    """,
+    f"""
+    INSERT INTO bench_products (title, description, is_published)
+    SELECT
+        {RANDOM_TEXT.format(vocabulary=VOCABULARY, words=5)},
+        {RANDOM_TEXT.format(vocabulary=VOCABULARY, words=60)},
+        random() < 0.9
+    FROM generate_series(1, :rows) AS g
+    """,
+    "CREATE INDEX ON bench_products USING gin (search_vector)",
+    "VACUUM ANALYZE bench_products",
+]
+
+FTS_SQL = text(
+    """
+    SELECT id, ts_rank(search_vector, q) AS rank
+    FROM bench_products, websearch_to_tsquery('simple', :query) AS q
+    WHERE is_published AND search_vector @@ q
+    ORDER BY rank DESC, id DESC
+    LIMIT 20
+    """
+)
+
+# Эквивалент без индекса: все слова запроса должны встречаться в тексте.
+ILIKE_SQL = text(
+    """
+    SELECT id
+    FROM bench_products
+    WHERE is_published
+      AND (' ' || title || ' ' || description || ' ') ILIKE ALL (:patterns)
+    ORDER BY id DESC
+    LIMIT 20
+    """
+)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Возвращает перцентиль выборки в миллисекундах."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index] * 1000
+
+
+def random_query() -> list[str]:
+    """Возвращает запрос из одного или двух токенов словаря."""
+    size = random.choice((1, 2))
+    return [f"w{int(random.random() ** 2 * VOCABULARY)}" for _ in range(size)]
+
+
+async def measure(conn, statement, params_list: list[dict]) -> list[float]:
+    """Выполняет запросы последовательно и возвращает длительности."""
+    timings = []
+    for params in params_list:
+        started = time.perf_counter()
+        await conn.execute(statement, params)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def main(rows: int, queries: int, skip_setup: bool) -> None:
+    engine = create_async_engine(settings.DB_URL)
+
+    if not skip_setup:
+        print(f"Creating bench_products with {rows} rows...")
+        async with engine.begin() as conn:
+            for sql in SETUP_SQL[:-1]:
+                await conn.execute(text(sql), {"rows": rows})
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(SETUP_SQL[-1]))
+
+    terms = [random_query() for _ in range(queries)]
+
+    async with engine.connect() as conn:
+        fts = await measure(conn, FTS_SQL, [{"query": " ".join(t)} for t in terms])
+        ilike = await measure(
+            conn,
+            ILIKE_SQL,
+            # Пробелы вокруг токена, чтобы "w12" не совпадал с "w123".
+            [{"patterns": [f"% {w} %" for w in t]} for t in terms],
+        )
+
+    await engine.dispose()
+
+    print(f"{'variant':<10}{'p50, ms':>12}{'p99, ms':>12}{'mean, ms':>12}")
+    for name, samples in (("fts+gin", fts), ("ilike", ilike)):
+        print(
+            f"{name:<10}{percentile(samples, 50):>12.2f}"
+            f"{percentile(samples, 99):>12.2f}"
+            f"{statistics.mean(samples) * 1000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-setup", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.queries, args.skip_setup))
@@ -0,0 +1,117 @@
+# benchmarks/rate_limit.py
+"""
+Бенчмарк задержки, которую rate limiting добавляет к запросу.
+
+Запросы идут последовательно в тестовое FastAPI-приложение через
+httpx.ASGITransport (без сети) на три одинаковых эндпоинта:
+- none: без лимита;
+- redis: лимит проверяется в Redis на каждом запросе (без локального запаса);
+- local: лимит с локальным запасом разрешений (RATE_LIMIT_LOCAL_SHARE),
+  большинство запросов не обращается к Redis.
+
+Лимит выбран так, чтобы не срабатывать (--limit в минуту). Выводится
+средняя и p99 длительность запроса и добавка относительно none
+в микросекундах. Redis берется из настроек.
+
+Запуск:
+    uv run python -m benchmarks.rate_limit --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, rate_limit_key
+
+
+def build_app(redis: Redis, limit: str) -> FastAPI:
+    """Приложение с эндпоинтами без лимита, с Redis и с локальным запасом."""
+    app = FastAPI()
+    redis_only = RateLimiter(lambda: redis, rate_limit_key, 0.0, 0.0)
+    with_local = RateLimiter(
+        lambda: redis,
+        rate_limit_key,
+        settings.RATE_LIMIT_LOCAL_SHARE,
+        settings.RATE_LIMIT_LOCAL_TTL_SECONDS,
+    )
+
+    @app.get("/none")
+    async def none(request: Request):
+        return {"ok": True}
+
+    @app.get("/redis")
+    @redis_only.limit(limit)
+    async def redis_limited(request: Request):
+        return {"ok": True}
+
+    @app.get("/local")
+    @with_local.limit(limit)
+    async def local_limited(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int) -> list[float]:
+    """Длительности последовательных запросов в микросекундах."""
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Возвращает перцентиль выборки."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def main(requests: int, rounds: int, limit: int):
+    redis = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB_CACHE,
+        decode_responses=True,
+    )
+    transport = httpx.ASGITransport(app=build_app(redis, f"{limit}/minute"))
+
+    results: dict[str, list[float]] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # Чередуем варианты и берем лучший из rounds замеров по среднему
+        for _ in range(rounds):
+            for name in ("none", "redis", "local"):
+                await measure(c, f"/{name}", 100)
+                timings = await measure(c, f"/{name}", requests)
+                if name not in results or sum(timings) < sum(results[name]):
+                    results[name] = timings
+
+    await redis.aclose()
+
+    base = sum(results["none"]) / requests
+    print(f"{requests} sequential requests, limit {limit}/minute")
+    print(f"{'variant':<10}{'mean, us':>10}{'p99, us':>10}{'added, us':>11}")
+    for name, timings in results.items():
+        mean = sum(timings) / requests
+        print(
+            f"{name:<10}{mean:>10.1f}{percentile(timings, 99):>10.1f}"
+            f"{mean - base:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=1_000_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds, args.limit))
@@ -0,0 +1,148 @@
+# benchmarks/storage_client.py
+"""
+Бенчмарк пропускной способности клиента MinIO при конкурентных запросах.
+
+Варианты:
+- threaded: прежний способ, вызовы синхронного SDK minio (put_object,
+  stat_object) через asyncio.to_thread;
+- native: MinIOClient.upload_file и get_file_info, запросы из цикла
+  событий через пул соединений aiohttp.
+
+Каждый вариант загружает --objects объектов по --size-kb КБ в
+MINIO_BUCKET_PRODUCTS (папка bench) с --concurrency одновременными
+запросами, затем запрашивает stat каждого объекта. Выводятся операции
+в секунду и p50/p99 латентности для upload и stat. Загруженные объекты
+удаляются.
+
+Запуск (нужен MinIO или совместимый с S3 сервер из настроек, например
+docker compose up minio):
+    uv run python -m benchmarks.storage_client --objects 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.minio_client import minio_client
+
+BUCKET = settings.MINIO_BUCKET_PRODUCTS
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Возвращает перцентиль выборки в миллисекундах."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index] * 1000
+
+
+async def run_concurrently(
+    operation: Callable[[int], Awaitable], count: int, concurrency: int
+) -> tuple[float, list[float]]:
+    """Выполняет operation(i) для i < count, возвращает ops/s и длительности."""
+    next_index = 0
+    timings = []
+
+    async def worker():
+        nonlocal next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            await operation(index)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return count / (time.perf_counter() - started), timings
+
+
+def threaded_operations(payload: bytes, names: list[str]):
+    """Upload и stat через синхронный SDK в потоках, как было раньше."""
+    client = minio_client.client
+
+    async def upload(index: int):
+        names[index] = f"bench/threaded-{index}.bin"
+        await asyncio.to_thread(
+            client.put_object,
+            bucket_name=BUCKET,
+            object_name=names[index],
+            data=io.BytesIO(payload),
+            length=len(payload),
+            content_type="application/octet-stream",
+            part_size=settings.MINIO_UPLOAD_PART_SIZE_MB * 1024 * 1024,
+            num_parallel_uploads=settings.MINIO_UPLOAD_PARALLEL_PARTS,
+        )
+
+    async def stat(index: int):
+        info = await asyncio.to_thread(client.stat_object, BUCKET, names[index])
+        assert info.size == len(payload)
+
+    return upload, stat
+
+
+def native_operations(payload: bytes, names: list[str]):
+    """Upload и stat через MinIOClient."""
+
+    async def upload(index: int):
+        names[index] = await minio_client.upload_file(
+            bucket=BUCKET,
+            file_data=io.BytesIO(payload),
+            file_size=len(payload),
+            original_filename="bench.bin",
+            folder="bench",
+        )
+
+    async def stat(index: int):
+        info = await minio_client.get_file_info(BUCKET, names[index])
+        assert info["size"] == len(payload)
+
+    return upload, stat
+
+
+async def main(objects: int, size_kb: int, concurrency: int, variants: list[str]):
+    payload = os.urandom(size_kb * 1024)
+    results = {}
+
+    for variant in variants:
+        names = [""] * objects
+        factory = threaded_operations if variant == "threaded" else native_operations
+        upload, stat = factory(payload, names)
+        results[variant] = (
+            await run_concurrently(upload, objects, concurrency),
+            await run_concurrently(stat, objects, concurrency),
+        )
+        await minio_client.delete_files(BUCKET, names)
+
+    await minio_client.close()
+
+    print(
+        f"{objects} objects of {size_kb} KB, concurrency {concurrency}, "
+        f"thread pool {min(32, (os.cpu_count() or 1) + 4)} threads, "
+        f"pool {settings.MINIO_MAX_CONNECTIONS} connections"
+    )
+    print(f"{'variant':<20}{'ops/s':>10}{'p50, ms':>10}{'p99, ms':>10}")
+    for variant, measurements in results.items():
+        for operation, (ops, timings) in zip(("upload", "stat"), measurements):
+            print(
+                f"{variant + ' ' + operation:<20}{ops:>10.0f}"
+                f"{percentile(timings, 50):>10.2f}{percentile(timings, 99):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=2_000)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=["threaded", "native"],
+        default=["threaded", "native"],
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.objects, args.size_kb, args.concurrency, args.variants))
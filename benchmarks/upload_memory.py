@@ -0,0 +1,134 @@
+# benchmarks/upload_memory.py
+"""
+Проверка пиковой памяти при загрузке большого файла товара в MinIO.
+
+Создает UploadFile с временным файлом на диске (по умолчанию 500 МБ, как
+MINIO_MAX_FILE_SIZE_MB) и загружает его в MINIO_BUCKET_PRODUCTS:
+- before: прежний способ, await file.read() и BytesIO;
+- after: потоковая загрузка через HashingReader частями по
+  MINIO_UPLOAD_PART_SIZE_MB, как в ProductService.upload_product_file.
+
+Каждый вариант выполняется в отдельном процессе, прирост RSS считается по
+пиковому ru_maxrss относительно значения до загрузки. Для варианта after
+прирост должен уложиться в (MINIO_UPLOAD_PARALLEL_PARTS + 1) частей плюс
+--slack-mb, иначе скрипт завершается с кодом 1. Загруженные объекты
+удаляются.
+
+Запуск (нужен доступный MinIO из настроек):
+    uv run python -m benchmarks.upload_memory --size-mb 500
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+CHUNK = 1024 * 1024
+
+
+@contextmanager
+def make_upload_file(size_mb: int) -> Iterator[UploadFile]:
+    """UploadFile с size_mb МБ данных во временном файле на диске."""
+    with SpooledTemporaryFile(max_size=CHUNK) as spooled:
+        chunk = bytes(range(256)) * (CHUNK // 256)
+        for _ in range(size_mb):
+            spooled.write(chunk)
+        spooled.seek(0)
+        yield UploadFile(file=spooled, size=size_mb * CHUNK, filename="bench.zip")
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS процесса в МБ (ru_maxrss в Linux - в КБ)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def upload(variant: str, size_mb: int) -> tuple[float, float, str]:
+    """Загружает файл и возвращает (прирост RSS, секунды, sha256 или "")."""
+    # Импорт здесь: клиент MinIO создается при импорте модуля
+    from app.core.minio_client import HashingReader, minio_client
+
+    with make_upload_file(size_mb) as file:
+        before = peak_rss_mb()
+        started = time.perf_counter()
+
+        if variant == "before":
+            file_data = await file.read()
+            data, digest = BytesIO(file_data), ""
+        else:
+            data = HashingReader(file.file)
+
+        object_name = await minio_client.upload_file(
+            bucket=settings.MINIO_BUCKET_PRODUCTS,
+            file_data=data,
+            file_size=size_mb * CHUNK,
+            original_filename=file.filename,
+            content_type="application/zip",
+            folder="bench",
+        )
+        elapsed = time.perf_counter() - started
+        growth = peak_rss_mb() - before
+
+        if variant == "after":
+            assert data.size == size_mb * CHUNK
+            digest = data.hexdigest()
+        await minio_client.delete_file(settings.MINIO_BUCKET_PRODUCTS, object_name)
+    return growth, elapsed, digest
+
+
+def run_variant(variant: str, size_mb: int) -> tuple[float, float, str]:
+    """Точка входа дочернего процесса."""
+    return asyncio.run(upload(variant, size_mb))
+
+
+def main(size_mb: int, slack_mb: int, variants: list[str]) -> int:
+    part_mb = settings.MINIO_UPLOAD_PART_SIZE_MB
+    bound = (settings.MINIO_UPLOAD_PARALLEL_PARTS + 1) * part_mb + slack_mb
+    print(
+        f"{size_mb} MB file, part {part_mb} MB, "
+        f"{settings.MINIO_UPLOAD_PARALLEL_PARTS} parallel parts, "
+        f"bound {bound} MB"
+    )
+    print(f"{'variant':<10}{'rss growth, MB':>16}{'seconds':>10}  sha256")
+
+    failed = False
+    for variant in variants:
+        # Свежий процесс на каждый вариант: ru_maxrss не сбрасывается
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            growth, elapsed, digest = pool.submit(
+                run_variant, variant, size_mb
+            ).result()
+        print(f"{variant:<10}{growth:>16.1f}{elapsed:>10.2f}  {digest}")
+        if variant == "after" and growth > bound:
+            failed = True
+
+    if failed:
+        print(f"FAIL: RSS growth of the streaming upload exceeds {bound} MB")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--slack-mb", type=int, default=32)
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=["before", "after"],
+        default=["before", "after"],
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.size_mb, args.slack_mb, args.variants))
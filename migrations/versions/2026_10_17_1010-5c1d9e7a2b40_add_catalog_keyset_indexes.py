@@ -0,0 +1,50 @@
+"""Add catalog keyset pagination indexes
+
+Revision ID: 5c1d9e7a2b40
+Revises: 3872d11c1be0
+Create Date: 2026-10-17 10:10:12.481516
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1d9e7a2b40"
+down_revision: Union[str, Sequence[str], None] = "3872d11c1be0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_product_images_product_id",
+        "product_images",
+        ["product_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_products_published_created_at_id",
+        "products",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_published IS true"),
+    )
+    op.create_index(
+        "ix_products_published_user_created_at_id",
+        "products",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_published IS true"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_published_user_created_at_id", table_name="products")
+    op.drop_index("ix_products_published_created_at_id", table_name="products")
+    op.drop_index("ix_product_images_product_id", table_name="product_images")
@@ -0,0 +1,54 @@
+"""Add generated search_vector column and GIN index for products
+
+Revision ID: 8e3f2a6b9d17
+Revises: 5c1d9e7a2b40
+Create Date: 2026-10-17 11:40:03.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3f2a6b9d17"
+down_revision: Union[str, Sequence[str], None] = "5c1d9e7a2b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_products_search_vector",
+        "products",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_products_search_vector",
+        table_name="products",
+        postgresql_using="gin",
+    )
+    op.drop_column("products", "search_vector")
@@ -0,0 +1,140 @@
+"""Add product_cards read model
+
+Revision ID: b7a41c0e9f3d
+Revises: 8e3f2a6b9d17
+Create Date: 2026-10-17 13:05:47.902113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7a41c0e9f3d"
+down_revision: Union[str, Sequence[str], None] = "8e3f2a6b9d17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_cards",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=150), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("seller_id", sa.Integer(), nullable=False),
+        sa.Column("seller_username", sa.String(length=25), nullable=True),
+        sa.Column("main_image_key", sa.String(length=500), nullable=True),
+        sa.Column("images_count", sa.Integer(), nullable=False),
+        sa.Column("has_file", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_product_cards_created_at_id",
+        "product_cards",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_product_cards_seller_created_at_id",
+        "product_cards",
+        ["seller_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_product_cards_search_vector",
+        "product_cards",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Первичное наполнение карточек из опубликованных товаров
+    op.execute(
+        """
+        INSERT INTO product_cards (
+            id, title, description, price, seller_id, seller_username,
+            main_image_key, images_count, has_file, created_at
+        )
+        SELECT
+            p.id, p.title, p.description, p.price, p.user_id, u.username,
+            (SELECT i.image_key FROM product_images i
+             WHERE i.product_id = p.id
+             ORDER BY i.is_main DESC, i.position, i.id LIMIT 1),
+            (SELECT count(i.id) FROM product_images i WHERE i.product_id = p.id),
+            p.file_key IS NOT NULL,
+            p.created_at
+        FROM products p
+        JOIN users u ON u.id = p.user_id
+        WHERE p.is_published IS true
+        """
+    )
+
+    # Каталог и поиск теперь читают product_cards
+    op.drop_index(
+        "ix_products_search_vector", table_name="products", postgresql_using="gin"
+    )
+    op.drop_column("products", "search_vector")
+    op.drop_index("ix_products_published_user_created_at_id", table_name="products")
+    op.drop_index("ix_products_published_created_at_id", table_name="products")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_products_published_created_at_id",
+        "products",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_published IS true"),
+    )
+    op.create_index(
+        "ix_products_published_user_created_at_id",
+        "products",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_published IS true"),
+    )
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_products_search_vector",
+        "products",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.drop_index(
+        "ix_product_cards_search_vector",
+        table_name="product_cards",
+        postgresql_using="gin",
+    )
+    op.drop_index("ix_product_cards_seller_created_at_id", table_name="product_cards")
+    op.drop_index("ix_product_cards_created_at_id", table_name="product_cards")
+    op.drop_table("product_cards")
@@ -0,0 +1,32 @@
+"""Add version to products
+
+Revision ID: d4e9b1a7c352
+Revises: b7a41c0e9f3d
+Create Date: 2026-10-17 15:20:11.604218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e9b1a7c352"
+down_revision: Union[str, Sequence[str], None] = "b7a41c0e9f3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("products", "version")
@@ -0,0 +1,39 @@
+"""Add unique index on lower(email) for users
+
+Revision ID: e1f6c2a9b804
+Revises: d4e9b1a7c352
+Create Date: 2026-10-17 16:40:27.318940
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f6c2a9b804"
+down_revision: Union[str, Sequence[str], None] = "d4e9b1a7c352"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Если в таблице уже есть email, отличающиеся только регистром,
+    # создание индекса завершится ошибкой: такие аккаунты нужно объединить
+    # вручную до миграции.
+    op.create_index(
+        "ix_users_email_lower",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+    op.drop_index("ix_users_email", table_name="users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_users_email", "users", ["email"], unique=False)
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,31 @@
+"""Add file_sha256 to products
+
+Revision ID: f7a3d5c8e216
+Revises: e1f6c2a9b804
+Create Date: 2026-10-17 17:45:39.902113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a3d5c8e216"
+down_revision: Union[str, Sequence[str], None] = "e1f6c2a9b804"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products", sa.Column("file_sha256", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("products", "file_sha256")
@@ -0,0 +1,30 @@
+"""Add index on products.updated_at
+
+Revision ID: a3c8e5f1d927
+Revises: f7a3d5c8e216
+Create Date: 2026-10-18 10:10:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c8e5f1d927"
+down_revision: Union[str, Sequence[str], None] = "f7a3d5c8e216"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_products_updated_at"), "products", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_products_updated_at"), table_name="products")
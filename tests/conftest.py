@@ -0,0 +1,59 @@
+# tests/conftest.py
+"""Общие настройки тестов: приложение импортируется без внешних сервисов."""
+
+import asyncio
+import os
+
+import pytest
+from minio import Minio
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-unit-tests-only-000000")
+
+# app.core.minio_client создает клиента при импорте и проверяет бакеты
+Minio.bucket_exists = lambda self, bucket_name: True
+
+from app.core.minio_client import S3_NS, MinIOClient, S3Response  # noqa: E402
+
+
+class FakeS3:
+    """
+    Подменяет MinIOClient._request: запоминает операции и размеры частей,
+    сами части не хранятся. Ответ на сборку задается complete_response.
+    """
+
+    def __init__(self) -> None:
+        self.operations: list[str] = []
+        self.parts: dict[int, int] = {}
+        self.completed: bytes | None = None
+        self.complete_response = S3Response({}, b"<CompleteMultipartUploadResult/>")
+
+    async def request(self, operation: str, method: str, bucket: str, *args, **kw):
+        self.operations.append(operation)
+        # Отправка части занимает время, пока читается следующая
+        await asyncio.sleep(0.001)
+        if operation == "create_multipart_upload":
+            content = (
+                f'<InitiateMultipartUploadResult xmlns="{S3_NS.strip("{}")}">'
+                "<UploadId>upload-1</UploadId></InitiateMultipartUploadResult>"
+            )
+            return S3Response({}, content.encode())
+        if operation == "upload_part":
+            part_number = int(kw["query"]["partNumber"])
+            self.parts[part_number] = len(kw["body"])
+            return S3Response({"ETag": f'"etag-{part_number}"'}, b"")
+        if operation == "complete_multipart_upload":
+            self.completed = kw["body"]
+            return self.complete_response
+        if operation == "abort_multipart_upload":
+            return S3Response({}, b"", 204)
+        raise AssertionError(f"Unexpected S3 operation {operation}")
+
+
+@pytest.fixture
+def fake_s3(monkeypatch) -> FakeS3:
+    """FakeS3, подставленный во все экземпляры MinIOClient."""
+    s3 = FakeS3()
+    monkeypatch.setattr(
+        MinIOClient, "_request", lambda self, *a, **kw: s3.request(*a, **kw)
+    )
+    return s3
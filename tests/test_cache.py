@@ -0,0 +1,310 @@
+# tests/test_cache.py
+"""Двухуровневый кэш: локальный LRU процесса перед Redis."""
+
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from pydantic import BaseModel
+
+from app.core import cache
+from app.core.cache import LOCK_KEY, LocalCache, TwoTierCache, Versioned
+from app.core.codecs import NEGATIVE
+from app.core.config import settings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Часы локального кэша (TTL считается по time.monotonic)."""
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def local_caches(monkeypatch):
+    """Локальные кэши тестов не попадают в реестр процесса."""
+    monkeypatch.setattr(cache, "_local_caches", {})
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+def make_cache(redis, soft_ttl: int = 60) -> TwoTierCache:
+    """Кэш со своим локальным уровнем, как в отдельном процессе."""
+    local = LocalCache("test", max_bytes=1024 * 1024, ttl=60)
+    return TwoTierCache(redis, local, Item, soft_ttl=soft_ttl, hard_ttl=600)
+
+
+class CountingLoader:
+    """Загрузчик, который считает вызовы и отвечает после паузы."""
+
+    def __init__(self, result: Item | None = None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self) -> Item | None:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def fill(local: LocalCache, *keys: str, size: int = 10) -> None:
+    for key in keys:
+        local.set(key, f"value of {key}", size, local.generation)
+
+
+def test_local_cache_evicts_least_recently_used(clock):
+    local = LocalCache("test", max_bytes=30, ttl=60)
+    fill(local, "a", "b", "c")
+
+    assert local.get("a") == "value of a"
+    fill(local, "d")
+
+    assert local.get("b") is None
+    assert [local.get(key) for key in ("a", "c", "d")] == [
+        "value of a",
+        "value of c",
+        "value of d",
+    ]
+
+
+def test_local_cache_expires_entries_after_ttl(clock):
+    local = LocalCache("test", max_bytes=100, ttl=5)
+    fill(local, "a")
+
+    clock.now += 4.9
+    assert local.get("a") == "value of a"
+
+    clock.now += 0.2
+    assert local.get("a") is None
+    assert local._size == 0
+
+
+def test_local_cache_stays_within_memory_bound(clock):
+    local = LocalCache("test", max_bytes=100, ttl=60)
+    fill(local, *(f"k{i}" for i in range(50)), size=30)
+
+    assert local._size <= 100
+    assert len(local._entries) == 3
+
+    # Запись больше всего кэша не вытесняет остальные
+    local.set("huge", "huge", 101, local.generation)
+    assert local.get("huge") is None
+    assert len(local._entries) == 3
+
+
+def test_local_cache_skips_values_read_before_invalidation(clock):
+    local = LocalCache("test", max_bytes=100, ttl=60)
+    generation = local.generation
+
+    # Пока значение читалось из Redis, ключ инвалидировали
+    local.invalidate("a")
+    local.set("a", "stale", 10, generation)
+
+    assert local.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(redis):
+    items = make_cache(redis)
+    loader = CountingLoader(Item(id=1, name="one"))
+
+    results = await asyncio.gather(
+        *(items.get_or_load("item:1", loader) for _ in range(20))
+    )
+
+    assert loader.calls == 1
+    assert {result.name for result in results} == {"one"}
+    assert (await make_cache(redis).get("item:1")).name == "one"
+
+
+@pytest.mark.asyncio
+async def test_loader_error_reaches_all_waiters_and_is_not_cached(redis):
+    items = make_cache(redis)
+    loader = CountingLoader(error=LookupError("db down"))
+
+    results = await asyncio.gather(
+        *(items.get_or_load("item:1", loader) for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    assert loader.calls == 1
+    assert all(isinstance(result, LookupError) for result in results)
+    assert await items.get("item:1") is None
+    assert not await redis.exists(LOCK_KEY.format("item:1"))
+
+
+@pytest.mark.asyncio
+async def test_miss_waits_for_load_in_another_process(redis):
+    other, items = make_cache(redis), make_cache(redis)
+    await redis.set(LOCK_KEY.format("item:1"), "other-process")
+    loader = CountingLoader(Item(id=1, name="mine"))
+
+    async def load_elsewhere():
+        await asyncio.sleep(0.1)
+        await other.set("item:1", Item(id=1, name="theirs"))
+
+    result, _ = await asyncio.gather(
+        items.get_or_load("item:1", loader), load_elsewhere()
+    )
+
+    assert loader.calls == 0
+    assert result.name == "theirs"
+
+
+async def refreshed() -> None:
+    """Дожидается фоновых обновлений устаревших записей."""
+    await asyncio.gather(*cache._refreshing.values())
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshed_once(redis):
+    await make_cache(redis, soft_ttl=0).set("item:1", Item(id=1, name="old"))
+    items = make_cache(redis)
+    loader = CountingLoader(Item(id=1, name="new"))
+
+    results = await asyncio.gather(
+        *(make_cache(redis).get_or_load("item:1", loader) for _ in range(5))
+    )
+    await refreshed()
+
+    assert {result.name for result in results} == {"old"}
+    assert loader.calls == 1
+    assert (await items.get("item:1")).name == "new"
+    assert not await redis.exists(LOCK_KEY.format("item:1"))
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_entry(redis):
+    await make_cache(redis, soft_ttl=0).set("item:1", Item(id=1, name="old"))
+    loader = CountingLoader(error=LookupError("db down"))
+
+    result = await make_cache(redis).get_or_load("item:1", loader)
+    await refreshed()
+
+    assert result.name == "old"
+    assert loader.calls == 1
+    assert (await make_cache(redis).get("item:1")).name == "old"
+    assert not await redis.exists(LOCK_KEY.format("item:1"))
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_skipped_while_another_process_refreshes(redis):
+    await make_cache(redis, soft_ttl=0).set("item:1", Item(id=1, name="old"))
+    await redis.set(LOCK_KEY.format("item:1"), "other-process")
+    loader = CountingLoader(Item(id=1, name="new"))
+
+    result = await make_cache(redis).get_or_load("item:1", loader)
+    await refreshed()
+
+    assert result.name == "old"
+    assert loader.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_entity_is_cached_as_negative(redis):
+    items = make_cache(redis)
+    loader = CountingLoader(None)
+
+    assert await items.get_or_load("item:1", loader) is None
+    assert await make_cache(redis).get_or_load("item:1", loader) is None
+
+    assert loader.calls == 1
+    raw_key = items._redis_key("item:1")
+    assert await redis.get(raw_key) == NEGATIVE
+    assert 0 < await redis.ttl(raw_key) <= settings.CACHE_NEGATIVE_TTL_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_get_many_returns_negative_entries_as_none(redis):
+    items = make_cache(redis)
+    await items.set("item:1", Item(id=1, name="one"))
+    await items.set_missing(["item:2"])
+
+    found = await make_cache(redis).get_many(["item:1", "item:2", "item:3"])
+
+    assert found["item:1"].name == "one"
+    assert found["item:2"] is None
+    assert "item:3" not in found
+
+
+@pytest.mark.asyncio
+async def test_invalidate_clears_negative_entry(redis):
+    items = make_cache(redis)
+    await items.set_missing(["item:1"])
+
+    # Сущность создана: закэшированное отсутствие снимается
+    await items.invalidate("item:1")
+    loader = CountingLoader(Item(id=1, name="created"))
+
+    assert (await items.get_or_load("item:1", loader)).name == "created"
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_write_through_keeps_newer_version(redis):
+    items = make_cache(redis)
+
+    assert await items.write_through("item:1", Item(id=1, name="v2"), 2)
+    assert not await items.write_through("item:1", Item(id=1, name="v1"), 1)
+    assert not await items.write_through("item:1", Item(id=1, name="v2 again"), 2)
+
+    assert (await make_cache(redis).get("item:1")).name == "v2"
+    raw = await redis.get(items._redis_key("item:1"))
+    assert items.codec.decode(Item, raw)[4] == 2
+
+
+@pytest.mark.asyncio
+async def test_fill_older_than_write_through_is_skipped(redis):
+    items = make_cache(redis)
+    await items.write_through("item:1", Item(id=1, name="v2"), 2)
+    reader = make_cache(redis)
+
+    written = await reader.set_many(
+        {"item:1": Versioned(Item(id=1, name="v1"), 1), "item:2": Item(id=2, name="x")}
+    )
+
+    assert written == 1
+    assert reader.local.get("item:1") is None
+    assert (await reader.get("item:1")).name == "v2"
+    assert (await reader.get("item:2")).name == "x"
+
+
+@pytest.mark.asyncio
+async def test_fill_of_same_version_only_replaces_evicted_entry(redis):
+    items = make_cache(redis)
+    await items.write_through("item:1", Item(id=1, name="v2"), 2)
+
+    assert not await items.set_many({"item:1": Versioned(Item(id=1, name="x"), 2)})
+
+    await redis.delete(items._redis_key("item:1"))
+    assert await items.set_many({"item:1": Versioned(Item(id=1, name="v2"), 2)})
+    assert (await make_cache(redis).get("item:1")).name == "v2"
+
+
+@pytest.mark.asyncio
+async def test_stale_loader_result_is_returned_but_not_cached(redis):
+    items = make_cache(redis)
+    await items.write_through("item:1", Item(id=1, name="v2"), 2)
+    await redis.delete(items._redis_key("item:1"))
+
+    async def loader() -> Versioned:
+        # Загрузка прочитала БД до изменения, но завершилась после него
+        return Versioned(Item(id=1, name="v1"), 1)
+
+    result = await make_cache(redis).get_or_load("item:1", loader)
+
+    assert result == Item(id=1, name="v1")
+    assert await make_cache(redis).get("item:1") is None
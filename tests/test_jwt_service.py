@@ -0,0 +1,133 @@
+# tests/test_jwt_service.py
+"""Ротация refresh токенов одним скриптом Redis и индекс сессий пользователя."""
+
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.jwt_service import (
+    REFRESH_TOKEN_ROTATIONS,
+    USER_SESSIONS_KEY,
+    JWTService,
+    TokenType,
+)
+
+
+@pytest.fixture
+def jwt_service():
+    return JWTService(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+def rotations(result: str) -> float:
+    return REFRESH_TOKEN_ROTATIONS.labels(result)._value.get()
+
+
+@pytest.mark.asyncio
+async def test_rotation_replaces_refresh_token(jwt_service):
+    token = await jwt_service.create_refresh_token({"sub": "1"})
+
+    token_data, new_token = await jwt_service.rotate_refresh_token(token)
+
+    assert token_data.id == 1
+    assert await jwt_service.verify_token(new_token, TokenType.REFRESH) is not None
+    assert await jwt_service.verify_token(token, TokenType.REFRESH) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rotations_of_one_token_succeed_once(jwt_service):
+    token = await jwt_service.create_refresh_token({"sub": "1"})
+    concurrent = rotations("concurrent")
+
+    results = await asyncio.gather(
+        *(jwt_service.rotate_refresh_token(token) for _ in range(5))
+    )
+
+    assert sum(result is not None for result in results) == 1
+    assert rotations("concurrent") == concurrent + 4
+
+
+@pytest.mark.asyncio
+async def test_rotated_token_reuse_is_detected(jwt_service, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", -1)
+    token = await jwt_service.create_refresh_token({"sub": "1"})
+    await jwt_service.rotate_refresh_token(token)
+    reused = rotations("reused")
+
+    assert await jwt_service.rotate_refresh_token(token) is None
+    assert rotations("reused") == reused + 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_or_access_token_is_not_rotated(jwt_service):
+    access = await jwt_service.create_access_token({"sub": "1"})
+    revoked = await jwt_service.create_refresh_token({"sub": "1"})
+    await jwt_service.revoke_refresh_token(revoked)
+
+    assert await jwt_service.rotate_refresh_token(access) is None
+    assert await jwt_service.rotate_refresh_token(revoked) is None
+    assert await jwt_service.rotate_refresh_token("not a jwt") is None
+
+
+async def active(jwt_service: JWTService, tokens: list[str]) -> list[bool]:
+    return [
+        await jwt_service.verify_token(token, TokenType.REFRESH) is not None
+        for token in tokens
+    ]
+
+
+@pytest.mark.asyncio
+async def test_oldest_sessions_over_limit_are_revoked(jwt_service, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_SESSIONS_PER_USER", 3)
+    tokens = [await jwt_service.create_refresh_token({"sub": "1"}) for _ in range(5)]
+
+    assert await active(jwt_service, tokens) == [False, False, True, True, True]
+    assert await jwt_service.redis.zcard(USER_SESSIONS_KEY.format(1)) == 3
+
+    _, new_token = await jwt_service.rotate_refresh_token(tokens[2])
+    assert await active(jwt_service, [*tokens[3:], new_token]) == [True, True, True]
+    assert await jwt_service.redis.zcard(USER_SESSIONS_KEY.format(1)) == 3
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_dropped_from_index(jwt_service):
+    sessions = USER_SESSIONS_KEY.format(1)
+    await jwt_service.redis.zadd(sessions, {"expired-jti": time.time() - 1})
+
+    await jwt_service.create_refresh_token({"sub": "1"})
+
+    assert await jwt_service.redis.zscore(sessions, "expired-jti") is None
+    assert await jwt_service.redis.zcard(sessions) == 1
+    assert 0 < await jwt_service.redis.ttl(sessions)
+
+
+@pytest.mark.asyncio
+async def test_reuse_revokes_all_user_sessions(jwt_service, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", -1)
+    token = await jwt_service.create_refresh_token({"sub": "1"})
+    other_device = await jwt_service.create_refresh_token({"sub": "1"})
+    other_user = await jwt_service.create_refresh_token({"sub": "2"})
+    _, rotated = await jwt_service.rotate_refresh_token(token)
+
+    assert await jwt_service.rotate_refresh_token(token) is None
+
+    assert await active(jwt_service, [rotated, other_device, other_user]) == [
+        False,
+        False,
+        True,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_revoke_sessions_logs_out_every_device(jwt_service):
+    first = [await jwt_service.create_refresh_token({"sub": "1"}) for _ in range(2)]
+    second = [await jwt_service.create_refresh_token({"sub": "2"})]
+    third = [await jwt_service.create_refresh_token({"sub": "3"})]
+
+    assert await jwt_service.revoke_sessions([1, 2]) == {1: 2, 2: 1}
+    assert await jwt_service.revoke_all_sessions(3) == 1
+
+    assert not any(await active(jwt_service, first + second + third))
+    assert not await jwt_service.redis.exists(USER_SESSIONS_KEY.format(1))
@@ -0,0 +1,66 @@
+# tests/test_minio_client.py
+"""Разбор ответов MinIO и отмена multipart upload при ошибке сборки."""
+
+import io
+
+import pytest
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.core.minio_client import MinIOClient, S3Response
+
+BUCKET = settings.MINIO_BUCKET_PRODUCTS
+
+ERROR_BODY = (
+    b"<Error><Code>InternalError</Code>"
+    b"<Message>We encountered an internal error.</Message>"
+    b"<HostId>host-1</HostId></Error>"
+)
+
+
+def test_s3_error_from_status_without_body():
+    response = S3Response({"x-amz-request-id": "req-1"}, b"", 404, "/b/key")
+
+    error = MinIOClient._s3_error(response, "b", "key")
+
+    assert error.code == "NoSuchKey"
+    assert error.resource == "/b/key"
+    assert error.request_id == "req-1"
+    assert error.response is response
+
+
+@pytest.mark.asyncio
+async def test_complete_multipart_upload_raises_on_error_with_status_200(fake_s3):
+    fake_s3.complete_response = S3Response({}, ERROR_BODY, 200, f"/{BUCKET}/file.zip")
+
+    with pytest.raises(S3Error) as exc_info:
+        await MinIOClient().complete_multipart_upload(
+            BUCKET, "file.zip", "upload-1", [(1, "etag-1")]
+        )
+
+    error = exc_info.value
+    assert error.code == "InternalError"
+    assert error.message == "We encountered an internal error."
+    assert error.host_id == "host-1"
+    assert error.resource == f"/{BUCKET}/file.zip"
+    assert (error.bucket_name, error.object_name) == (BUCKET, "file.zip")
+
+
+@pytest.mark.asyncio
+async def test_upload_file_aborts_when_complete_fails(fake_s3, monkeypatch):
+    monkeypatch.setattr(settings, "MINIO_UPLOAD_PART_SIZE_MB", 5)
+    fake_s3.complete_response = S3Response({}, ERROR_BODY, 200)
+    size = 11 * 1024 * 1024
+
+    with pytest.raises(S3Error):
+        await MinIOClient().upload_file(
+            bucket=BUCKET,
+            file_data=io.BytesIO(bytes(size)),
+            file_size=size,
+            original_filename="file.zip",
+        )
+
+    assert fake_s3.operations[-2:] == [
+        "complete_multipart_upload",
+        "abort_multipart_upload",
+    ]
@@ -0,0 +1,44 @@
+# tests/test_product_service.py
+"""Курсор keyset-пагинации каталога."""
+
+import base64
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.products.service import ProductService
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30, 45, 123456)
+
+    cursor = ProductService._encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert ProductService._decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"2026-10-17T12:30:45",
+        b"2026-10-17T12:30:45|abc",
+        b"yesterday|42",
+        b"\xff\xfe|42",
+    ],
+)
+def test_malformed_cursor_is_rejected(raw):
+    cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    with pytest.raises(HTTPException) as exc_info:
+        ProductService._decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_cursor_that_is_not_base64_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        ProductService._decode_cursor("a")
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,85 @@
+# tests/test_rate_limit.py
+"""GCRA-лимит на Redis с локальным запасом разрешений."""
+
+import time
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import RateLimiter, RateLimitExceeded, parse_rate
+
+RATE = parse_rate("60/minute")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Общие часы для Redis (TIME, PX) и локального запаса разрешений."""
+    clock = SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(time, "time", lambda: clock.now)
+    monkeypatch.setattr(
+        rate_limit, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def make_limiter(redis) -> RateLimiter:
+    async def key_func(request) -> str:
+        return "ip:1.2.3.4"
+
+    return RateLimiter(lambda: redis, key_func, local_share=0.1, local_ttl=1.0)
+
+
+async def burst(limiters: list[RateLimiter]) -> int:
+    """Запросы в один момент по очереди через limiters, пока все не откажут."""
+    allowed = 0
+    active = list(limiters)
+    while active:
+        for limiter in list(active):
+            try:
+                await limiter.hit("scope", None, RATE)
+                allowed += 1
+            except RateLimitExceeded:
+                active.remove(limiter)
+    return allowed
+
+
+@pytest.mark.asyncio
+async def test_burst_is_rejected_at_the_limit(clock, redis):
+    limiter = make_limiter(redis)
+
+    assert await burst([limiter]) == RATE.limit
+
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await limiter.hit("scope", None, RATE)
+    assert exc_info.value.retry_after == pytest.approx(1.0, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_sparse_then_burst_is_rejected_only_at_the_limit(clock, redis):
+    limiter = make_limiter(redis)
+
+    # Запрос раз в 2 с: каждый раз выдается пачка, но используется одно
+    # разрешение, остальные возвращаются после истечения пачки
+    for _ in range(40):
+        await limiter.hit("scope", None, RATE)
+        clock.now += 2
+
+    assert await burst([limiter]) == RATE.limit
+
+
+@pytest.mark.asyncio
+async def test_limit_is_shared_between_processes(clock, redis):
+    limiters = [make_limiter(redis), make_limiter(redis)]
+
+    for i in range(20):
+        await limiters[i % 2].hit("scope", None, RATE)
+        clock.now += 1.5
+
+    assert await burst(limiters) == RATE.limit
@@ -0,0 +1,88 @@
+# tests/test_upload_memory.py
+"""
+Потоковая загрузка больших файлов: пиковая память
+ProductService.upload_product_file ограничена MINIO_UPLOAD_PARALLEL_PARTS + 1
+частями, а не размером файла.
+
+Память меряется tracemalloc: буферы частей - объекты bytes Python, поэтому
+попадают в трассировку. ru_maxrss - пик всего процесса, который не
+сбрасывается, и внутри pytest он отражал бы предыдущие тесты; прирост RSS
+проверяет benchmarks/upload_memory.py, запуская загрузку в отдельном процессе.
+"""
+
+import hashlib
+import tracemalloc
+
+import fakeredis
+import pytest
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.modules.products.models import Product
+from app.modules.products.service import ProductService
+from app.modules.users.models import User  # noqa: F401
+
+FILE_SIZE = 500 * 1024 * 1024
+PART_SIZE = settings.MINIO_UPLOAD_PART_SIZE_MB * 1024 * 1024
+# Буферы XML, задачи asyncio и т. п.
+SLACK = 4 * 1024 * 1024
+
+
+@pytest.fixture
+def sparse_file(tmp_path):
+    """Разреженный файл на FILE_SIZE байт (место на диске не занимает)."""
+    path = tmp_path / "large.bin"
+    with path.open("wb") as f:
+        f.truncate(FILE_SIZE)
+    with path.open("rb") as f:
+        yield f
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """ProductService без базы: товар и его сохранение подменены."""
+    product = Product(id=1, user_id=1, title="Large", price=100)
+
+    async def get_product_for_owner(self, product_id, user_id):
+        return product
+
+    async def commit_and_write_through(self, product):
+        return None
+
+    monkeypatch.setattr(ProductService, "_get_product_for_owner", get_product_for_owner)
+    monkeypatch.setattr(
+        ProductService, "_commit_and_write_through", commit_and_write_through
+    )
+    redis = fakeredis.FakeAsyncRedis()
+    return ProductService(redis, redis)
+
+
+@pytest.mark.asyncio
+async def test_upload_product_file_memory_is_bounded_by_parallel_parts(
+    fake_s3, service, sparse_file
+):
+    file = UploadFile(file=sparse_file, size=FILE_SIZE, filename="large.zip")
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        response = await service.upload_product_file(1, 1, file)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    part_count = -(-FILE_SIZE // PART_SIZE)
+    assert sorted(fake_s3.parts) == list(range(1, part_count + 1))
+    assert max(fake_s3.parts.values()) <= PART_SIZE
+    assert fake_s3.completed.count(b"<Part>") == part_count
+
+    # Размер и SHA-256 посчитаны HashingReader по мере чтения частей
+    zeros = hashlib.sha256()
+    for _ in range(FILE_SIZE // PART_SIZE):
+        zeros.update(bytes(PART_SIZE))
+    zeros.update(bytes(FILE_SIZE % PART_SIZE))
+    assert response.file_size == FILE_SIZE
+    assert response.file_sha256 == zeros.hexdigest()
+
+    limit = (settings.MINIO_UPLOAD_PARALLEL_PARTS + 1) * PART_SIZE + SLACK
+    assert peak - baseline <= limit